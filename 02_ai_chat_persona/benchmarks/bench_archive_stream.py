@@ -0,0 +1,94 @@
+"""Peak memory of the legacy in-memory anonymizer vs the streaming sharded one.
+
+Each run happens in a fresh subprocess so ru_maxrss reflects only that run.
+Peak RSS of the streaming path should stay flat as the archive grows.
+
+    python 02_ai_chat_persona/benchmarks/bench_archive_stream.py --mb 50 200
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "training_scripts"
+
+WORDS = "hey babe new set tonight call me @fan_{n} at 555-123-{n:04d} love it so much".split()
+
+
+def make_archive(path, mb):
+    rng = random.Random(0)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "inbound", "response"])
+        while f.tell() < mb << 20:
+            n = rng.randrange(10_000)
+            text = " ".join(rng.choice(WORDS) for _ in range(20)).format(n=n)
+            writer.writerow(["2025-01-02 13:20", text, text[::-1]])
+
+
+def legacy(src, out_dir):
+    from anonymize_archive import scrub
+
+    messages = []
+    with open(src, newline="") as f:
+        for row in csv.DictReader(f):
+            messages.append({"inbound": scrub(row.get("inbound", "")), "response": scrub(row.get("response", ""))})
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "full_dm_archive_cleaned.json"), "w") as f:
+        json.dump({"messages": messages}, f, indent=2)
+
+
+def streaming(src, out_dir, workers):
+    from anonymize_archive import anonymize_record
+    from common.utils.sharded_jsonl import run_sharded_files
+
+    run_sharded_files([src], anonymize_record, out_dir, max_bytes=16 << 20, workers=workers)
+
+
+def child(mode, src, out_dir, workers):
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    start = time.perf_counter()
+    if mode == "legacy":
+        legacy(src, out_dir)
+    else:
+        streaming(src, out_dir, workers)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({"seconds": elapsed, "peak_mib": peak / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, nargs="+", default=[25, 100])
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        mode, src, out_dir, workers = args.child
+        return child(mode, src, out_dir, int(workers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mb in args.mb:
+            src = os.path.join(tmp, f"archive_{mb}.csv")
+            make_archive(src, mb)
+            for mode in ("legacy", "streaming"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, src, os.path.join(tmp, f"{mode}_{mb}"),
+                     str(args.workers)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                print(f"{mb:>5} MiB  {mode:<10} {mb / result['seconds']:6.1f} MB/s   "
+                      f"peak RSS {result['peak_mib']:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
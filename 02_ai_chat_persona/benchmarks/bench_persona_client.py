@@ -0,0 +1,77 @@
+"""Throughput of persona replies against the fake completion server.
+
+Compares one blocking request per reply (the old simulate_chat_response)
+with PersonaClient.batch, which adds concurrency, caching and coalescing.
+Subscriber requests are drawn from the persona prompt file, so many
+replies share a prompt.
+
+    python 02_ai_chat_persona/benchmarks/bench_persona_client.py --replies 200 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "persona_docker" / "persona_scripts"
+TESTS_DIR = Path(__file__).resolve().parents[2] / "tests" / "unit"
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(TESTS_DIR))
+
+from fake_completion_server import FakeCompletionServer  # noqa: E402
+from inject_persona_prompt import PromptStore, default_prompt_path  # noqa: E402
+from persona_client import PersonaClient  # noqa: E402
+
+
+def legacy_reply(base_url, prompt):
+    body = json.dumps({"model": "gpt-4", "messages": [{"role": "user", "content": prompt}]}).encode()
+    request = urllib.request.Request(f"{base_url}/chat/completions", data=body,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)["choices"][0]["message"]["content"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replies", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    store = PromptStore(default_prompt_path())
+    prompts = store.prompts()
+    rng = random.Random(0)
+    workload = [rng.choice(prompts) for _ in range(args.replies)]
+    print(f"{args.replies} replies over {len(set(workload))} distinct prompts, {args.latency * 1000:.0f} ms latency")
+
+    server = FakeCompletionServer(latency=args.latency).start()
+    try:
+        start = time.perf_counter()
+        for prompt in workload[: max(1, args.replies // 10)]:
+            legacy_reply(server.base_url, prompt)
+        legacy = (time.perf_counter() - start) / max(1, args.replies // 10)
+        print(f"sequential, uncached          {1 / legacy:8.1f} replies/s")
+
+        unique = [f"{prompt} #{i}" for i, prompt in enumerate(workload)]
+        for label, batch, prefill in (("batch, all prompts unique", unique, False),
+                                      ("batch, cold cache", workload, False),
+                                      ("batch, warm cache", workload, True)):
+            client = PersonaClient(base_url=server.base_url, max_concurrency=args.concurrency)
+            if prefill:
+                asyncio.run(client.batch(batch))
+            sent = client.requests_sent
+            start = time.perf_counter()
+            asyncio.run(client.batch(batch))
+            elapsed = time.perf_counter() - start
+            client.close()
+            print(f"{label:<28}  {args.replies / elapsed:8.1f} replies/s   "
+                  f"({client.requests_sent - sent} upstream requests)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
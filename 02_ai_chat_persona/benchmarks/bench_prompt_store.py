@@ -0,0 +1,61 @@
+"""Micro-benchmark for persona prompt lookups.
+
+Compares the original load_prompts (re-read and filter the JSONL on every
+call) against the indexed PromptStore used by the persona web_app.
+
+    python 02_ai_chat_persona/benchmarks/bench_prompt_store.py --requests 20000
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "persona_docker" / "persona_scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from inject_persona_prompt import PromptStore, default_prompt_path  # noqa: E402
+
+
+def legacy_load_prompts(filepath, tier=None, message_type=None):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    if tier:
+        lines = [l for l in lines if l["tier"] == tier]
+    if message_type:
+        lines = [l for l in lines if l["message_type"] == message_type]
+    return random.choice(lines)["prompt"] if lines else None
+
+
+def run(fn, keys, n):
+    start = time.perf_counter()
+    for i in range(n):
+        tier, message_type = keys[i % len(keys)]
+        fn(tier, message_type)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark persona prompt lookups")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--file", default=default_prompt_path())
+    args = parser.parse_args()
+
+    with open(args.file, encoding='utf-8') as f:
+        keys = sorted({(r["tier"], r["message_type"]) for r in map(json.loads, f)})
+
+    store = PromptStore(args.file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.sample()  # warm the index outside the timed loop
+
+    before = run(lambda t, m: legacy_load_prompts(args.file, t, m), keys, args.requests)
+    after = run(store.sample, keys, args.requests)
+    print(f"legacy load_prompts : {before:12,.0f} req/s")
+    print(f"PromptStore.sample  : {after:12,.0f} req/s  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time-to-first-batch for the persona fine-tune: re-tokenizing every run vs the mmap cache.
+
+    python 02_ai_chat_persona/benchmarks/bench_token_cache.py --pairs 500000
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "training_scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from clean_and_tokenize import ByteTokenizer, build_dataset  # noqa: E402
+
+WORDS = "hey babe just dropped a new set for you tonight want to see it love your vibe 😘 🔥".split()
+
+
+def legacy_first_batch(src, batch_size):
+    """What a run does today: json.load the archive and tokenize everything before training."""
+    tok = ByteTokenizer()
+    with open(src) as f:
+        data = json.load(f)
+    pairs = [(x['inbound'], x['response']) for x in data['messages']]
+    encoded = [tok.encode(a) + [tok.sep_token_id] + tok.encode(b) + [tok.eos_token_id] for a, b in pairs]
+    return encoded[:batch_size]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "archive.json"
+        with open(src, "w") as f:
+            json.dump({"messages": [
+                {"inbound": " ".join(rng.choices(WORDS, k=12)), "response": " ".join(rng.choices(WORDS, k=30))}
+                for _ in range(args.pairs)
+            ]}, f)
+        cache = Path(tmp) / "cache"
+
+        start = time.perf_counter()
+        legacy_first_batch(src, args.batch_size)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_dataset(src, cache)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ds = build_dataset(src, cache)
+        next(ds.iter_batches(args.batch_size))
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batches = 0
+        for _ in ds.iter_batches(args.batch_size):
+            batches += 1
+        epoch = time.perf_counter() - start
+
+    print(f"{args.pairs} pairs, {ds.meta['tokens']:,} tokens")
+    print(f"legacy load+tokenize to first batch   {legacy:8.2f} s")
+    print(f"cache build (first run only)          {cold:8.2f} s")
+    print(f"cached open to first batch            {warm:8.2f} s  (includes hashing the archive)")
+    print(f"full shuffled epoch from the mmap     {epoch:8.2f} s  ({batches} batches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,85 @@
 """Simple A/B evaluation harness for DM responses."""
 import argparse
 import json
+import sys
+from pathlib import Path
 
+import numpy as np
 
-def load_jsonl(path):
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from common.utils.evaluation import bootstrap_means
+
+METRICS = ("win_rate", "tie_rate", "length_delta")
+
+
+def _iter_completion_lengths(path):
     with open(path) as f:
-        return [json.loads(line) for line in f if line.strip()]
+        for line in f:
+            if line.strip():
+                yield len(json.loads(line).get("completion", ""))
+
+
+def completion_lengths(baseline_path, candidate_paths):
+    """Stream the files in lockstep into a ``(files, rows)`` matrix of completion lengths.
+
+    Rows are paired by line; like ``zip``, pairing stops at the shortest file.
+    """
+    streams = [_iter_completion_lengths(p) for p in [baseline_path, *candidate_paths]]
+    flat = np.fromiter((n for row in zip(*streams) for n in row), dtype=np.int64)
+    return flat.reshape(-1, len(streams)).T
+
+
+def pair_metrics(baseline, candidate):
+    """Per-row metric matrix: candidate shorter (win), equal length (tie), length difference."""
+    return np.column_stack([candidate < baseline, candidate == baseline, candidate - baseline]).astype(np.float64)
+
+
+def evaluate_many(baseline_path, candidate_paths, n_resamples=0, alpha=0.05, seed=0, workers=None):
+    """Score every candidate against the baseline in one pass over the files.
+
+    Returns ``{candidate_path: {metric: {"mean": .., "ci": [lo, hi]}}}``;
+    CIs are paired bootstrap intervals (rows are resampled, so both
+    completions of a pair move together) and are left out when
+    ``n_resamples`` is 0.
+    """
+    lengths = completion_lengths(baseline_path, candidate_paths)
+    baseline = lengths[0]
+    seeds = np.random.SeedSequence(seed).spawn(len(candidate_paths))
+    results = {}
+    for path, candidate, child in zip(candidate_paths, lengths[1:], seeds):
+        x = pair_metrics(baseline, candidate)
+        means = x.mean(axis=0) if len(x) else np.zeros(len(METRICS))
+        stats = {m: {"mean": float(v)} for m, v in zip(METRICS, means)}
+        if n_resamples and len(x):
+            boot = bootstrap_means(x, n_resamples, child, workers)
+            lo, hi = np.percentile(boot, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+            for i, m in enumerate(METRICS):
+                stats[m]["ci"] = [float(lo[i]), float(hi[i])]
+        results[path] = stats
+    return results
 
 
 def evaluate(baseline_path, candidate_path):
-    baseline = load_jsonl(baseline_path)
-    candidate = load_jsonl(candidate_path)
-    pairs = zip(baseline, candidate)
-    wins = 0
-    total = 0
-    for b, c in pairs:
-        if len(c.get("completion", "")) < len(b.get("completion", "")):
-            wins += 1
-        total += 1
-    return wins / total if total else 0.0
+    return evaluate_many(baseline_path, [candidate_path])[candidate_path]["win_rate"]["mean"]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run simple pairwise evaluation")
     parser.add_argument("baseline", help="Baseline JSONL file")
-    parser.add_argument("candidate", help="Candidate JSONL file")
+    parser.add_argument("candidate", nargs="+", help="Candidate JSONL file(s)")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Bootstrap resamples (0 disables CIs)")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
-    win_rate = evaluate(args.baseline, args.candidate)
-    print(f"Candidate win rate: {win_rate:.2%}")
+    results = evaluate_many(args.baseline, args.candidate, args.bootstrap, args.alpha, args.seed)
+    for path, stats in results.items():
+        win = stats["win_rate"]
+        ci = f" ({1 - args.alpha:.0%} CI {win['ci'][0]:.2%} - {win['ci'][1]:.2%})" if "ci" in win else ""
+        print(f"{path}: candidate win rate {win['mean']:.2%}{ci}, "
+              f"mean length delta {stats['length_delta']['mean']:+.1f} chars")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,75 @@
 import json
 import random
 import os
+import threading
+
+
+def default_prompt_path():
+    # Load from the same folder this script is in
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "gpt_persona_prompts.jsonl")
+
+
+class PromptStore:
+    """Keeps the persona prompts in memory, indexed by (tier, message_type).
+
+    The JSONL file is parsed once and re-parsed only when its mtime changes,
+    so a ``/generate`` call costs one ``stat`` and a dict lookup.
+    """
+
+    def __init__(self, filepath=None):
+        self.filepath = filepath or default_prompt_path()
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._index = {}
+
+    def _build_index(self, records):
+        index = {}
+        for record in records:
+            tier = record.get("tier")
+            message_type = record.get("message_type")
+            prompt = record["prompt"]
+            # Every filter combination load_prompts accepts gets its own bucket.
+            for key in ((tier, message_type), (tier, None), (None, message_type), (None, None)):
+                index.setdefault(key, []).append(prompt)
+        return index
+
+    def _refresh(self):
+        st = os.stat(self.filepath)
+        mtime = (st.st_mtime_ns, st.st_size)
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            print(f"📄 Loading prompt file from: {self.filepath}")  # Debugging output
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            # Swap the index in one assignment so readers never see a partial build.
+            self._index = self._build_index(records)
+            self._mtime = mtime
+
+    def prompts(self, tier=None, message_type=None):
+        self._refresh()
+        return self._index.get((tier or None, message_type or None), [])
+
+    def sample(self, tier=None, message_type=None):
+        candidates = self.prompts(tier, message_type)
+        return random.choice(candidates) if candidates else None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(filepath=None):
+    filepath = os.path.abspath(filepath or default_prompt_path())
+    store = _stores.get(filepath)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(filepath, PromptStore(filepath))
+    return store
+
 
 def load_prompts(filepath=None, tier=None, message_type=None):
-    if filepath is None:
-        # Load from the same folder this script is in
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        filepath = os.path.join(base_dir, "gpt_persona_prompts.jsonl")
-
-    print(f"📄 Loading prompt file from: {filepath}")  # Debugging output
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = [json.loads(line) for line in f]
-    if tier:
-        lines = [l for l in lines if l["tier"] == tier]
-    if message_type:
-        lines = [l for l in lines if l["message_type"] == message_type]
-    return random.choice(lines)["prompt"] if lines else None
+    return get_store(filepath).sample(tier=tier, message_type=message_type)
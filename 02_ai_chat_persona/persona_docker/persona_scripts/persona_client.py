@@ -0,0 +1,147 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import openai
+
+DEFAULT_MODEL = "gpt-4"
+DEFAULT_SYSTEM = "You are a flirty OnlyFans creator persona."
+
+
+class ResponseCache:
+    """LRU cache of completions that also expires entries ``ttl`` seconds after they were stored."""
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= self._clock():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PersonaClient:
+    """Chat-completion client for the persona with caching, coalescing and a concurrent batch API.
+
+    Responses are cached by ``(model, system, prompt)``. A request that is
+    already in flight is not sent twice: later callers, sync or async, wait
+    on the same future. Requests run on a pool of ``max_concurrency``
+    threads sharing one openai client, and are spaced by a shared
+    ``rate_limit`` (requests per second, None for no limit).
+
+    Connections, timeouts and retries are left to the openai SDK.
+    ``base_url`` (or ``OPENAI_BASE_URL``) can point at any OpenAI-compatible
+    endpoint, which is what lets tests use a local fake server. The SDK
+    retries timeouts and 5xx responses ``max_retries`` times; since a
+    completion is billed even if its response is lost, pass 0 to never send
+    one twice.
+    """
+
+    def __init__(self, base_url=None, api_key=None, model=DEFAULT_MODEL, system=DEFAULT_SYSTEM,
+                 cache=None, max_concurrency=8, rate_limit=None, timeout=60.0, max_retries=2):
+        self.client = openai.OpenAI(base_url=base_url, api_key=api_key or os.getenv("OPENAI_API_KEY", "YOUR_API_KEY"),
+                                    timeout=timeout, max_retries=max_retries)
+        self.model = model
+        self.system = system
+        self.cache = cache if cache is not None else ResponseCache()
+        self.limiter = RateLimiter(rate_limit)
+        self.requests_sent = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="persona-llm")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, key):
+        model, system, prompt = key
+        self.limiter.wait()
+        with self._lock:
+            self.requests_sent += 1
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        )
+        content = response.choices[0].message.content
+        self.cache.put(key, content)
+        return content
+
+    def _submit(self, prompt, system=None, model=None):
+        key = (model or self.model, system or self.system, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._pool.submit(self._fetch, key)
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def complete(self, prompt, system=None, model=None):
+        """Blocking completion for one prompt."""
+        return self._submit(prompt, system, model).result()
+
+    async def acomplete(self, prompt, system=None, model=None):
+        return await asyncio.wrap_future(self._submit(prompt, system, model))
+
+    async def batch(self, prompts, system=None, model=None, return_exceptions=False):
+        """Complete many prompts concurrently; results come back in input order.
+
+        The first failed prompt raises. With ``return_exceptions`` a failed
+        prompt yields its exception in place of a reply instead.
+        """
+        return await asyncio.gather(*(self.acomplete(p, system, model) for p in prompts),
+                                    return_exceptions=return_exceptions)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.client.close()
@@ -1,23 +1,31 @@
-import openai
+import asyncio
+
 from inject_persona_prompt import load_prompts
+from persona_client import PersonaClient
 
-# Set your OpenAI API key
-openai.api_key = "YOUR_API_KEY"
+# Reads OPENAI_API_KEY / OPENAI_BASE_URL; point the latter at
+# tests/unit/fake_completion_server.py to run without the real API.
+client = PersonaClient(model="gpt-4", rate_limit=5)
 
 def simulate_chat_response(tier, message_type):
     prompt = load_prompts(tier=tier, message_type=message_type)
     if not prompt:
         return "No matching prompt found."
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a flirty OnlyFans creator persona."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response["choices"][0]["message"]["content"]
+    return client.complete(prompt)
+
+async def simulate_chat_responses(requests):
+    """Replies for many (tier, message_type) requests at once, in request order.
+
+    Raises the first failed request's error, like simulate_chat_response.
+    """
+    prompts = [load_prompts(tier=tier, message_type=message_type) for tier, message_type in requests]
+    replies = await client.batch([p for p in prompts if p])
+    replies = iter(replies)
+    return [next(replies) if p else "No matching prompt found." for p in prompts]
 
 # Example usage:
 if __name__ == "__main__":
     reply = simulate_chat_response("Engaged", "Reward")
     print("GPT Response:", reply)
+    for reply in asyncio.run(simulate_chat_responses([("VIP", "Exclusive"), ("Engaged", "Reward")])):
+        print("GPT Response:", reply)
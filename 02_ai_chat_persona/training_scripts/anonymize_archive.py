@@ -1,32 +1,48 @@
 """Anonymize raw DM archive by scrubbing simple PII patterns."""
-import csv
-import json
-import re
+import argparse
+import sys
+from pathlib import Path
+
+# Make the shared common/ package importable when run from this module.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from common.utils.pii_scrub import Scrubber
+from common.utils.sharded_jsonl import run_sharded_files
 
 PII_PATTERNS = [
     r"@\w+",                       # handles
     r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"  # phone numbers
 ]
 
+SCRUBBER = Scrubber([
+    ("HANDLE", PII_PATTERNS[0], "[REDACTED]"),
+    ("PHONE", PII_PATTERNS[1], "[REDACTED]"),
+], guard=r"[\d@]")
+
 def scrub(text: str) -> str:
-    for pat in PII_PATTERNS:
-        text = re.sub(pat, "[REDACTED]", text)
-    return text
+    return SCRUBBER.scrub(text)
+
+
+def anonymize_record(row: dict) -> dict:
+    return {"inbound": scrub(row.get("inbound") or ""), "response": scrub(row.get("response") or "")}
 
 
 def main():
-    messages = []
-    with open("full_dm_archive_raw.csv", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            inbound = scrub(row.get("inbound", ""))
-            response = scrub(row.get("response", ""))
-            messages.append({"inbound": inbound, "response": response})
-
-    out_path = "full_dm_archive_cleaned.json"
-    with open(out_path, "w") as f:
-        json.dump({"messages": messages}, f, indent=2)
-    print(f"Wrote {len(messages)} messages to {out_path}")
+    parser = argparse.ArgumentParser(description="Scrub PII from a DM archive into sharded JSONL")
+    parser.add_argument("src", nargs="*", default=["full_dm_archive_raw.csv"],
+                        help="CSV, JSONL or JSON archives with inbound/response fields")
+    parser.add_argument("--out-dir", default="full_dm_archive_cleaned")
+    parser.add_argument("--shard-mb", type=float, default=64, help="Maximum size of one output shard")
+    parser.add_argument("--workers", type=int, default=0, help="Scrubbing processes (0 = in-process)")
+    parser.add_argument("--chunk", type=int, default=10_000, help="Records handed to a worker at a time")
+    args = parser.parse_args()
+
+    manifest = run_sharded_files(args.src, anonymize_record, args.out_dir, json_key="messages",
+                                 max_bytes=int(args.shard_mb * (1 << 20)), workers=args.workers,
+                                 chunk_records=args.chunk)
+    print(f"Wrote {manifest['records']} messages to {len(manifest['shards'])} shards in {args.out_dir}")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,198 @@
 # Script to clean and tokenize DM data for fine-tuning
+import argparse
+import hashlib
 import json
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from common.utils.sharded_jsonl import MANIFEST_NAME, iter_records, iter_shards
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".token_cache"
+
+
+def iter_pairs(file_path):
+    """Stream (inbound, response) pairs from the cleaned archive JSON or its shard directory."""
+    records = iter_shards(file_path) if os.path.isdir(file_path) else iter_records(str(file_path), "messages")
+    for x in records:
+        yield x['inbound'], x['response']
+
 
 def preprocess(file_path):
-    with open(file_path) as f:
-        data = json.load(f)
-    return [(x['inbound'], x['response']) for x in data['messages']]
+    """Return (inbound, response) pairs from the cleaned archive JSON or its shard directory."""
+    return list(iter_pairs(file_path))
+
+
+class ByteTokenizer:
+    """UTF-8 byte tokenizer: no downloads, no vocab file, runs anywhere.
+
+    Ids 0-255 are bytes; the special tokens follow them.
+    """
+
+    pad_token_id = 256
+    sep_token_id = 257
+    eos_token_id = 258
+    vocab_size = 259
+    name = 'byte-v1'
+
+    def encode(self, text):
+        return list(text.encode('utf-8'))
+
+    def decode(self, ids):
+        return bytes(i for i in ids if i < 256).decode('utf-8', errors='replace')
+
+
+def tokenizer_fingerprint(tokenizer):
+    """Identify a tokenizer by name and vocabulary, so a changed vocab never reuses stale tokens."""
+    h = hashlib.sha256()
+    h.update(str(getattr(tokenizer, 'name', None) or getattr(tokenizer, 'name_or_path', type(tokenizer).__name__)).encode())
+    if hasattr(tokenizer, 'get_vocab'):
+        h.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+    for attr in ('vocab_size', 'sep_token_id', 'eos_token_id'):
+        h.update(repr(getattr(tokenizer, attr, None)).encode())
+    return h.hexdigest()
+
+
+def data_fingerprint(file_path):
+    """Identify the archive file, or a shard directory's manifest and shards, by size and mtime.
+
+    Only metadata is read, so checking the cache costs the same for a
+    multi-GB archive as for a small one; any rewrite of the data changes
+    the mtime and therefore the fingerprint.
+    """
+    h = hashlib.sha256()
+    if os.path.isdir(file_path):
+        manifest_path = os.path.join(file_path, MANIFEST_NAME)
+        with open(manifest_path, 'rb') as f:
+            manifest = f.read()
+        h.update(manifest)
+        paths = [os.path.join(file_path, s['file']) for s in json.loads(manifest)['shards']]
+    else:
+        paths = [os.path.realpath(file_path)]
+    for path in paths:
+        st = os.stat(path)
+        h.update(f'{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}\n'.encode())
+    return h.hexdigest()
+
+
+class TokenDataset:
+    """Tokenized pairs backed by memory-mapped files; only the rows that are read get paged in.
+
+    Example ``i`` is ``tokens[offsets[i]:offsets[i + 1]]``, laid out as
+    ``inbound <sep> response <eos>``; ``prompt_lengths[i]`` counts the
+    tokens up to and including ``<sep>`` so the prompt can be masked from
+    the loss.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json') as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(self.path / 'offsets.npy', mmap_mode='r')
+        self.prompt_lengths = np.load(self.path / 'prompt_lengths.npy', mmap_mode='r')
+        if self.meta['tokens']:
+            self.tokens = np.memmap(self.path / 'tokens.bin', dtype=self.meta['dtype'], mode='r')
+        else:
+            self.tokens = np.empty(0, dtype=self.meta['dtype'])
+        self.pad_token_id = self.meta['pad_token_id']
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def batch(self, indices, max_len=None):
+        """Right-padded ``(input_ids, lengths)`` arrays for the given examples."""
+        rows = [self[i] for i in indices]
+        lengths = np.array([len(r) if max_len is None else min(len(r), max_len) for r in rows], dtype=np.int64)
+        out = np.full((len(rows), int(lengths.max()) if len(rows) else 0), self.pad_token_id, dtype=np.int64)
+        for k, (row, n) in enumerate(zip(rows, lengths)):
+            out[k, :n] = row[:n]
+        return out, lengths
+
+    def iter_batches(self, batch_size, shuffle=True, seed=0, max_len=None):
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        for start in range(0, len(order), batch_size):
+            yield self.batch(order[start:start + batch_size], max_len)
+
+
+def build_dataset(file_path, cache_dir=CACHE_DIR, tokenizer=None, max_len=None):
+    """Tokenize the archive once and return the cached TokenDataset.
+
+    The cache entry is keyed by the tokenizer fingerprint and the archive's
+    size and mtime, so reruns on unchanged data open the memory map without
+    reading the archive; a changed archive or tokenizer builds a new entry.
+    Pairs are streamed and token ids appended to disk as they are produced,
+    so the build does not hold the archive in memory. ``max_len`` truncates
+    each example.
+    """
+    tokenizer = tokenizer or ByteTokenizer()
+    tok_fp = tokenizer_fingerprint(tokenizer)
+    key = hashlib.sha256(f'{tok_fp}:{data_fingerprint(file_path)}:{max_len}'.encode()).hexdigest()[:24]
+    path = Path(cache_dir) / key
+    if (path / 'meta.json').exists():
+        return TokenDataset(path)
+
+    vocab_size = getattr(tokenizer, 'vocab_size', None) or len(tokenizer)
+    dtype = np.uint16 if vocab_size <= np.iinfo(np.uint16).max + 1 else np.uint32
+    sep = tokenizer.sep_token_id if getattr(tokenizer, 'sep_token_id', None) is not None else tokenizer.eos_token_id
+    eos = tokenizer.eos_token_id
+    pad = getattr(tokenizer, 'pad_token_id', None)
+    pad = eos if pad is None else pad
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f'.{key}-'))
+    try:
+        offsets, prompt_lengths = array('q', [0]), array('q')
+        buf = array('H' if dtype == np.uint16 else 'I')
+        with open(tmp / 'tokens.bin', 'wb') as f:
+            for inbound, response in iter_pairs(file_path):
+                prompt = tokenizer.encode(inbound) + [sep]
+                ids = prompt + tokenizer.encode(response) + [eos]
+                if max_len is not None:
+                    ids = ids[:max_len]
+                buf.extend(ids)
+                offsets.append(offsets[-1] + len(ids))
+                prompt_lengths.append(min(len(prompt), len(ids)))
+                if len(buf) >= 1 << 20:
+                    buf.tofile(f)
+                    del buf[:]
+            buf.tofile(f)
+        np.save(tmp / 'offsets.npy', np.frombuffer(offsets, dtype=np.int64))
+        np.save(tmp / 'prompt_lengths.npy', np.frombuffer(prompt_lengths, dtype=np.int64))
+        meta = {
+            'source': str(file_path), 'tokenizer': tok_fp, 'dtype': np.dtype(dtype).name,
+            'examples': len(prompt_lengths), 'tokens': offsets[-1], 'pad_token_id': pad, 'max_len': max_len,
+        }
+        # meta.json marks the entry as complete, so write it last.
+        with open(tmp / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Another run finished the same entry first.
+            if not (path / 'meta.json').exists():
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return TokenDataset(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tokenize the cleaned DM archive into a memory-mapped cache')
+    parser.add_argument('src', nargs='?', default='full_dm_archive_cleaned')
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR))
+    parser.add_argument('--max-len', type=int)
+    args = parser.parse_args()
+    dataset = build_dataset(args.src, args.cache_dir, max_len=args.max_len)
+    print(f"{len(dataset)} examples, {dataset.meta['tokens']} tokens cached at {dataset.path}")
@@ -1,22 +1,36 @@
 # data_cleaning.py
 
-import json
+import argparse
+import sys
+from pathlib import Path
+
+# Make the shared common/ package importable when run from this module.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from common.utils.sharded_jsonl import run_sharded_files
 
 def clean_text(text):
     return text.replace("\n", " ").strip()
 
-with open('raw_dms.json', 'r') as f:
-    raw = json.load(f)
-
-cleaned = []
-for msg in raw:
-    cleaned.append({
+def clean_record(msg):
+    return {
         'prompt': f"User: {clean_text(msg['user_text'])}\nAssistant:",
         'completion': f" {clean_text(msg['bot_response'])}"
-    })
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Turn raw DMs into prompt/completion JSONL shards')
+    parser.add_argument('src', nargs='*', default=['raw_dms.json'])
+    parser.add_argument('--out-dir', default='cleaned_dms')
+    parser.add_argument('--shard-mb', type=float, default=64)
+    parser.add_argument('--workers', type=int, default=0)
+    args = parser.parse_args()
 
-with open('cleaned_dms.jsonl', 'w') as f:
-    for item in cleaned:
-        f.write(json.dumps(item) + '\n')
+    manifest = run_sharded_files(args.src, clean_record, args.out_dir,
+                                 max_bytes=int(args.shard_mb * (1 << 20)), workers=args.workers)
+    print(f"{args.out_dir}/ created ({manifest['records']} records, {len(manifest['shards'])} shards)")
 
-print('cleaned_dms.jsonl created')
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,21 @@
 /**
  * fine_tune.js
  *
- * Uses OpenAI API to fine-tune a model on `cleaned_dms.jsonl`.
+ * Uses OpenAI API to fine-tune a model on the JSONL shards in `cleaned_dms/`
+ * written by data_cleaning.py (listed in `cleaned_dms/manifest.json`).
  */
+const fs = require('fs');
+const path = require('path');
 const OpenAI = require('openai');
 require('dotenv').config();
 
+const DATASET_DIR = 'cleaned_dms';
+
+function trainingFiles() {
+  const manifest = JSON.parse(fs.readFileSync(path.join(DATASET_DIR, 'manifest.json'), 'utf-8'));
+  return manifest.shards.map((shard) => path.join(DATASET_DIR, shard.file));
+}
+
 const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
 
 async function runFineTune() {
@@ -13,9 +23,9 @@ async function runFineTune() {
     model: 'gpt-4o-mini',
     messages: [
       { role: 'system', content: 'You are an OnlyFans engagement assistant.' },
-      { role: 'user', content: 'Fine-tune using cleaned_dms.jsonl' }
+      { role: 'user', content: `Fine-tune using ${trainingFiles().join(', ')}` }
     ],
-    // NOTE: In practice, you'd call openai.fineTunes.create() with training_file
+    // NOTE: In practice, you'd upload each shard and call openai.fineTunes.create() with training_file
   });
   console.log('Fine-tune job started:', response);
 }
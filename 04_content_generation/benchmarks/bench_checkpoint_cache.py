@@ -0,0 +1,133 @@
+"""Checkpoint cache: count-limited copies of state dicts vs the byte-budgeted, memory-mapped cache.
+
+Writes --files synthetic .safetensors checkpoints of --mb MiB each, then
+switches between them --rounds times, copying the weights into a fixed
+"model" the way model.load_state_dict does, and reports the switch time
+and the anonymous RAM (RssAnon, memory the OS can't page out to the
+checkpoint file) held by the cache:
+  * no cache: every switch reads the file again
+  * legacy: every checkpoint cached as a copy of its tensors in RAM, as
+    the old sd_checkpoint_cache did for .ckpt files or with mmap disabled
+  * budgeted: modules.sd_models_cache.CheckpointCache, .safetensors cached
+    as read-only memory-mapped views
+
+Needs torch and safetensors (Linux for RssAnon).
+
+    python 04_content_generation/benchmarks/bench_checkpoint_cache.py --files 3 --mb 512
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import safetensors.torch
+import torch
+
+WEBUI_DIR = Path(__file__).resolve().parents[1] / "stable-diffusion-webui"
+
+
+class FakeCheckpointInfo:
+    def __init__(self, filename):
+        self.filename = filename
+        self.title = os.path.basename(filename)
+
+
+def rss_anon_mib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def make_state_dict(mb, seed):
+    generator = torch.Generator().manual_seed(seed)
+    n = mb * (1 << 20) // 4 // 16
+    return {f"model.diffusion_model.block{i}.weight": torch.randn(n, generator=generator) for i in range(16)}
+
+
+def apply(model, state_dict):
+    with torch.no_grad():
+        for k, v in model.items():
+            v.copy_(state_dict[k])
+
+
+def run_switches(model, infos, rounds, load):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for info in infos:
+            apply(model, load(info))
+    return (time.perf_counter() - start) / (rounds * len(infos)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--mb", type=int, default=512)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        run(args, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(args, tmp):
+    os.environ["SD_WEBUI_CACHE_DIR"] = os.path.join(tmp, "cache")
+    os.environ["IGNORE_CMD_ARGS_ERRORS"] = "1"
+    sys.argv = sys.argv[:1]
+    sys.path.insert(0, str(WEBUI_DIR))
+    os.chdir(WEBUI_DIR)
+    from modules import sd_models_cache, shared
+
+    infos = []
+    for i in range(args.files):
+        info = FakeCheckpointInfo(os.path.join(tmp, f"model{i}.safetensors"))
+        safetensors.torch.save_file(make_state_dict(args.mb, i), info.filename)
+        infos.append(info)
+    model = {k: torch.empty_like(v) for k, v in safetensors.torch.load_file(infos[0].filename).items()}
+    print(f"{args.files} checkpoints x {args.mb} MiB, {args.rounds} rounds of switching")
+
+    def from_disk(info):
+        return safetensors.torch.load(open(info.filename, "rb").read())
+
+    base = rss_anon_mib()
+    ms = run_switches(model, infos, args.rounds, from_disk)
+    print(f"no cache                  {ms:8.1f} ms/switch  cache RAM {rss_anon_mib() - base:8.0f} MiB")
+
+    legacy = {}
+
+    def from_legacy(info):
+        if info not in legacy:
+            legacy[info] = {k: v.clone() for k, v in from_disk(info).items()}
+        return legacy[info]
+
+    base = rss_anon_mib()
+    ms = run_switches(model, infos, args.rounds, from_legacy)
+    print(f"legacy copies             {ms:8.1f} ms/switch  cache RAM {rss_anon_mib() - base:8.0f} MiB")
+    legacy.clear()
+
+    shared.opts.sd_checkpoint_cache_ram = args.mb
+    cache = sd_models_cache.CheckpointCache()
+
+    def from_cache(info):
+        state_dict = cache.get(info)
+        if state_dict is None:
+            state_dict = safetensors.torch.load_file(info.filename, device="cpu")
+            cache.put(info, state_dict, mapped=True)
+        return state_dict
+
+    base = rss_anon_mib()
+    ms = run_switches(model, infos, args.rounds, from_cache)
+    stats = cache.stats()
+    print(f"budgeted, mmap ({args.mb} MiB) {ms:8.1f} ms/switch  cache RAM {rss_anon_mib() - base:8.0f} MiB"
+          f"  (hits {stats['hits']}, misses {stats['misses']}, mapped {stats['mapped'] / 2**20:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Conditioning cache: prompt_parser.get_learned_conditioning with and without the process-wide cache.
+
+Simulates --requests API calls that each have a unique prompt but draw
+their negative prompt from a small pool of --negatives, like traffic
+that reuses the same negative prompts and styles. The text encoder is a
+small CPU transformer (--layers x 768 wide, 77 tokens) standing in for
+CLIP. Times setting up the conds for every request with the cache off
+and with a --mb budget, and reports the hit rate.
+
+    python 04_content_generation/benchmarks/bench_conds_cache.py --requests 200 --negatives 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+WEBUI_DIR = Path(__file__).resolve().parents[1] / "stable-diffusion-webui"
+
+
+class TinyTextEncoder:
+    sd_model_checkpoint = "tiny.safetensors"
+    sd_model_hash = "00000000"
+
+    def __init__(self, layers):
+        torch.manual_seed(0)
+        self.embedding = torch.nn.Embedding(50000, 768)
+        layer = torch.nn.TransformerEncoderLayer(768, 12, 3072, batch_first=True)
+        self.encoder = torch.nn.TransformerEncoder(layer, layers).eval()
+
+    def get_learned_conditioning(self, texts):
+        ids = torch.tensor([[hash((text, i)) % 50000 for i in range(77)] for text in texts])
+        with torch.no_grad():
+            return self.encoder(self.embedding(ids))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--negatives", type=int, default=5)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--mb", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ["IGNORE_CMD_ARGS_ERRORS"] = "1"
+    sys.argv = sys.argv[:1]
+    sys.path.insert(0, str(WEBUI_DIR))
+    os.chdir(WEBUI_DIR)
+    from modules import prompt_parser, sd_conds_cache, shared
+
+    model = TinyTextEncoder(args.layers)
+    rng = random.Random(0)
+    negatives = [f"lowres, bad anatomy, style {i}" for i in range(args.negatives)]
+    traffic = [(f"photo of subject {i}, [day:night:10]", rng.choice(negatives)) for i in range(args.requests)]
+
+    def run():
+        start = time.perf_counter()
+        for prompt, negative in traffic:
+            context = sd_conds_cache.make_context(model, {})
+            prompt_parser.get_learned_conditioning(model, prompt_parser.SdConditioning([negative], is_negative_prompt=True), 20, cache_context=context)
+            prompt_parser.get_multicond_learned_conditioning(model, prompt_parser.SdConditioning([prompt]), 20, cache_context=context)
+        return (time.perf_counter() - start) / len(traffic) * 1000
+
+    shared.opts.cond_cache_ram = 0
+    ms = run()
+    print(f"{args.requests} requests, {args.negatives} distinct negative prompts, {args.layers}-layer encoder")
+    print(f"cache off          {ms:8.1f} ms/request")
+
+    shared.opts.cond_cache_ram = args.mb
+    ms = run()
+    stats = sd_conds_cache.cache.stats()
+    print(f"cache {args.mb:4d} MB      {ms:8.1f} ms/request  hit rate {stats['hit_rate']:.0%}, {stats['entries']} entries, {stats['used'] / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Per-job latency of the subprocess and resident generation modes.
+
+Uses a stub pipeline whose import sleeps for --load-seconds to stand in
+for interpreter start-up, heavy imports and model load.
+
+    python 04_content_generation/benchmarks/bench_generation_modes.py --jobs 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pipeline_runners import ResidentPipeline, SubprocessPipeline  # noqa: E402
+
+STUB_PIPELINE = '''
+import json
+import sys
+import time
+
+time.sleep({load_seconds})  # imports + model load
+
+def run(prompt_file, progress=None):
+    with open(prompt_file, encoding="utf-8") as f:
+        prompts = json.load(f)["prompts"]
+    for i, prompt in enumerate(prompts):
+        if progress:
+            progress(i + 1, len(prompts), prompt)
+    return len(prompts)
+
+if __name__ == "__main__":
+    run(sys.argv[1])
+'''
+
+
+def time_jobs(pipeline, prompt_file, jobs):
+    latencies = []
+    for _ in range(jobs):
+        start = time.perf_counter()
+        pipeline(prompt_file)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark subprocess vs resident generation")
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--load-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        script = os.path.join(tmpdir, "stub_pipeline.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(STUB_PIPELINE.format(load_seconds=args.load_seconds))
+        prompt_file = os.path.join(tmpdir, "prompts.json")
+        with open(prompt_file, "w", encoding="utf-8") as f:
+            json.dump({"prompts": ["cover a", "cover b"]}, f)
+
+        results = {
+            "subprocess": time_jobs(SubprocessPipeline(script, python=sys.executable), prompt_file, args.jobs),
+            "resident": time_jobs(ResidentPipeline(script), prompt_file, args.jobs),
+        }
+
+    for mode, latencies in results.items():
+        warm = latencies[1:] or latencies
+        print(f"{mode:<10} first job {latencies[0] * 1000:8.1f} ms   "
+              f"later jobs {sum(warm) / len(warm) * 1000:8.2f} ms avg")
+
+
+if __name__ == "__main__":
+    main()
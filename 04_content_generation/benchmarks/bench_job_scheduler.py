@@ -0,0 +1,101 @@
+"""Job queue: FIFO vs priority / fair-share scheduling with modules.job_scheduler.
+
+One "hires" client keeps --hog-depth long jobs (--long ms each, e.g. a 40
+step hires batch) queued at all times. --clients preview clients each send
+--previews short jobs (--short ms) one after another. Jobs only sleep, so
+this measures scheduling, not generation. Reports how long preview jobs
+wait for the queue and how many long jobs completed, for:
+  * FIFO (the default, same order as the old FIFOLock)
+  * Priority, everyone at normal priority (fair share between clients only)
+  * Priority, previews sent with X-Priority: high
+
+    python 04_content_generation/benchmarks/bench_job_scheduler.py --clients 4 --previews 10
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+WEBUI_DIR = Path(__file__).resolve().parents[1] / "stable-diffusion-webui"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(job_scheduler, args, policy, preview_priority):
+    scheduler = job_scheduler.JobScheduler(policy=policy)
+    waits = []
+    long_done = 0
+    stop = threading.Event()
+
+    def hog():
+        nonlocal long_done
+
+        def long_job():
+            nonlocal long_done
+            with scheduler.job(client="hires"):
+                time.sleep(args.long / 1000)
+            long_done += 1
+
+        while not stop.is_set():
+            jobs = [threading.Thread(target=long_job) for _ in range(args.hog_depth)]
+            for t in jobs:
+                t.start()
+            for t in jobs:
+                t.join()
+
+    def preview_client(c):
+        for _ in range(args.previews):
+            queued = time.perf_counter()
+            with scheduler.job(priority=preview_priority, client=f"preview{c}"):
+                waits.append(time.perf_counter() - queued)
+                time.sleep(args.short / 1000)
+
+    hog_thread = threading.Thread(target=hog)
+    hog_thread.start()
+    time.sleep(args.long / 1000)  # let the hires jobs fill the queue first
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=preview_client, args=(c,)) for c in range(args.clients)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    hog_thread.join()
+
+    return waits, long_done, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--previews", type=int, default=10)
+    parser.add_argument("--short", type=float, default=20)
+    parser.add_argument("--long", type=float, default=300)
+    parser.add_argument("--hog-depth", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(WEBUI_DIR))
+    from modules import job_scheduler
+
+    print(f"{args.clients} preview clients x {args.previews} jobs of {args.short:.0f} ms, "
+          f"one client keeping {args.hog_depth} jobs of {args.long:.0f} ms queued")
+    for title, policy, priority in [
+        ("FIFO", "FIFO", "normal"),
+        ("Priority, fair share", "Priority", "normal"),
+        ("Priority, previews high", "Priority", "high"),
+    ]:
+        waits, long_done, elapsed = run(job_scheduler, args, policy, priority)
+        print(f"{title:24} preview wait median {statistics.median(waits) * 1000:7.0f} ms, "
+              f"p95 {percentile(waits, 0.95) * 1000:7.0f} ms; all previews done in {elapsed:5.1f} s, "
+              f"{long_done} long jobs done meanwhile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Checkpoint hashing: legacy 1 MB read() loop vs mmap + background hashing pool.
+
+Writes --files synthetic checkpoints of --gb GiB each, then times:
+  * the legacy single-threaded read() loop, one file after another
+  * modules.hashes.calculate_sha256 (memory-mapped), one file after another
+  * sha256_async for all files on the background pool (--workers threads)
+  * how long a non-blocking sha256() call keeps the caller waiting
+
+Run from anywhere with the webui's requirements installed; the hash cache
+goes to a temporary directory. Files are read once before timing, so the
+numbers are for a warm page cache.
+
+    python 04_content_generation/benchmarks/bench_model_hashing.py --files 4 --gb 2 --workers 4
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+WEBUI_DIR = Path(__file__).resolve().parents[1] / "stable-diffusion-webui"
+
+
+def legacy_sha256(filename):
+    hash_sha256 = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
+
+def write_file(path, size):
+    block = os.urandom(64 * 1024 * 1024)
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(block[:size - written])
+            written += min(len(block), size - written)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        run(args, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run(args, tmp):
+    os.environ["SD_WEBUI_CACHE_DIR"] = os.path.join(tmp, "cache")
+    os.environ["IGNORE_CMD_ARGS_ERRORS"] = "1"
+    sys.argv = sys.argv[:1]
+    sys.path.insert(0, str(WEBUI_DIR))
+    os.chdir(WEBUI_DIR)
+    from modules import hashes, shared
+
+    shared.opts.hash_workers = args.workers
+
+    size = int(args.gb * (1 << 30))
+    files = [os.path.join(tmp, f"model{i}.safetensors") for i in range(args.files)]
+    for path in files:
+        write_file(path, size)
+        legacy_sha256(path)  # warm the page cache
+    total = size * len(files) / (1 << 20)
+    print(f"{len(files)} files x {args.gb} GiB")
+
+    start = time.perf_counter()
+    expected = [legacy_sha256(path) for path in files]
+    elapsed = time.perf_counter() - start
+    print(f"legacy read() loop, sequential      {total / elapsed:8.0f} MiB/s")
+
+    start = time.perf_counter()
+    got = [hashes.calculate_sha256(path) for path in files]
+    elapsed = time.perf_counter() - start
+    assert got == expected
+    print(f"mmap, sequential                    {total / elapsed:8.0f} MiB/s")
+
+    start = time.perf_counter()
+    futures = [hashes.sha256_async(path, f"checkpoint/{i}") for i, path in enumerate(files)]
+    waited = time.perf_counter() - start
+    got = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+    assert got == expected
+    print(f"mmap, background pool ({args.workers} workers)    {total / elapsed:8.0f} MiB/s")
+    print(f"time to queue all files             {waited * 1000:8.1f} ms")
+
+    path = os.path.join(tmp, "new_model.safetensors")
+    write_file(path, size)
+    start = time.perf_counter()
+    value = hashes.sha256(path, "checkpoint/new", blocking=False)
+    print(f"non-blocking sha256() of a new file {(time.perf_counter() - start) * 1000:8.1f} ms (returned {value})")
+    start = time.perf_counter()
+    value = hashes.sha256(path, "checkpoint/new")
+    print(f"blocking sha256() of the same file  {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""txt2img API batching: requests run one by one under the queue lock vs gathered by modules.api.batching.
+
+--clients threads each send --requests txt2img-like requests with their own
+prompt and seed and the same size, sampler and steps. A "request" is
+--steps denoising steps of a tiny CPU convolutional model (--layers convs,
+16 channels) on a 4 x --latent x --latent latent. The model is small enough
+that per-call overhead dominates at batch size 1, the way it does for a UNet
+on a GPU; with a large --latent the CPU is compute-bound and batching does
+not help. Reports images per second for:
+  * one request at a time under the queue lock (current behaviour)
+  * RequestBatcher with a --window ms gathering window
+
+    python 04_content_generation/benchmarks/bench_txt2img_batching.py --clients 8 --requests 4
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import torch
+
+WEBUI_DIR = Path(__file__).resolve().parents[1] / "stable-diffusion-webui"
+
+
+class TinyDenoiser(torch.nn.Module):
+    def __init__(self, layers, channels=16):
+        super().__init__()
+        modules = [torch.nn.Conv2d(4, channels, 3, padding=1)]
+        for _ in range(layers):
+            modules += [torch.nn.SiLU(), torch.nn.Conv2d(channels, channels, 3, padding=1)]
+        modules += [torch.nn.SiLU(), torch.nn.Conv2d(channels, 4, 3, padding=1)]
+        self.net = torch.nn.Sequential(*modules)
+
+    def forward(self, x):
+        return self.net(x)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--latent", type=int, default=16)
+    parser.add_argument("--layers", type=int, default=12)
+    parser.add_argument("--window", type=float, default=50)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(WEBUI_DIR))
+    from modules.api import batching
+
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+    model = TinyDenoiser(args.layers).eval()
+    queue_lock = threading.Lock()
+
+    def generate(seeds):
+        latents = torch.stack([torch.randn(4, args.latent, args.latent, generator=torch.Generator().manual_seed(seed)) for seed in seeds])
+        with torch.no_grad():
+            for _ in range(args.steps):
+                latents = latents - 0.05 * model(latents)
+        return list(latents)
+
+    def run_batch(requests):
+        return generate([seed for _, seed in requests])
+
+    def unbatched(prompt, seed):
+        with queue_lock:
+            return generate([seed])[0]
+
+    batcher = batching.RequestBatcher(queue_lock, run_batch, window=lambda: args.window / 1000, max_batch_size=lambda: args.max_batch_size)
+
+    def batched(prompt, seed):
+        return batcher.submit((args.latent, "Euler a", args.steps), (prompt, seed))
+
+    def bench(send):
+        results = {}
+
+        def client(c):
+            for r in range(args.requests):
+                seed = c * 1000 + r
+                results[seed] = send(f"client {c} prompt {r}", seed)
+
+        threads = [threading.Thread(target=client, args=(c,)) for c in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return len(results) / (time.perf_counter() - start), results
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.steps} steps, {args.latent}x{args.latent} latent, 1 CPU thread")
+    rate, expected = bench(unbatched)
+    print(f"one at a time              {rate:7.1f} images/s")
+    rate, got = bench(batched)
+    same = all(torch.allclose(expected[k], got[k], atol=1e-4) for k in expected)
+    print(f"batched ({args.window:.0f} ms window)      {rate:7.1f} images/s  "
+          f"mean batch {batcher.requests / batcher.batches:.1f}, same images as unbatched: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+import uuid
+
+
+class GenerationJobs:
+    """Background job queue for asset generation.
+
+    ``submit`` returns immediately with a job record; worker threads call
+    ``runner(prompt_file, progress)`` one job at a time each, and the runner
+    reports ``progress(done, total, message)`` into the record. Submitting a
+    prompt file that is already queued or running returns the existing job,
+    so a burst of trigger calls produces one generation run rather than one
+    per subscriber.
+    """
+
+    def __init__(self, runner, workers=1, keep_finished=1000):
+        self.runner = runner
+        self.keep_finished = keep_finished
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._jobs = {}
+        self._active = {}  # prompt_file -> job id while queued or running
+        self._finished = []
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"generation-worker-{i}", daemon=True).start()
+
+    def submit(self, prompt_file):
+        with self._lock:
+            job_id = self._active.get(prompt_file)
+            if job_id is not None:
+                return dict(self._jobs[job_id])
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "prompt_file": prompt_file,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {"done": 0, "total": None, "message": None},
+                "output": None,
+                "error": None,
+                "version": 0,
+            }
+            self._jobs[job["job_id"]] = job
+            self._active[prompt_file] = job["job_id"]
+        self._queue.put(job["job_id"])
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, version, timeout=None):
+        """Block until the job's ``version`` moves past ``version``; returns the job record."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["version"] > version, timeout)
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id, **fields):
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(fields, version=job["version"] + 1)
+            self._changed.notify_all()
+
+    def _finish(self, job_id, **fields):
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(fields, finished_at=time.time(), version=job["version"] + 1)
+            self._changed.notify_all()
+            self._active.pop(job["prompt_file"], None)
+            self._finished.append(job_id)
+            # Finished jobs stay queryable for a while, then age out.
+            while len(self._finished) > self.keep_finished:
+                self._jobs.pop(self._finished.pop(0), None)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+
+            def progress(done, total, message=None):
+                self._update(job_id, progress={"done": done, "total": total, "message": message})
+
+            try:
+                output = self.runner(self._jobs[job_id]["prompt_file"], progress)
+            except Exception as e:
+                self._finish(job_id, status="failed", error=str(e))
+            else:
+                self._finish(job_id, status="succeeded", output=output)
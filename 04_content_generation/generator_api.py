@@ -1,25 +1,56 @@
 
-from flask import Flask, request, jsonify
-import subprocess
+from flask import Flask, Response, request, jsonify
+import json
 import os
 
+from generation_jobs import GenerationJobs
+from pipeline_runners import make_pipeline
+
 app = Flask(__name__)
 
+DEFAULT_PROMPT_FILE = "prompt_templates/cover_image_prompts.json"
+
+# GENERATION_MODE=resident keeps the pipeline and its model loaded between
+# requests; /generate-assets and the job pool share it.
+run_generation = make_pipeline(os.getenv("GENERATION_MODE", "subprocess"))
+jobs = GenerationJobs(run_generation, workers=int(os.getenv("GENERATION_WORKERS", "1")))
+
 @app.route("/generate-assets", methods=["POST"])
 def generate_assets():
-    prompt_file = request.json.get("prompt_file", "prompt_templates/cover_image_prompts.json")
+    prompt_file = request.json.get("prompt_file", DEFAULT_PROMPT_FILE)
     try:
-        result = subprocess.run(
-            ["python", "pipeline_prototype/prompt_to_image.py", prompt_file],
-            capture_output=True, text=True, timeout=1800
-        )
-        if result.returncode == 0:
-            return jsonify({"status": "success", "output": result.stdout})
-        else:
-            return jsonify({"status": "error", "error": result.stderr}), 500
+        return jsonify({"status": "success", "output": run_generation(prompt_file)})
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)}), 500
 
+@app.route("/generation-jobs", methods=["POST"])
+def submit_generation_job():
+    prompt_file = (request.json or {}).get("prompt_file", DEFAULT_PROMPT_FILE)
+    return jsonify(jobs.submit(prompt_file)), 202
+
+@app.route("/generation-jobs/<job_id>", methods=["GET"])
+def get_generation_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/generation-jobs/<job_id>/events", methods=["GET"])
+def stream_generation_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def events(job):
+        # Server-sent events: one message per progress update until the job ends.
+        while job is not None:
+            yield f"data: {json.dumps(job)}\n\n"
+            if job["status"] in ("succeeded", "failed"):
+                return
+            job = jobs.wait(job_id, job["version"], timeout=15)
+
+    return Response(events(job), mimetype="text/event-stream")
+
 @app.route("/manifest", methods=["GET"])
 def get_manifest():
     try:
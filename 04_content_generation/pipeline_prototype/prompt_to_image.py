@@ -1,3 +1,21 @@
 # Generate image from text prompt using Stable Diffusion
+import json
+import sys
+
 def generate_image(prompt):
     print(f'Generating image for: {prompt}')
+
+def load_prompts(prompt_file):
+    with open(prompt_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get("prompts", [])
+
+def run(prompt_file, progress=None):
+    prompts = load_prompts(prompt_file)
+    for i, prompt in enumerate(prompts):
+        generate_image(prompt)
+        if progress:
+            progress(i + 1, len(prompts), prompt)
+    return len(prompts)
+
+if __name__ == "__main__":
+    run(sys.argv[1])
@@ -0,0 +1,100 @@
+import importlib.util
+import subprocess
+import sys
+import threading
+import time
+
+PIPELINE_SCRIPT = "pipeline_prototype/prompt_to_image.py"
+
+
+class SubprocessPipeline:
+    """Runs the pipeline script in a fresh interpreter for every job."""
+
+    def __init__(self, script=PIPELINE_SCRIPT, python=sys.executable, timeout=1800):
+        self.script = script
+        self.python = python
+        self.timeout = timeout
+
+    def __call__(self, prompt_file, progress=None):
+        result = subprocess.run(
+            [self.python, self.script, prompt_file],
+            capture_output=True, text=True, timeout=self.timeout
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        return result.stdout
+
+
+class ResidentPipeline:
+    """Imports the pipeline script once and keeps it (and any model it loads) in memory.
+
+    The script must expose ``run(prompt_file, progress=None)``; if it also
+    defines ``load_model()`` that is called once up front. Jobs share the
+    resident module, so calls are serialized.
+
+    A job that takes longer than ``timeout`` seconds (counting the wait for
+    an earlier job) raises ``TimeoutError``, like the subprocess mode. A
+    running call can't be killed, so it keeps the pipeline busy until it
+    returns and its later progress updates are dropped.
+    """
+
+    def __init__(self, script=PIPELINE_SCRIPT, timeout=1800):
+        self.script = script
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._module = None
+
+    def load(self):
+        if self._module is not None:
+            return self._module
+        with self._lock:
+            if self._module is None:
+                spec = importlib.util.spec_from_file_location("resident_pipeline", self.script)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                if hasattr(module, "load_model"):
+                    module.load_model()
+                self._module = module
+        return self._module
+
+    def __call__(self, prompt_file, progress=None):
+        deadline = time.monotonic() + self.timeout
+        module = self.load()
+        if not self._lock.acquire(timeout=max(0, deadline - time.monotonic())):
+            raise TimeoutError(f"Pipeline still busy with an earlier job after {self.timeout} s")
+
+        abandoned = threading.Event()
+        outcome = {}
+
+        def report(done, total, message=None):
+            if progress and not abandoned.is_set():
+                progress(done, total, message)
+
+        def run():
+            try:
+                outcome["output"] = module.run(prompt_file, progress=report)
+            except Exception as e:
+                outcome["error"] = e
+            except BaseException as e:
+                # SystemExit/KeyboardInterrupt from the script must not stop the caller's worker.
+                outcome["error"] = RuntimeError(f"Pipeline script raised {type(e).__name__}: {e}")
+            finally:
+                self._lock.release()
+
+        thread = threading.Thread(target=run, name="resident-pipeline-run", daemon=True)
+        thread.start()
+        thread.join(max(0, deadline - time.monotonic()))
+        if thread.is_alive():
+            abandoned.set()
+            raise TimeoutError(f"Generation did not finish within {self.timeout} s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["output"]
+
+
+def make_pipeline(mode, script=PIPELINE_SCRIPT):
+    if mode == "resident":
+        return ResidentPipeline(script)
+    if mode == "subprocess":
+        return SubprocessPipeline(script)
+    raise ValueError(f"Unknown generation mode: {mode}")
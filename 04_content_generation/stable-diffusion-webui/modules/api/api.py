@@ -1,4 +1,5 @@
 import base64
+import binascii
 import io
 import os
 import time
@@ -17,10 +18,10 @@ from fastapi.encoders import jsonable_encoder
 from secrets import compare_digest
 
 import modules.shared as shared
-from modules import sd_samplers, deepbooru, sd_hijack, images, scripts, ui, postprocessing, errors, restart, shared_items, script_callbacks, infotext_utils, sd_models, sd_schedulers
-from modules.api import models
+from modules import sd_samplers, deepbooru, sd_hijack, images, scripts, ui, postprocessing, errors, restart, shared_items, script_callbacks, infotext_utils, sd_models, sd_schedulers, sd_conds_cache, job_scheduler
+from modules.api import models, batching
 from modules.shared import opts
-from modules.processing import StableDiffusionProcessingTxt2Img, StableDiffusionProcessingImg2Img, process_images
+from modules.processing import StableDiffusionProcessingTxt2Img, StableDiffusionProcessingImg2Img, Processed, process_images, get_fixed_seed
 from modules.textual_inversion.textual_inversion import create_embedding, train_embedding
 from modules.hypernetworks.hypernetwork import create_hypernetwork, train_hypernetwork
 from PIL import PngImagePlugin
@@ -30,8 +31,8 @@ from modules import devices
 from typing import Any
 import piexif
 import piexif.helper
-from contextlib import closing
-from modules.progress import create_task_id, add_task_to_queue, start_task, finish_task, current_task
+from contextlib import closing, contextmanager
+from modules.progress import create_task_id, add_task_to_queue, start_task, finish_task, current_task, pending_tasks
 
 def script_name_to_index(name, scripts):
     try:
@@ -207,6 +208,7 @@ class Api:
         self.router = APIRouter()
         self.app = app
         self.queue_lock = queue_lock
+        self.txt2img_batcher = batching.RequestBatcher(queue_lock, self.run_txt2img_batch, window=lambda: opts.api_txt2img_batch_window / 1000, max_batch_size=lambda: opts.api_txt2img_batch_max_size)
         api_middleware(self.app)
         self.add_api_route("/sdapi/v1/txt2img", self.text2imgapi, methods=["POST"], response_model=models.TextToImageResponse)
         self.add_api_route("/sdapi/v1/img2img", self.img2imgapi, methods=["POST"], response_model=models.ImageToImageResponse)
@@ -239,6 +241,8 @@ class Api:
         self.add_api_route("/sdapi/v1/train/embedding", self.train_embedding, methods=["POST"], response_model=models.TrainResponse)
         self.add_api_route("/sdapi/v1/train/hypernetwork", self.train_hypernetwork, methods=["POST"], response_model=models.TrainResponse)
         self.add_api_route("/sdapi/v1/memory", self.get_memory, methods=["GET"], response_model=models.MemoryResponse)
+        self.add_api_route("/sdapi/v1/checkpoint-cache", self.get_checkpoint_cache, methods=["GET"], response_model=models.CheckpointCacheResponse)
+        self.add_api_route("/sdapi/v1/conditioning-cache", self.get_conditioning_cache, methods=["GET"], response_model=models.ConditioningCacheResponse)
         self.add_api_route("/sdapi/v1/unload-checkpoint", self.unloadapi, methods=["POST"])
         self.add_api_route("/sdapi/v1/reload-checkpoint", self.reloadapi, methods=["POST"])
         self.add_api_route("/sdapi/v1/scripts", self.get_scripts_list, methods=["GET"], response_model=models.ScriptsList)
@@ -429,7 +433,70 @@ class Api:
 
         return params
 
-    def text2imgapi(self, txt2imgreq: models.StableDiffusionTxt2ImgProcessingAPI):
+    def request_client(self, request: Request = None):
+        """Returns (client, trusted): who a request is queued for, and whether its X-Priority header is honored.
+
+        With --api-auth, the client is the authenticated API user, who is trusted. Otherwise it is the client's address;
+        addresses listed in the queue_trusted_clients setting (e.g. a gateway serving several users) are trusted and may
+        name the client they act for with X-Client-Id. Other callers' headers are ignored, so that they can't jump the
+        queue or get around per-client limits by making up client ids.
+        """
+
+        if request is None:
+            return "", False
+
+        authorization = request.headers.get("Authorization", "")
+        if shared.cmd_opts.api_auth and authorization.startswith("Basic "):
+            try:
+                return base64.b64decode(authorization[6:]).decode("utf-8").split(":", 1)[0], True
+            except (ValueError, binascii.Error):
+                pass
+
+        address = request.client.host if request.client else ""
+        trusted = address in [x.strip() for x in opts.queue_trusted_clients.split(",") if x.strip()]
+        if trusted:
+            return request.headers.get("X-Client-Id") or address, True
+
+        return address, False
+
+    @contextmanager
+    def queued_job(self, request: Request = None, task_id=None):
+        """Holds queue_lock for a job of the request's client, with the X-Priority (high, normal, low) of a trusted request;
+        responds with 429 if the queue_max_pending or queue_max_pending_per_client limit is reached"""
+
+        if not isinstance(self.queue_lock, job_scheduler.JobScheduler):
+            with self.queue_lock:
+                yield
+            return
+
+        client, trusted = self.request_client(request)
+        priority = request.headers.get("X-Priority", "normal").lower() if trusted else "normal"
+
+        try:
+            self.queue_lock.acquire(priority=priority, client=client, task_id=task_id, limited=True)
+        except job_scheduler.QueueFullError as e:
+            pending_tasks.pop(task_id, None)
+            raise HTTPException(status_code=429, detail=str(e)) from e
+
+        try:
+            yield
+        finally:
+            self.queue_lock.release()
+
+    def check_batched_job(self, client, pending, task_id=None):
+        """Applies the queue_max_pending limits to a request about to wait for a txt2img batch, counting the pending
+        requests of txt2img_batcher as queued jobs; responds with 429 like queued_job"""
+
+        if not isinstance(self.queue_lock, job_scheduler.JobScheduler):
+            return
+
+        try:
+            self.queue_lock.check_limits(client, [(pending_client, data[0]) for pending_client, data in pending])
+        except job_scheduler.QueueFullError as e:
+            pending_tasks.pop(task_id, None)
+            raise HTTPException(status_code=429, detail=str(e)) from e
+
+    def text2imgapi(self, txt2imgreq: models.StableDiffusionTxt2ImgProcessingAPI, request: Request = None):
         task_id = txt2imgreq.force_task_id or create_task_id("txt2img")
 
         script_runner = scripts.scripts_txt2img
@@ -464,32 +531,92 @@ class Api:
 
         add_task_to_queue(task_id)
 
-        with self.queue_lock:
-            with closing(StableDiffusionProcessingTxt2Img(sd_model=shared.sd_model, **args)) as p:
-                p.is_api = True
-                p.scripts = script_runner
-                p.outpath_grids = opts.outdir_txt2img_grids
-                p.outpath_samples = opts.outdir_txt2img_samples
-
-                try:
-                    shared.state.begin(job="scripts_txt2img")
-                    start_task(task_id)
-                    if selectable_scripts is not None:
-                        p.script_args = script_args
-                        processed = scripts.scripts_txt2img.run(p, *p.script_args) # Need to pass args as list here
-                    else:
-                        p.script_args = tuple(script_args) # Need to pass args as tuple here
-                        processed = process_images(p)
-                    finish_task(task_id)
-                finally:
-                    shared.state.end()
-                    shared.total_tqdm.clear()
+        if opts.api_txt2img_batch_window > 0 and selectable_scripts is None and not txt2imgreq.alwayson_scripts and args.get('batch_size', 1) == 1 and args.get('n_iter', 1) == 1 and isinstance(args.get('prompt'), str):
+            client, _ = self.request_client(request)
+            processed = self.txt2img_batcher.submit(batching.txt2img_batch_key(args, script_args), (task_id, args, script_args), lock=self.queued_job(request, task_id),
+                                                    client=client, check=lambda client, pending: self.check_batched_job(client, pending, task_id))
+        else:
+            with self.queued_job(request, task_id):
+                with closing(StableDiffusionProcessingTxt2Img(sd_model=shared.sd_model, **args)) as p:
+                    p.is_api = True
+                    p.scripts = script_runner
+                    p.outpath_grids = opts.outdir_txt2img_grids
+                    p.outpath_samples = opts.outdir_txt2img_samples
+
+                    try:
+                        shared.state.begin(job="scripts_txt2img")
+                        start_task(task_id)
+                        if selectable_scripts is not None:
+                            p.script_args = script_args
+                            processed = scripts.scripts_txt2img.run(p, *p.script_args) # Need to pass args as list here
+                        else:
+                            p.script_args = tuple(script_args) # Need to pass args as tuple here
+                            processed = process_images(p)
+                        finish_task(task_id)
+                    finally:
+                        shared.state.end()
+                        shared.total_tqdm.clear()
 
         b64images = list(map(encode_pil_to_base64, processed.images)) if send_images else []
 
         return models.TextToImageResponse(images=b64images, parameters=vars(txt2imgreq), info=processed.js())
 
-    def img2imgapi(self, img2imgreq: models.StableDiffusionImg2ImgProcessingAPI):
+    def run_txt2img_batch(self, requests):
+        """Runs txt2img requests gathered by txt2img_batcher as one batch, with each request's prompts and seeds; called with queue_lock held.
+
+        Returns one Processed per request, with that request's image."""
+
+        task_ids = [task_id for task_id, _, _ in requests]
+        _, args, script_args = requests[0]
+        args = dict(
+            args,
+            prompt=[x['prompt'] for _, x, _ in requests],
+            negative_prompt=[x.get('negative_prompt') or '' for _, x, _ in requests],
+            seed=[get_fixed_seed(x.get('seed', -1)) for _, x, _ in requests],
+            subseed=[get_fixed_seed(x.get('subseed', -1)) for _, x, _ in requests],
+            batch_size=len(requests),
+            n_iter=1,
+            do_not_save_grid=True,
+        )
+
+        with closing(StableDiffusionProcessingTxt2Img(sd_model=shared.sd_model, **args)) as p:
+            p.is_api = True
+            p.scripts = scripts.scripts_txt2img
+            p.outpath_grids = opts.outdir_txt2img_grids
+            p.outpath_samples = opts.outdir_txt2img_samples
+
+            try:
+                shared.state.begin(job="scripts_txt2img")
+                for task_id in task_ids:
+                    start_task(task_id)
+                p.script_args = tuple(script_args)
+                processed = process_images(p)
+                for task_id in task_ids:
+                    finish_task(task_id)
+            finally:
+                shared.state.end()
+                shared.total_tqdm.clear()
+
+            res = []
+            for i in range(len(requests)):
+                index = processed.index_of_first_image + i
+                infotexts = processed.infotexts[index:index + 1]
+                res.append(Processed(
+                    p,
+                    processed.images[index:index + 1],
+                    seed=p.all_seeds[i],
+                    info=infotexts[0] if infotexts else processed.info,
+                    subseed=p.all_subseeds[i],
+                    all_prompts=[p.all_prompts[i]],
+                    all_negative_prompts=[p.all_negative_prompts[i]],
+                    all_seeds=[p.all_seeds[i]],
+                    all_subseeds=[p.all_subseeds[i]],
+                    infotexts=infotexts,
+                ))
+
+            return res
+
+    def img2imgapi(self, img2imgreq: models.StableDiffusionImg2ImgProcessingAPI, request: Request = None):
         task_id = img2imgreq.force_task_id or create_task_id("img2img")
 
         init_images = img2imgreq.init_images
@@ -534,7 +661,7 @@ class Api:
 
         add_task_to_queue(task_id)
 
-        with self.queue_lock:
+        with self.queued_job(request, task_id):
             with closing(StableDiffusionProcessingImg2Img(sd_model=shared.sd_model, **args)) as p:
                 p.init_images = [decode_base64_to_image(x) for x in init_images]
                 p.is_api = True
@@ -564,23 +691,23 @@ class Api:
 
         return models.ImageToImageResponse(images=b64images, parameters=vars(img2imgreq), info=processed.js())
 
-    def extras_single_image_api(self, req: models.ExtrasSingleImageRequest):
+    def extras_single_image_api(self, req: models.ExtrasSingleImageRequest, request: Request = None):
         reqDict = setUpscalers(req)
 
         reqDict['image'] = decode_base64_to_image(reqDict['image'])
 
-        with self.queue_lock:
+        with self.queued_job(request):
             result = postprocessing.run_extras(extras_mode=0, image_folder="", input_dir="", output_dir="", save_output=False, **reqDict)
 
         return models.ExtrasSingleImageResponse(image=encode_pil_to_base64(result[0][0]), html_info=result[1])
 
-    def extras_batch_images_api(self, req: models.ExtrasBatchImagesRequest):
+    def extras_batch_images_api(self, req: models.ExtrasBatchImagesRequest, request: Request = None):
         reqDict = setUpscalers(req)
 
         image_list = reqDict.pop('imageList', [])
         image_folder = [decode_base64_to_image(x.data) for x in image_list]
 
-        with self.queue_lock:
+        with self.queued_job(request):
             result = postprocessing.run_extras(extras_mode=1, image_folder=image_folder, image="", input_dir="", output_dir="", save_output=False, **reqDict)
 
         return models.ExtrasBatchImagesResponse(images=list(map(encode_pil_to_base64, result[0])), html_info=result[1])
@@ -883,6 +1010,12 @@ class Api:
             cuda = {'error': f'{err}'}
         return models.MemoryResponse(ram=ram, cuda=cuda)
 
+    def get_checkpoint_cache(self):
+        return models.CheckpointCacheResponse(**sd_models.checkpoints_loaded.stats())
+
+    def get_conditioning_cache(self):
+        return models.ConditioningCacheResponse(**sd_conds_cache.cache.stats())
+
     def get_extensions_list(self):
         from modules import extensions
         extensions.list_extensions()
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+# txt2img arguments that may differ between requests in one batch
+txt2img_varying_args = ('prompt', 'negative_prompt', 'seed', 'subseed', 'force_task_id')
+
+
+class PendingRequest:
+    def __init__(self, key, data, client=None):
+        self.key = key
+        self.data = data
+        self.client = client
+        self.taken = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestBatcher:
+    """Gathers compatible requests that arrive within a short window and runs them together.
+
+    Each request comes with a key; only requests with equal keys are combined. The first pending request for a key
+    leads: it waits up to window() seconds (less if max_batch_size() requests have gathered), then takes the queue lock
+    and, once it has it, takes every pending request for the key, up to max_batch_size(), including those that came in
+    while it was waiting for the lock. window and max_batch_size are functions, so that changed settings apply to the next
+    request. run_batch(list of request data) is called under the queue lock and must return one result per request, in
+    order. The other requests just wait for their result. If run_batch raises, or returns the wrong number of results,
+    every request in the batch gets the exception.
+
+    submit can be given the lock (any context manager) to take instead of queue_lock, for example to queue the batch
+    with the leading request's priority. If taking it fails, only the leading request fails and the next one leads.
+
+    submit can also be given a check, called as check(client, [(client, data) of every pending request]) before the
+    request joins them; if it raises, so does submit, and the request is not added. This is how queue limits apply to
+    requests that would otherwise wait for a batch without ever queueing for the lock themselves.
+    """
+
+    def __init__(self, queue_lock, run_batch, window=lambda: 0.05, max_batch_size=lambda: 8):
+        self.queue_lock = queue_lock
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.pending = []
+        self.cond = threading.Condition()
+        self.batches = 0
+        self.requests = 0
+
+    def is_leader(self, request):
+        return next(x for x in self.pending if x.key == request.key) is request
+
+    def count(self, key):
+        return sum(1 for x in self.pending if x.key == key)
+
+    def take(self, key, max_batch_size):
+        batch = [x for x in self.pending if x.key == key][:max_batch_size]
+        for x in batch:
+            x.taken = True
+            self.pending.remove(x)
+
+        self.cond.notify_all()
+        return batch
+
+    def submit(self, key, data, lock=None, client=None, check=None):
+        request = PendingRequest(key, data, client)
+        deadline = time.monotonic() + self.window()
+        max_batch_size = max(1, int(self.max_batch_size()))
+
+        with self.cond:
+            if check is not None:
+                check(client, [(x.client, x.data) for x in self.pending])
+
+            self.pending.append(request)
+            self.cond.notify_all()
+
+            while not request.taken and not self.is_leader(request):
+                self.cond.wait()
+
+            while not request.taken and self.count(key) < max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                self.cond.wait(remaining)
+
+        if not request.taken:
+            try:
+                with lock or self.queue_lock:
+                    with self.cond:
+                        batch = self.take(key, max_batch_size)
+
+                    self.run(batch)
+            except Exception:
+                with self.cond:
+                    if not request.taken:
+                        self.pending.remove(request)
+                        self.cond.notify_all()
+                raise
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+
+        return request.result
+
+    def run(self, batch):
+        try:
+            results = self.run_batch([x.data for x in batch])
+        except Exception as e:  # noqa: BLE001 - handed to every request in the batch, which re-raises it
+            self.fail(batch, e)
+            return
+
+        if len(results) != len(batch):
+            self.fail(batch, RuntimeError(f"run_batch returned {len(results)} results for a batch of {len(batch)} requests"))
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+
+        for x, result in zip(batch, results):
+            x.result = result
+            x.done.set()
+
+    @staticmethod
+    def fail(batch, error):
+        for x in batch:
+            x.error = error
+            x.done.set()
+
+
+def prompt_chunk_count(clip, texts):
+    """number of 75-token chunks the text encoder makes of texts encoded together, as get_learned_conditioning does for the schedule of one prompt"""
+
+    batch_chunks, _ = clip.process_texts(texts)
+    return max(len(chunks) for chunks in batch_chunks)
+
+
+def txt2img_prompt_shape(prompt, negative_prompt, steps):
+    """What a txt2img prompt and negative prompt must share with the others in a batch to give the same image as alone:
+    the extra networks, which are taken from the first prompt of a batch, and the length of the conds. Conds of different
+    lengths are padded to the longest (positive prompts) or can't be put in one tensor at all (negative prompts)."""
+
+    from modules import extra_networks, prompt_parser, sd_hijack
+
+    clip = sd_hijack.model_hijack.clip
+    if not hasattr(clip, "process_texts"):
+        return prompt, negative_prompt  # can't count chunks with this text encoder, so only identical prompts are batched
+
+    text, extra_network_data = extra_networks.parse_prompt(prompt)
+    networks = sorted((name, [params.items for params in params_list]) for name, params_list in extra_network_data.items())
+
+    _, prompt_flat_list, _ = prompt_parser.get_multicond_prompt_list([text])
+    schedules = prompt_parser.get_learned_conditioning_prompt_schedules(prompt_flat_list, steps)
+    chunks = max(prompt_chunk_count(clip, [x for _, x in schedule]) for schedule in schedules)
+
+    negative_text, _ = extra_networks.parse_prompt(negative_prompt)
+    negative_schedule, = prompt_parser.get_learned_conditioning_prompt_schedules([negative_text], steps)
+    negative_chunks = prompt_chunk_count(clip, [x for _, x in negative_schedule])
+
+    return networks, chunks, negative_chunks
+
+
+def txt2img_batch_key(args, script_args):
+    """txt2img requests can be run in one batch if everything apart from prompts and seeds is the same, and the
+    prompts have the same txt2img_prompt_shape"""
+
+    shared_args = {k: v for k, v in args.items() if k not in txt2img_varying_args}
+    shape = txt2img_prompt_shape(args['prompt'], args.get('negative_prompt') or '', args.get('steps', 20))
+    return json.dumps([shared_args, script_args, shape], sort_keys=True, default=str)
@@ -299,6 +299,28 @@ class MemoryResponse(BaseModel):
     cuda: dict = Field(title="CUDA", description="nVidia CUDA memory stats")
 
 
+class CheckpointCacheResponse(BaseModel):
+    budget: int = Field(title="Budget", description="RAM budget for cached checkpoints in bytes")
+    max_mapped: int = Field(title="Max mapped", description="Maximum number of cached checkpoints that are memory-mapped from .safetensors files")
+    used: int = Field(title="Used", description="Bytes of cached checkpoints counted against the budget")
+    mapped: int = Field(title="Mapped", description="Bytes of cached checkpoints that are memory-mapped from .safetensors files")
+    hits: int = Field(title="Hits")
+    misses: int = Field(title="Misses")
+    evictions: int = Field(title="Evictions")
+    hit_rate: float = Field(title="Hit rate")
+    entries: list = Field(title="Entries", description="Cached checkpoints, least recently used first")
+
+
+class ConditioningCacheResponse(BaseModel):
+    budget: int = Field(title="Budget", description="VRAM budget for cached conds in bytes; conds stay on the device")
+    used: int = Field(title="Used", description="Bytes of cached conds")
+    entries: int = Field(title="Entries", description="Number of cached prompts")
+    hits: int = Field(title="Hits")
+    misses: int = Field(title="Misses")
+    evictions: int = Field(title="Evictions")
+    hit_rate: float = Field(title="Hit rate")
+
+
 class ScriptsList(BaseModel):
     txt2img: list = Field(default=None, title="Txt2img", description="Titles of scripts (txt2img)")
     img2img: list = Field(default=None, title="Img2img", description="Titles of scripts (img2img)")
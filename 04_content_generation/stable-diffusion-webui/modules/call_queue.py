@@ -3,9 +3,17 @@ from functools import wraps
 import html
 import time
 
-from modules import shared, progress, errors, devices, fifo_lock, profiling
+from modules import shared, progress, errors, devices, job_scheduler, profiling
 
-queue_lock = fifo_lock.FIFOLock()
+queue_lock = job_scheduler.JobScheduler()
+
+
+def configure_queue():
+    queue_lock.configure(
+        policy=shared.opts.queue_scheduler,
+        max_pending=int(shared.opts.queue_max_pending),
+        max_pending_per_client=int(shared.opts.queue_max_pending_per_client),
+    )
 
 
 def wrap_queued_call(func):
@@ -29,7 +37,7 @@ def wrap_gradio_gpu_call(func, extra_outputs=None):
         else:
             id_task = None
 
-        with queue_lock:
+        with queue_lock.job(task_id=id_task, client="ui"):
             shared.state.begin(job=id_task)
             progress.start_task(id_task)
 
@@ -1,5 +1,8 @@
 import hashlib
+import mmap
 import os.path
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from modules import shared
 import modules.cache
@@ -7,58 +10,106 @@ import modules.cache
 dump_cache = modules.cache.dump_cache
 cache = modules.cache.cache
 
+blksize = 16 * 1024 * 1024
+
+hashing_executor = None
+hashing_executor_lock = threading.Lock()
+pending = {}
+pending_lock = threading.Lock()
+
+
+def sha256_of_file(file, offset=0):
+    """sha256 of an open binary file from offset to the end; reads through a memory map when possible."""
 
-def calculate_sha256(filename):
     hash_sha256 = hashlib.sha256()
-    blksize = 1024 * 1024
 
-    with open(filename, "rb") as f:
-        for chunk in iter(lambda: f.read(blksize), b""):
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError, AttributeError):
+        mapped = None  # empty files can't be mapped; neither can some file-like objects
+
+    if mapped is None:
+        file.seek(offset)
+        for chunk in iter(lambda: file.read(blksize), b""):
             hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
+
+    with mapped, memoryview(mapped) as view:
+        # hashlib releases the GIL for large buffers, so several files can be hashed in parallel threads
+        for start in range(offset, len(view), blksize):
+            hash_sha256.update(view[start:start + blksize])
 
     return hash_sha256.hexdigest()
 
 
+def calculate_sha256(filename):
+    with open(filename, "rb") as f:
+        return sha256_of_file(f)
+
+
+def file_signature(filename):
+    """(path, size, mtime_ns, inode) of the file; a cached hash is only valid while all four are unchanged"""
+
+    st = os.stat(filename)
+    return [os.path.abspath(filename), st.st_size, st.st_mtime_ns, st.st_ino]
+
+
 def sha256_from_cache(filename, title, use_addnet_hash=False):
     hashes = cache("hashes-addnet") if use_addnet_hash else cache("hashes")
     try:
-        ondisk_mtime = os.path.getmtime(filename)
+        signature = file_signature(filename)
     except FileNotFoundError:
         return None
 
     if title not in hashes:
         return None
 
-    cached_sha256 = hashes[title].get("sha256", None)
-    cached_mtime = hashes[title].get("mtime", 0)
+    entry = hashes[title]
+    cached_sha256 = entry.get("sha256", None)
+    if cached_sha256 is None:
+        return None
+
+    cached_signature = entry.get("signature", None)
+    if cached_signature is not None:
+        return cached_sha256 if cached_signature == signature else None
 
-    if ondisk_mtime > cached_mtime or cached_sha256 is None:
+    # entries written before signatures were recorded only have mtime
+    if signature[2] / 1e9 > entry.get("mtime", 0):
         return None
 
     return cached_sha256
 
 
-def sha256(filename, title, use_addnet_hash=False):
-    hashes = cache("hashes-addnet") if use_addnet_hash else cache("hashes")
+def get_hashing_executor():
+    global hashing_executor
 
-    sha256_value = sha256_from_cache(filename, title, use_addnet_hash)
-    if sha256_value is not None:
-        return sha256_value
+    if hashing_executor is None:
+        with hashing_executor_lock:
+            if hashing_executor is None:
+                workers = max(1, int(getattr(shared.opts, "hash_workers", 2) or 2))
+                hashing_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sha256")
 
-    if shared.cmd_opts.no_hashing:
-        return None
+    return hashing_executor
+
+
+def calculate_and_store(filename, title, use_addnet_hash=False):
+    hashes = cache("hashes-addnet") if use_addnet_hash else cache("hashes")
 
-    print(f"Calculating sha256 for {filename}: ", end='')
-    if use_addnet_hash:
-        with open(filename, "rb") as file:
+    # taken before hashing, so a file that changes mid-hash gets hashed again next time
+    signature = file_signature(filename)
+
+    with open(filename, "rb") as file:
+        if use_addnet_hash:
             sha256_value = addnet_hash_safetensors(file)
-    else:
-        sha256_value = calculate_sha256(filename)
-    print(f"{sha256_value}")
+        else:
+            sha256_value = sha256_of_file(file)
+
+    print(f"Calculated sha256 for {filename}: {sha256_value}")
 
     hashes[title] = {
-        "mtime": os.path.getmtime(filename),
+        "mtime": signature[2] / 1e9,
         "sha256": sha256_value,
+        "signature": signature,
     }
 
     dump_cache()
@@ -66,19 +117,67 @@ def sha256(filename, title, use_addnet_hash=False):
     return sha256_value
 
 
+def sha256_async(filename, title, use_addnet_hash=False):
+    """Returns a Future with the file's sha256; the hash is computed on the background hashing pool.
+
+    Cached hashes return an already completed Future. Requests for a file that is already being
+    hashed share the same Future. The result is None if hashing is disabled or the file is missing.
+    """
+
+    sha256_value = sha256_from_cache(filename, title, use_addnet_hash)
+    if sha256_value is not None or shared.cmd_opts.no_hashing or not os.path.exists(filename):
+        future = Future()
+        future.set_result(sha256_value)
+        return future
+
+    key = (os.path.abspath(filename), title, use_addnet_hash)
+    with pending_lock:
+        future = pending.get(key)
+        if future is None:
+            print(f"Queued sha256 calculation for {filename}")
+            future = get_hashing_executor().submit(calculate_and_store, filename, title, use_addnet_hash)
+            pending[key] = future
+            future.add_done_callback(lambda _: forget_pending(key))
+
+    return future
+
+
+def forget_pending(key):
+    with pending_lock:
+        pending.pop(key, None)
+
+
+def is_pending(filename, title, use_addnet_hash=False):
+    with pending_lock:
+        return (os.path.abspath(filename), title, use_addnet_hash) in pending
+
+
+def sha256(filename, title, use_addnet_hash=False, blocking=True):
+    """Returns the file's sha256, calculating it if needed.
+
+    With blocking=False, a hash that is not cached yet is queued on the background hashing pool
+    and None is returned right away; use sha256_async to be notified when it is ready.
+    """
+
+    sha256_value = sha256_from_cache(filename, title, use_addnet_hash)
+    if sha256_value is not None:
+        return sha256_value
+
+    if shared.cmd_opts.no_hashing:
+        return None
+
+    future = sha256_async(filename, title, use_addnet_hash)
+    if not blocking and not future.done():
+        return None
+
+    return future.result()
+
+
 def addnet_hash_safetensors(b):
     """kohya-ss hash for safetensors from https://github.com/kohya-ss/sd-scripts/blob/main/library/train_util.py"""
-    hash_sha256 = hashlib.sha256()
-    blksize = 1024 * 1024
-
     b.seek(0)
     header = b.read(8)
     n = int.from_bytes(header, "little")
 
     offset = n + 8
-    b.seek(offset)
-    for chunk in iter(lambda: b.read(blksize), b""):
-        hash_sha256.update(chunk)
-
-    return hash_sha256.hexdigest()
-
+    return sha256_of_file(b, offset)
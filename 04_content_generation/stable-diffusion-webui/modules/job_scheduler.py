@@ -0,0 +1,188 @@
+import collections
+import itertools
+import threading
+import time
+
+priorities = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, seq, priority, client, task_id):
+        self.seq = seq
+        self.priority = priorities.get(priority, priorities["normal"])
+        self.client = client
+        self.task_id = task_id
+        self.event = threading.Event()
+        self.started = None
+
+
+class JobScheduler:
+    """A lock that decides which waiting job runs next; a drop-in replacement for FIFOLock.
+
+    With policy "FIFO", jobs run in order of arrival, same as FIFOLock. With policy "Priority", the next job is the
+    waiting one with the highest priority class ("high", "normal", "low"); among those, the one whose client has used
+    the lock for the least time, and then the oldest one. A client that had nothing queued starts at the usage of the
+    least served client that does, so idle time doesn't turn into credit.
+
+    Jobs acquired with limited=True (API requests) are refused with QueueFullError instead of waiting if max_pending or
+    max_pending_per_client (0 = unlimited) waiting jobs are already queued; other acquisitions, including a plain
+    "with queue_lock:", always wait. The lock is handed directly to the next job on release. Usage of a client with
+    nothing queued is forgotten idle_timeout seconds after its last job.
+    """
+
+    def __init__(self, policy="FIFO", max_pending=0, max_pending_per_client=0, idle_timeout=600):
+        self.policy = policy
+        self.max_pending = max_pending
+        self.max_pending_per_client = max_pending_per_client
+        self.idle_timeout = idle_timeout
+        self.usage = collections.defaultdict(float)
+        self.last_active = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._owner = None
+        self._waiting = []
+
+    def configure(self, policy=None, max_pending=None, max_pending_per_client=None):
+        with self._lock:
+            if policy is not None:
+                self.policy = policy
+            if max_pending is not None:
+                self.max_pending = max_pending
+            if max_pending_per_client is not None:
+                self.max_pending_per_client = max_pending_per_client
+
+    def _order(self, job):
+        if self.policy == "Priority":
+            return job.priority, self.usage[job.client], job.seq
+
+        return job.seq
+
+    def _start(self, job):
+        job.started = time.monotonic()
+        self._owner = job
+
+    def _active_clients(self):
+        active = {job.client for job in self._waiting}
+        if self._owner is not None:
+            active.add(self._owner.client)
+
+        return active
+
+    def _catch_up(self, client):
+        active = self._active_clients()
+        if active and client not in active:
+            self.usage[client] = max(self.usage[client], min(self.usage[c] for c in active))
+
+    def _forget_idle(self, now):
+        active = self._active_clients()
+        for client, last_active in list(self.last_active.items()):
+            if client not in active and now - last_active > self.idle_timeout:
+                del self.last_active[client]
+                self.usage.pop(client, None)
+
+    def _check_limits(self, client, queued_elsewhere=()):
+        waiting = len(self._waiting) + len(queued_elsewhere)
+        if self.max_pending and waiting >= self.max_pending:
+            raise QueueFullError(f"queue is full ({waiting} jobs waiting)")
+
+        if self.max_pending_per_client and sum(1 for x in self._waiting if x.client == client) + queued_elsewhere.count(client) >= self.max_pending_per_client:
+            raise QueueFullError(f"too many queued jobs for client {client!r}")
+
+    def check_limits(self, client, queued_elsewhere=()):
+        """Raises QueueFullError if a limited job of client would be refused now.
+
+        queued_elsewhere lists (client, task_id) of jobs waiting outside the scheduler, such as requests gathering for a
+        batch, which count against the limits too; those that are also waiting here are counted once."""
+
+        with self._lock:
+            waiting_ids = {job.task_id for job in self._waiting if job.task_id is not None}
+            self._check_limits(client, [c for c, task_id in queued_elsewhere if task_id is None or task_id not in waiting_ids])
+
+    def acquire(self, blocking=True, *, priority="normal", client="", task_id=None, limited=False):
+        with self._lock:
+            job = Job(next(self._seq), priority, client, task_id)
+
+            if self._owner is None and not self._waiting:
+                self._catch_up(client)
+                self._start(job)
+                return True
+
+            if not blocking:
+                return False
+
+            if limited:
+                self._check_limits(client)
+
+            self._catch_up(client)
+            self._waiting.append(job)
+
+        job.event.wait()
+        return True
+
+    def release(self):
+        with self._lock:
+            owner = self._owner
+            if owner is None:
+                raise RuntimeError("release unlocked lock")
+
+            now = time.monotonic()
+            self.usage[owner.client] += now - owner.started
+            self.last_active[owner.client] = now
+            self._owner = None
+
+            if self._waiting:
+                job = min(self._waiting, key=self._order)
+                self._waiting.remove(job)
+                self._start(job)
+                job.event.set()
+
+            self._forget_idle(now)
+
+    __enter__ = acquire
+
+    def __exit__(self, t, v, tb):
+        self.release()
+
+    def job(self, priority="normal", client="", task_id=None, limited=False):
+        """Context manager that holds the lock for one job: with queue_lock.job(priority="high", client=user): ..."""
+
+        return JobContext(self, priority, client, task_id, limited)
+
+    def locked(self):
+        return self._owner is not None
+
+    def pending_tasks(self):
+        """Task ids of waiting jobs in the order they would run now."""
+
+        with self._lock:
+            return [job.task_id for job in sorted(self._waiting, key=self._order) if job.task_id is not None]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "running": None if self._owner is None else {"client": self._owner.client, "task_id": self._owner.task_id},
+                "waiting": len(self._waiting),
+                "waiting_per_client": dict(collections.Counter(job.client for job in self._waiting)),
+                "usage": dict(self.usage),
+            }
+
+
+class JobContext:
+    def __init__(self, scheduler, priority, client, task_id, limited):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.client = client
+        self.task_id = task_id
+        self.limited = limited
+
+    def __enter__(self):
+        self.scheduler.acquire(priority=self.priority, client=self.client, task_id=self.task_id, limited=self.limited)
+        return self
+
+    def __exit__(self, t, v, tb):
+        self.scheduler.release()
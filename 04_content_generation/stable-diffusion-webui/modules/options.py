@@ -216,6 +216,12 @@ class Options:
         if isinstance(self.data.get('ui_reorder'), str) and self.data.get('ui_reorder') and "ui_reorder_list" not in self.data:
             self.data['ui_reorder_list'] = [i.strip() for i in self.data.get('ui_reorder').split(',')]
 
+        # checkpoint cache: a number of checkpoints became a RAM budget plus a number of memory-mapped checkpoints
+        old_cache_count = self.data.get('sd_checkpoint_cache')
+        if isinstance(old_cache_count, int) and old_cache_count > 0 and 'sd_checkpoint_cache_ram' not in self.data:
+            self.data['sd_checkpoint_cache_ram'] = min(old_cache_count * 4096, 65536)  # about one fp32 SD1 checkpoint each
+            self.data.setdefault('sd_checkpoint_cache_mapped', old_cache_count)
+
         bad_settings = 0
         for k, v in self.data.items():
             info = self.data_labels.get(k, None)
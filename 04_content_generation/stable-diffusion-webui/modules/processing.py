@@ -16,7 +16,7 @@ from skimage import exposure
 from typing import Any
 
 import modules.sd_hijack
-from modules import devices, prompt_parser, masking, sd_samplers, lowvram, infotext_utils, extra_networks, sd_vae_approx, scripts, sd_samplers_common, sd_unet, errors, rng, profiling
+from modules import devices, prompt_parser, masking, sd_samplers, lowvram, infotext_utils, extra_networks, sd_vae_approx, scripts, sd_samplers_common, sd_unet, errors, rng, profiling, sd_conds_cache
 from modules.rng import slerp # noqa: F401
 from modules.sd_hijack import model_hijack
 from modules.sd_samplers_common import images_tensor_to_samples, decode_first_stage, approximation_indexes
@@ -484,8 +484,12 @@ class StableDiffusionProcessing:
 
         cache = caches[0]
 
+        kwargs = {}
+        if function in (prompt_parser.get_learned_conditioning, prompt_parser.get_multicond_learned_conditioning) and sd_conds_cache.cache.enabled():
+            kwargs["cache_context"] = sd_conds_cache.make_context(shared.sd_model, extra_network_data)
+
         with devices.autocast():
-            cache[1] = function(shared.sd_model, required_prompts, steps, hires_steps, shared.opts.use_old_scheduling)
+            cache[1] = function(shared.sd_model, required_prompts, steps, hires_steps, shared.opts.use_old_scheduling, **kwargs)
 
         cache[0] = cached_params
         return cache[1]
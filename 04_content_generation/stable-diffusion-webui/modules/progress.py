@@ -52,6 +52,16 @@ def record_results(id_task, res):
 def add_task_to_queue(id_job):
     pending_tasks[id_job] = time.time()
 
+
+def get_queue_order():
+    """ids of pending tasks in the order the queue will run them; tasks that are not waiting for the queue yet come last, oldest first"""
+
+    from modules import call_queue
+
+    scheduled = [x for x in call_queue.queue_lock.pending_tasks() if x in pending_tasks]
+    scheduled_set = set(scheduled)
+    return scheduled + sorted((x for x in pending_tasks if x not in scheduled_set), key=lambda x: pending_tasks.get(x, 0))
+
 class PendingTasksResponse(BaseModel):
     size: int = Field(title="Pending task size")
     tasks: List[str] = Field(title="Pending task ids")
@@ -79,7 +89,7 @@ def setup_progress_api(app):
 
 
 def get_pending_tasks():
-    pending_tasks_ids = list(pending_tasks)
+    pending_tasks_ids = get_queue_order()
     pending_len = len(pending_tasks_ids)
     return PendingTasksResponse(size=pending_len, tasks=pending_tasks_ids)
 
@@ -92,7 +102,7 @@ def progressapi(req: ProgressRequest):
     if not active:
         textinfo = "Waiting..."
         if queued:
-            sorted_queued = sorted(pending_tasks.keys(), key=lambda x: pending_tasks[x])
+            sorted_queued = get_queue_order()
             queue_index = sorted_queued.index(req.id_task)
             textinfo = "In queue: {}/{}".format(queue_index + 1, len(sorted_queued))
         return ProgressResponse(active=active, queued=queued, completed=completed, id_live_preview=-1, textinfo=textinfo)
@@ -154,7 +154,7 @@ class SdConditioning(list):
 
 
 
-def get_learned_conditioning(model, prompts: SdConditioning | list[str], steps, hires_steps=None, use_old_scheduling=False):
+def get_learned_conditioning(model, prompts: SdConditioning | list[str], steps, hires_steps=None, use_old_scheduling=False, cache_context=None):
     """converts a list of prompts into a list of prompt schedules - each schedule is a list of ScheduledPromptConditioning, specifying the comdition (cond),
     and the sampling step at which this condition is to be replaced by the next one.
 
@@ -171,12 +171,23 @@ def get_learned_conditioning(model, prompts: SdConditioning | list[str], steps,
             ScheduledPromptConditioning(end_at_step=20, cond=tensor([[-0.3886,  0.0229, -0.0522,  ..., -0.4901, -0.3067,  0.0673], ..., [-0.7352, -0.4356, -0.7888,  ...,  0.6994, -0.4312, -1.2593]], device='cuda:0'))
         ]
     ]
+
+    If cache_context (see sd_conds_cache.make_context) is given and the conditioning cache is enabled, results are also
+    looked up in and stored to the process-wide cache, so that prompts repeated across requests are only computed once.
     """
     res = []
 
     prompt_schedules = get_learned_conditioning_prompt_schedules(prompts, steps, hires_steps, use_old_scheduling)
     cache = {}
 
+    persistent_cache = None
+    if cache_context is not None:
+        from modules import sd_conds_cache
+
+        if sd_conds_cache.cache.enabled():
+            persistent_cache = sd_conds_cache.cache
+            batch_key = (getattr(prompts, 'is_negative_prompt', False), getattr(prompts, 'width', None), getattr(prompts, 'height', None))
+
     for prompt, prompt_schedule in zip(prompts, prompt_schedules):
 
         cached = cache.get(prompt, None)
@@ -184,6 +195,14 @@ def get_learned_conditioning(model, prompts: SdConditioning | list[str], steps,
             res.append(cached)
             continue
 
+        if persistent_cache is not None:
+            key = (batch_key, prompt, tuple((end_at_step, text) for end_at_step, text in prompt_schedule))
+            cached = persistent_cache.get(cache_context, key)
+            if cached is not None:
+                cache[prompt] = cached
+                res.append(cached)
+                continue
+
         texts = SdConditioning([x[1] for x in prompt_schedule], copy_from=prompts)
         conds = model.get_learned_conditioning(texts)
 
@@ -199,6 +218,9 @@ def get_learned_conditioning(model, prompts: SdConditioning | list[str], steps,
         cache[prompt] = cond_schedule
         res.append(cond_schedule)
 
+        if persistent_cache is not None:
+            persistent_cache.put(cache_context, key, cond_schedule)
+
     return res
 
 
@@ -249,7 +271,7 @@ class MulticondLearnedConditioning:
         self.batch: list[list[ComposableScheduledPromptConditioning]] = batch
 
 
-def get_multicond_learned_conditioning(model, prompts, steps, hires_steps=None, use_old_scheduling=False) -> MulticondLearnedConditioning:
+def get_multicond_learned_conditioning(model, prompts, steps, hires_steps=None, use_old_scheduling=False, cache_context=None) -> MulticondLearnedConditioning:
     """same as get_learned_conditioning, but returns a list of ScheduledPromptConditioning along with the weight objects for each prompt.
     For each prompt, the list is obtained by splitting the prompt using the AND separator.
 
@@ -258,7 +280,7 @@ def get_multicond_learned_conditioning(model, prompts, steps, hires_steps=None,
 
     res_indexes, prompt_flat_list, prompt_indexes = get_multicond_prompt_list(prompts)
 
-    learned_conditioning = get_learned_conditioning(model, prompt_flat_list, steps, hires_steps, use_old_scheduling)
+    learned_conditioning = get_learned_conditioning(model, prompt_flat_list, steps, hires_steps, use_old_scheduling, cache_context)
 
     res = []
     for indexes in res_indexes:
@@ -0,0 +1,144 @@
+import collections
+import threading
+
+from modules import shared
+
+# settings that change what the text encoder produces for the same prompt
+cond_options = [
+    "CLIP_stop_at_last_layers",
+    "emphasis",
+    "sdxl_clip_l_skip",
+    "comma_padding_backtrack",
+    "use_old_emphasis_implementation",
+    "sdxl_crop_left",
+    "sdxl_crop_top",
+    "sdxl_refiner_low_aesthetic_score",
+    "sdxl_refiner_high_aesthetic_score",
+    "fp8_storage",
+    "cache_fp16_weight",
+]
+
+
+def cond_nbytes(cond):
+    if isinstance(cond, dict):
+        return sum(cond_nbytes(v) for v in cond.values())
+
+    return getattr(cond, "nbytes", 0)
+
+
+def extra_networks_state(extra_network_data):
+    return tuple(sorted((name, tuple(tuple(params.items) for params in params_list)) for name, params_list in (extra_network_data or {}).items()))
+
+
+def embeddings_state():
+    from modules import sd_hijack
+
+    db = sd_hijack.model_hijack.embedding_db
+    # load_id changes when an embedding is reloaded, step when it is trained
+    return tuple((name, embedding.load_id, embedding.step) for name, embedding in db.word_embeddings.items())
+
+
+def make_context(model, extra_network_data):
+    """Everything apart from the prompt that conditioning depends on, as (model, params); pass to get_learned_conditioning as cache_context."""
+
+    model_key = (getattr(model, "sd_model_checkpoint", None), getattr(model, "sd_model_hash", None))
+    params = (
+        tuple(getattr(shared.opts, name, None) for name in cond_options),
+        extra_networks_state(extra_network_data),
+        embeddings_state(),
+    )
+
+    return model_key, params
+
+
+class ConditioningCache:
+    """Process-wide LRU cache of prompt conditionings, bounded by a budget in bytes of device memory (the conds stay on the GPU).
+
+    Entries are the ScheduledPromptConditioning lists that get_learned_conditioning produces for one prompt, keyed by
+    the prompt, its schedule and the context from make_context. The cache is emptied when the model changes.
+    """
+
+    def __init__(self):
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.model = None
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def budget():
+        return int(shared.opts.cond_cache_ram) * 1024 * 1024
+
+    def enabled(self):
+        return self.budget() > 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set_model_locked(self, model):
+        if model != self.model:
+            self.evictions += len(self.entries)
+            self.entries.clear()
+            self.used = 0
+            self.model = model
+
+    def get(self, context, key):
+        model, params = context
+
+        with self.lock:
+            self.set_model_locked(model)
+            entry = self.entries.get((params, key))
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end((params, key))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, context, key, cond_schedule):
+        model, params = context
+        nbytes = sum(cond_nbytes(x.cond) for x in cond_schedule)
+
+        with self.lock:
+            self.set_model_locked(model)
+            budget = self.budget()
+            if nbytes > budget or (params, key) in self.entries:
+                return
+
+            self.entries[(params, key)] = (cond_schedule, nbytes)
+            self.used += nbytes
+            self.trim_locked(budget)
+
+    def trim(self):
+        with self.lock:
+            self.trim_locked(self.budget())
+
+    def trim_locked(self, budget):
+        while self.entries and self.used > budget:
+            _, (_, nbytes) = self.entries.popitem(last=False)
+            self.used -= nbytes
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.used = 0
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "budget": self.budget(),
+                "used": self.used,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+cache = ConditioningCache()
@@ -1,4 +1,3 @@
-import collections
 import importlib
 import os
 import sys
@@ -12,7 +11,7 @@ from omegaconf import OmegaConf, ListConfig
 from urllib import request
 import ldm.modules.midas as midas
 
-from modules import paths, shared, modelloader, devices, script_callbacks, sd_vae, sd_disable_initialization, errors, hashes, sd_models_config, sd_unet, sd_models_xl, cache, extra_networks, processing, lowvram, sd_hijack, patches
+from modules import paths, shared, modelloader, devices, script_callbacks, sd_vae, sd_disable_initialization, errors, hashes, sd_models_cache, sd_models_config, sd_unet, sd_models_xl, cache, extra_networks, processing, lowvram, sd_hijack, patches
 from modules.timer import Timer
 from modules.shared import opts
 import tomesd
@@ -24,7 +23,8 @@ model_path = os.path.abspath(os.path.join(paths.models_path, model_dir))
 checkpoints_list = {}
 checkpoint_aliases = {}
 checkpoint_alisases = checkpoint_aliases  # for compatibility with old name
-checkpoints_loaded = collections.OrderedDict()
+checkpoints_lock = threading.RLock()  # background hashing renames entries in the two dicts above from pool threads
+checkpoints_loaded = sd_models_cache.CheckpointCache()
 
 
 class ModelType(enum.Enum):
@@ -100,33 +100,67 @@ class CheckpointInfo:
             self.ids += [self.shorthash, self.sha256, f'{self.name} [{self.shorthash}]', f'{self.name_for_extra} [{self.shorthash}]']
 
     def register(self):
-        checkpoints_list[self.title] = self
-        for id in self.ids:
-            checkpoint_aliases[id] = self
+        with checkpoints_lock:
+            checkpoints_list[self.title] = self
+            for id in self.ids:
+                checkpoint_aliases[id] = self
 
-    def calculate_shorthash(self):
-        self.sha256 = hashes.sha256(self.filename, f"checkpoint/{self.name}")
-        if self.sha256 is None:
+    def calculate_shorthash(self, blocking=True):
+        if not blocking:
+            future = hashes.sha256_async(self.filename, f"checkpoint/{self.name}")
+            if not future.done():
+                future.add_done_callback(self.on_background_hash)
+                return self.shorthash
+
+            return self.apply_sha256(future.result())
+
+        return self.apply_sha256(hashes.sha256(self.filename, f"checkpoint/{self.name}"))
+
+    def apply_sha256(self, sha256):
+        """sets the checkpoint's sha256 and re-registers it under the title with the new short hash"""
+
+        if sha256 is None:
             return
 
-        shorthash = self.sha256[0:10]
-        if self.shorthash == self.sha256[0:10]:
-            return self.shorthash
+        with checkpoints_lock:
+            self.sha256 = sha256
+            shorthash = sha256[0:10]
+            if self.shorthash == shorthash:
+                return self.shorthash
 
-        self.shorthash = shorthash
+            self.shorthash = shorthash
 
-        if self.shorthash not in self.ids:
-            self.ids += [self.shorthash, self.sha256, f'{self.name} [{self.shorthash}]', f'{self.name_for_extra} [{self.shorthash}]']
+            if self.shorthash not in self.ids:
+                self.ids += [self.shorthash, self.sha256, f'{self.name} [{self.shorthash}]', f'{self.name_for_extra} [{self.shorthash}]']
 
-        old_title = self.title
-        self.title = f'{self.name} [{self.shorthash}]'
-        self.short_title = f'{self.name_for_extra} [{self.shorthash}]'
+            old_title = self.title
+            self.title = f'{self.name} [{self.shorthash}]'
+            self.short_title = f'{self.name_for_extra} [{self.shorthash}]'
 
-        replace_key(checkpoints_list, old_title, self.title, self)
-        self.register()
+            replace_key(checkpoints_list, old_title, self.title, self)
+            self.register()
 
         return self.shorthash
 
+    def on_background_hash(self, future):
+        # runs on a hashing pool thread: only read the finished future, never wait on the pool from here
+        error = future.exception()
+        if error is not None:
+            errors.display(error, f"calculating hash for {self.filename}")
+            return
+
+        shorthash = self.apply_sha256(future.result())
+        if not shorthash:
+            return
+
+        for model in model_data.loaded_sd_models:
+            if getattr(model, 'sd_checkpoint_info', None) is self:
+                model.sd_model_hash = shorthash
+
+        if model_data.sd_model is not None and getattr(model_data.sd_model, 'sd_checkpoint_info', None) is self:
+            shared.opts.data["sd_model_checkpoint"] = self.title
+            shared.opts.data["sd_checkpoint_hash"] = self.sha256
+
 
 try:
     # this silences the annoying "Some weights of the model checkpoint were not used when initializing..." message at start.
@@ -147,12 +181,14 @@ def setup_model():
 
 
 def checkpoint_tiles(use_short=False):
-    return [x.short_title if use_short else x.title for x in checkpoints_list.values()]
+    with checkpoints_lock:
+        return [x.short_title if use_short else x.title for x in checkpoints_list.values()]
 
 
 def list_models():
-    checkpoints_list.clear()
-    checkpoint_aliases.clear()
+    with checkpoints_lock:
+        checkpoints_list.clear()
+        checkpoint_aliases.clear()
 
     cmd_ckpt = shared.cmd_opts.ckpt
     if shared.cmd_opts.no_download_sd_model or cmd_ckpt != shared.sd_model_file or os.path.exists(cmd_ckpt):
@@ -176,6 +212,11 @@ def list_models():
         checkpoint_info = CheckpointInfo(filename)
         checkpoint_info.register()
 
+    if shared.opts.hash_models_in_background:
+        for checkpoint_info in list(checkpoints_list.values()):
+            if checkpoint_info.sha256 is None:
+                checkpoint_info.calculate_shorthash(blocking=False)
+
 
 re_strip_checksum = re.compile(r"\s*\[[^]]+]\s*$")
 
@@ -188,12 +229,15 @@ def get_closet_checkpoint_match(search_string):
     if checkpoint_info is not None:
         return checkpoint_info
 
-    found = sorted([info for info in checkpoints_list.values() if search_string in info.title], key=lambda x: len(x.title))
+    with checkpoints_lock:
+        candidates = list(checkpoints_list.values())
+
+    found = sorted([info for info in candidates if search_string in info.title], key=lambda x: len(x.title))
     if found:
         return found[0]
 
     search_string_without_checksum = re.sub(re_strip_checksum, '', search_string)
-    found = sorted([info for info in checkpoints_list.values() if search_string_without_checksum in info.title], key=lambda x: len(x.title))
+    found = sorted([info for info in candidates if search_string_without_checksum in info.title], key=lambda x: len(x.title))
     if found:
         return found[0]
 
@@ -330,15 +374,13 @@ def read_state_dict(checkpoint_file, print_global_state=False, map_location=None
 
 
 def get_checkpoint_state_dict(checkpoint_info: CheckpointInfo, timer):
-    sd_model_hash = checkpoint_info.calculate_shorthash()
+    sd_model_hash = checkpoint_info.calculate_shorthash(blocking=not shared.opts.hash_models_in_background)
     timer.record("calculate hash")
 
-    if checkpoint_info in checkpoints_loaded:
-        # use checkpoint cache
+    res = checkpoints_loaded.get(checkpoint_info)
+    if res is not None:
         print(f"Loading weights [{sd_model_hash}] from cache")
-        # move to end as latest
-        checkpoints_loaded.move_to_end(checkpoint_info)
-        return checkpoints_loaded[checkpoint_info]
+        return res
 
     print(f"Loading weights [{sd_model_hash}] from {checkpoint_info.filename}")
     res = read_state_dict(checkpoint_info.filename)
@@ -347,6 +389,33 @@ def get_checkpoint_state_dict(checkpoint_info: CheckpointInfo, timer):
     return res
 
 
+def cache_state_dict(checkpoint_info: CheckpointInfo, state_dict):
+    """Keeps checkpoint's weights in checkpoints_loaded for fast switching back to it.
+
+    A safetensors checkpoint is cached as a read-only memory-mapped view of its file on CPU rather than as a copy
+    of state_dict, so it costs no RAM that the OS can't reclaim; at most sd_checkpoint_cache_mapped of those are kept.
+    Other checkpoints are cached as CPU tensors and count against the sd_checkpoint_cache_ram budget.
+    """
+
+    if not checkpoints_loaded.enabled():
+        return
+
+    if checkpoint_info in checkpoints_loaded:
+        checkpoints_loaded.touch(checkpoint_info)
+        return
+
+    if checkpoint_info.is_safetensors and not shared.opts.disable_mmap_load_safetensors:
+        checkpoints_loaded.put(checkpoint_info, read_state_dict(checkpoint_info.filename, map_location="cpu"), mapped=True)
+        return
+
+    nbytes = sd_models_cache.state_dict_nbytes(state_dict)
+    if nbytes > checkpoints_loaded.budget():
+        print(f"Not caching {checkpoint_info.title}: {nbytes / 2**20:.0f} MB is more than the checkpoint cache budget")
+        return
+
+    checkpoints_loaded.put(checkpoint_info, {k: v.to("cpu") if isinstance(v, torch.Tensor) else v for k, v in state_dict.items()}, nbytes=nbytes)
+
+
 class SkipWritingToConfig:
     """This context manager prevents load_model_weights from writing checkpoint name to the config when it loads weight."""
 
@@ -408,7 +477,7 @@ def set_model_fields(model):
 
 
 def load_model_weights(model, checkpoint_info: CheckpointInfo, state_dict, timer):
-    sd_model_hash = checkpoint_info.calculate_shorthash()
+    sd_model_hash = checkpoint_info.calculate_shorthash(blocking=not shared.opts.hash_models_in_background)
     timer.record("calculate hash")
 
     if devices.fp8:
@@ -430,9 +499,7 @@ def load_model_weights(model, checkpoint_info: CheckpointInfo, state_dict, timer
     if model.is_ssd:
         sd_hijack.model_hijack.convert_sdxl_to_ssd(model)
 
-    if shared.opts.sd_checkpoint_cache > 0:
-        # cache newly loaded model
-        checkpoints_loaded[checkpoint_info] = state_dict.copy()
+    cache_state_dict(checkpoint_info, state_dict)
 
     if hasattr(model, "before_load_weights"):
         model.before_load_weights(state_dict)
@@ -520,10 +587,6 @@ def load_model_weights(model, checkpoint_info: CheckpointInfo, state_dict, timer
     model.first_stage_model.to(devices.dtype_vae)
     timer.record("apply dtype to VAE")
 
-    # clean up cache if limit is reached
-    while len(checkpoints_loaded) > shared.opts.sd_checkpoint_cache:
-        checkpoints_loaded.popitem(last=False)
-
     model.sd_model_hash = sd_model_hash
     model.sd_model_checkpoint = checkpoint_info.filename
     model.sd_checkpoint_info = checkpoint_info
@@ -0,0 +1,151 @@
+import collections
+import threading
+
+from modules import shared, hashes
+
+
+class CacheEntry:
+    def __init__(self, state_dict, nbytes, mapped, signature):
+        self.state_dict = state_dict
+        self.nbytes = nbytes
+        self.mapped = mapped
+        self.signature = signature
+
+    @property
+    def charged_bytes(self):
+        # pages of a memory-mapped file belong to the OS page cache, which can drop them under pressure
+        return 0 if self.mapped else self.nbytes
+
+
+def state_dict_nbytes(state_dict):
+    return sum(getattr(v, "nbytes", 0) for v in state_dict.values())
+
+
+class CheckpointCache:
+    """LRU cache of checkpoint state dicts bounded by a RAM budget in bytes rather than by a number of checkpoints.
+
+    Entries for memory-mapped safetensors files are read-only views of the file and do not count against the budget;
+    instead, at most sd_checkpoint_cache_mapped of them are kept, since each one keeps its file open (and locked on Windows).
+    Other entries count the size of their tensors. An entry is dropped if its file changed on disk since it was cached.
+    """
+
+    def __init__(self):
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def budget():
+        return int(shared.opts.sd_checkpoint_cache_ram) * 1024 * 1024
+
+    @staticmethod
+    def max_mapped():
+        return int(shared.opts.sd_checkpoint_cache_mapped)
+
+    def enabled(self):
+        return self.budget() > 0
+
+    def __contains__(self, checkpoint_info):
+        return checkpoint_info in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, checkpoint_info):
+        """Returns a shallow copy of the cached state dict, or None. Only counts as a hit or miss if the cache is enabled."""
+
+        with self.lock:
+            entry = self.entries.get(checkpoint_info)
+            if entry is not None and entry.signature != self.signature(checkpoint_info):
+                del self.entries[checkpoint_info]
+                entry = None
+
+            if entry is None:
+                if self.enabled():
+                    self.misses += 1
+                return None
+
+            self.entries.move_to_end(checkpoint_info)
+            self.hits += 1
+            return dict(entry.state_dict)
+
+    def put(self, checkpoint_info, state_dict, mapped=False, nbytes=None):
+        """Stores the state dict as the most recently used entry and evicts least recently used ones until the cache fits the budget.
+
+        Returns False if the entry was not stored because the cache is disabled, the entry alone is larger than the budget,
+        or it is memory-mapped and no mapped entries are allowed."""
+
+        nbytes = state_dict_nbytes(state_dict) if nbytes is None else nbytes
+        entry = CacheEntry(dict(state_dict), nbytes, mapped, self.signature(checkpoint_info))
+
+        with self.lock:
+            self.entries.pop(checkpoint_info, None)
+            if not self.enabled() or entry.charged_bytes > self.budget() or (mapped and self.max_mapped() <= 0):
+                return False
+
+            self.entries[checkpoint_info] = entry
+            self.trim_locked()
+
+        return True
+
+    def touch(self, checkpoint_info):
+        with self.lock:
+            if checkpoint_info in self.entries:
+                self.entries.move_to_end(checkpoint_info)
+
+    def trim(self):
+        with self.lock:
+            self.trim_locked()
+
+    def trim_locked(self):
+        budget = self.budget()
+        if budget <= 0:
+            self.evictions += len(self.entries)
+            self.entries.clear()
+            return
+
+        while self.charged_bytes() > budget:
+            self.evict_locked(mapped=False)
+
+        max_mapped = self.max_mapped()
+        while sum(entry.mapped for entry in self.entries.values()) > max_mapped:
+            self.evict_locked(mapped=True)
+
+    def evict_locked(self, mapped):
+        """drops the least recently used entry that is (or is not) memory-mapped"""
+
+        checkpoint_info = next(info for info, entry in self.entries.items() if entry.mapped == mapped)
+        del self.entries[checkpoint_info]
+        self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def charged_bytes(self):
+        return sum(entry.charged_bytes for entry in self.entries.values())
+
+    @staticmethod
+    def signature(checkpoint_info):
+        try:
+            return hashes.file_signature(checkpoint_info.filename)
+        except OSError:
+            return None
+
+    def stats(self):
+        with self.lock:
+            entries = list(self.entries.items())
+            total = self.hits + self.misses
+            return {
+                "budget": self.budget(),
+                "max_mapped": self.max_mapped(),
+                "used": sum(entry.charged_bytes for _, entry in entries),
+                "mapped": sum(entry.nbytes for _, entry in entries if entry.mapped),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": [{"title": info.title, "bytes": entry.nbytes, "mapped": entry.mapped} for info, entry in entries],
+            }
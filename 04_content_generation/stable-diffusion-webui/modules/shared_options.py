@@ -126,6 +126,8 @@ options_templates.update(options_section(('system', "System", "system"), {
     "print_hypernet_extra": OptionInfo(False, "Print extra hypernetwork information to console."),
     "list_hidden_files": OptionInfo(True, "Load models/files in hidden directories").info("directory is hidden if its name starts with \".\""),
     "disable_mmap_load_safetensors": OptionInfo(False, "Disable memmapping for loading .safetensors files.").info("fixes very slow loading speed in some cases"),
+    "hash_models_in_background": OptionInfo(False, "Calculate model hashes in the background.").info("generation does not wait for sha256 of a new model; the hash is used once it is ready"),
+    "hash_workers": OptionInfo(2, "Number of files hashed in parallel in the background", gr.Slider, {"minimum": 1, "maximum": 16, "step": 1}).needs_restart(),
     "hide_ldm_prints": OptionInfo(True, "Prevent Stability-AI's ldm/sgm modules from printing noise to console."),
     "dump_stacks_on_signal": OptionInfo(False, "Print stack traces before exiting the program with ctrl+c."),
 }))
@@ -150,6 +152,15 @@ options_templates.update(options_section(('API', "API", "system"), {
     "api_enable_requests": OptionInfo(True, "Allow http:// and https:// URLs for input images in API", restrict_api=True),
     "api_forbid_local_requests": OptionInfo(True, "Forbid URLs to local resources", restrict_api=True),
     "api_useragent": OptionInfo("", "User agent for requests", restrict_api=True),
+    "api_txt2img_batch_window": OptionInfo(0, "Gather txt2img API requests into batches for (ms)", gr.Slider, {"minimum": 0, "maximum": 1000, "step": 10}).info("0 = disable; requests that only differ in prompt, negative prompt and seed and arrive within this time are generated together as one batch"),
+    "api_txt2img_batch_max_size": OptionInfo(8, "Maximum number of txt2img API requests in one batch", gr.Slider, {"minimum": 1, "maximum": 64, "step": 1}),
+}))
+
+options_templates.update(options_section(('queue', "Queue", "system"), {
+    "queue_scheduler": OptionInfo("FIFO", "Job queue order", gr.Radio, {"choices": ["FIFO", "Priority"]}, restrict_api=True).info("FIFO = in order of arrival; Priority = by the API request's X-Priority header (high, normal, low) if it is trusted, then sharing time fairly between clients (API user, X-Client-Id header of a trusted address, or address)"),
+    "queue_max_pending": OptionInfo(0, "Maximum number of waiting jobs", gr.Number, {"precision": 0}, restrict_api=True).info("0 = unlimited; API requests beyond this get HTTP 429; UI jobs and internal tasks are never refused"),
+    "queue_max_pending_per_client": OptionInfo(0, "Maximum number of waiting jobs per client", gr.Number, {"precision": 0}, restrict_api=True).info("0 = unlimited; API requests beyond this get HTTP 429"),
+    "queue_trusted_clients": OptionInfo("", "Addresses allowed to set X-Priority and X-Client-Id", restrict_api=True).info("comma-separated, e.g. a gateway that serves several users; with --api-auth, authenticated users may set X-Priority; everyone else is queued at normal priority under their address"),
 }))
 
 options_templates.update(options_section(('training', "Training", "training"), {
@@ -171,7 +182,8 @@ options_templates.update(options_section(('sd', "Stable Diffusion", "sd"), {
     "sd_model_checkpoint": OptionInfo(None, "Stable Diffusion checkpoint", gr.Dropdown, lambda: {"choices": shared_items.list_checkpoint_tiles(shared.opts.sd_checkpoint_dropdown_use_short)}, refresh=shared_items.refresh_checkpoints, infotext='Model hash'),
     "sd_checkpoints_limit": OptionInfo(1, "Maximum number of checkpoints loaded at the same time", gr.Slider, {"minimum": 1, "maximum": 10, "step": 1}),
     "sd_checkpoints_keep_in_cpu": OptionInfo(True, "Only keep one model on device").info("will keep models other than the currently used one in RAM rather than VRAM"),
-    "sd_checkpoint_cache": OptionInfo(0, "Checkpoints to cache in RAM", gr.Slider, {"minimum": 0, "maximum": 10, "step": 1}).info("obsolete; set to 0 and use the two settings above instead"),
+    "sd_checkpoint_cache_ram": OptionInfo(0, "RAM budget for cached checkpoints (MB)", gr.Slider, {"minimum": 0, "maximum": 65536, "step": 256}).info("0 = disable; least recently used checkpoints are dropped to stay within the budget; memory-mapped .safetensors files don't count against it"),
+    "sd_checkpoint_cache_mapped": OptionInfo(2, "Memory-mapped .safetensors checkpoints to keep in cache", gr.Slider, {"minimum": 0, "maximum": 10, "step": 1}).info("they use page cache the OS can reclaim instead of the RAM budget, but each keeps its file open; on Windows an open file can't be deleted or replaced"),
     "sd_unet": OptionInfo("Automatic", "SD Unet", gr.Dropdown, lambda: {"choices": shared_items.sd_unet_items()}, refresh=shared_items.refresh_unet_list).info("choose Unet model: Automatic = use one with same filename as checkpoint; None = use Unet from checkpoint"),
     "enable_quantization": OptionInfo(False, "Enable quantization in K samplers for sharper and cleaner results. This may change existing seeds").needs_reload_ui(),
     "emphasis": OptionInfo("Original", "Emphasis mode", gr.Radio, lambda: {"choices": [x.name for x in sd_emphasis.options]}, infotext="Emphasis").info("makes it possible to make model to pay (more:1.1) or (less:0.9) attention to text when you use the syntax in prompt; " + sd_emphasis.get_options_descriptions()),
@@ -239,6 +251,7 @@ options_templates.update(options_section(('optimizations', "Optimizations", "sd"
     "pad_cond_uncond": OptionInfo(False, "Pad prompt/negative prompt", infotext='Pad conds').info("improves performance when prompt and negative prompt have different lengths; changes seeds"),
     "pad_cond_uncond_v0": OptionInfo(False, "Pad prompt/negative prompt (v0)", infotext='Pad conds v0').info("alternative implementation for the above; used prior to 1.6.0 for DDIM sampler; overrides the above if set; WARNING: truncates negative prompt if it's too long; changes seeds"),
     "persistent_cond_cache": OptionInfo(True, "Persistent cond cache").info("do not recalculate conds from prompts if prompts have not changed since previous calculation"),
+    "cond_cache_ram": OptionInfo(0, "VRAM budget for conds shared across generations (MB)", gr.Slider, {"minimum": 0, "maximum": 4096, "step": 16}).info("0 = disable; keeps conds of recently used prompts on the GPU so that repeated prompts and negative prompts are not recalculated; cleared when the model changes"),
     "batch_cond_uncond": OptionInfo(True, "Batch cond/uncond").info("do both conditional and unconditional denoising in one batch; uses a bit more VRAM during sampling, but improves speed; previously this was controlled by --always-batch-cond-uncond commandline argument"),
     "fp8_storage": OptionInfo("Disable", "FP8 weight", gr.Radio, {"choices": ["Disable", "Enable for SDXL", "Enable"]}).info("Use FP8 to store Linear/Conv layers' weight. Require pytorch>=2.1.0."),
     "cache_fp16_weight": OptionInfo(False, "Cache FP16 weight for LoRA").info("Cache fp16 weight when enabling FP8, will increase the quality of LoRA. Use more system ram."),
@@ -1,3 +1,4 @@
+import itertools
 import os
 from collections import namedtuple
 from contextlib import closing
@@ -36,6 +37,9 @@ def list_textual_inversion_templates():
     return textual_inversion_templates
 
 
+embedding_load_ids = itertools.count(1)
+
+
 class Embedding:
     def __init__(self, vec, name, step=None):
         self.vec = vec
@@ -50,6 +54,7 @@ class Embedding:
         self.filename = None
         self.hash = None
         self.shorthash = None
+        self.load_id = next(embedding_load_ids)  # unique per loaded or created embedding, unlike id(), which CPython reuses
 
     def save(self, filename):
         embedding_data = {
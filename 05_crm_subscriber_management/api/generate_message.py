@@ -1,29 +1,33 @@
 from flask import Flask, request, jsonify
-import json
 import os
 
 app = Flask(__name__)
 TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "../message_templates/tiers.json")
 
-from utils.content_generation import trigger_content_generation, get_latest_asset
+from logics.template_registry import TemplateRegistry
+templates = TemplateRegistry(TEMPLATE_PATH)
+
+from utils.content_generation import submit_content_generation, get_latest_asset
 
 @app.route('/generate', methods=['GET'])
 def generate_message():
     tier = request.args.get('tier', 'Standard')
     message_type = request.args.get('message_type', 'Welcome')
-    with open(TEMPLATE_PATH, 'r') as f:
-        templates = json.load(f)
-    message = templates.get(tier, {}).get(message_type, "No message available for this tier/type.")
+    message = templates.get(tier, message_type, "No message available for this tier/type.")
     return jsonify({"message": message})
 
+@app.route('/templates/stats', methods=['GET'])
+def template_stats():
+    return jsonify(templates.stats())
+
 @app.route('/campaign', methods=['POST'])
 def campaign_message():
     data = request.json
     username = data.get("username")
     tier = data.get("tier", "Standard")
     message_type = data.get("message_type", "Campaign")
-    # 1. Trigger content generation
-    gen_result = trigger_content_generation()
+    # 1. Queue fresh content in the background and use the best asset we already have
+    gen_result = submit_content_generation()
     asset = get_latest_asset()
     # 2. Compose campaign message with generated asset
     message = f"Special campaign for {username}! Enjoy new content."
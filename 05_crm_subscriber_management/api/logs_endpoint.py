@@ -1,7 +1,7 @@
-from flask import jsonify
+from flask import jsonify, request
 from generate_message import app
+from logics.log_index import query_logs
 import os
-import json
 
 LOG_PATH = os.path.join(os.path.dirname(__file__), "../logs/message_log.jsonl")
 
@@ -9,7 +9,22 @@ LOG_PATH = os.path.join(os.path.dirname(__file__), "../logs/message_log.jsonl")
 def get_logs():
     if not os.path.exists(LOG_PATH):
         return jsonify([])
-    with open(LOG_PATH, 'r') as f:
-        lines = f.readlines()[-100:]
-        entries = [json.loads(line) for line in lines]
-    return jsonify(entries)
+    cursor = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', 100, type=int)
+    if limit <= 0:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    entries, next_cursor = query_logs(
+        LOG_PATH,
+        limit=limit,
+        cursor=cursor,
+        username=request.args.get('username'),
+        tier=request.args.get('tier'),
+        message_type=request.args.get('type'),
+        since=request.args.get('since'),
+        until=request.args.get('until'),
+    )
+    response = jsonify(entries)
+    if next_cursor is not None:
+        # Older pages: call /logs again with ?cursor=<X-Next-Cursor>.
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response
@@ -1,6 +1,5 @@
 from flask import request, jsonify
-from generate_message import app, TEMPLATE_PATH
-import json
+from generate_message import app, templates
 from logics.message_logger import log_message
 from utils.content_generation import trigger_content_generation, get_latest_asset
 
@@ -11,9 +10,7 @@ def send_message():
     tier = data.get("tier", "Standard")
     message_type = data.get("message_type", "Welcome")
 
-    with open(TEMPLATE_PATH, 'r') as f:
-        templates = json.load(f)
-    message = templates.get(tier, {}).get(message_type, "No message available.")
+    message = templates.get(tier, message_type, "No message available.")
 
     log_message(username, tier, message_type, message)
     return jsonify({"to": username, "message": message})
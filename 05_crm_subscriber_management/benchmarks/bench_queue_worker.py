@@ -0,0 +1,82 @@
+"""Jobs/sec of the CRM queue worker at different concurrency levels.
+
+Runs against fakeredis and a local stub /send server that adds a fixed
+delay per request to stand in for network and app latency.
+
+    pip install fakeredis
+    python 05_crm_subscriber_management/benchmarks/bench_queue_worker.py --jobs 2000
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import fakeredis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "queue"))
+
+import worker  # noqa: E402
+
+
+def start_stub_server(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(concurrency, jobs, send_url):
+    client = fakeredis.FakeRedis()
+    pipe = client.pipeline()
+    for i in range(jobs):
+        pipe.lpush(worker.QUEUE_KEY, json.dumps({"username": f"user{i}", "tier": "VIP", "message_type": "Welcome"}))
+    pipe.execute()
+
+    stop = threading.Event()
+    start = time.perf_counter()
+    thread = threading.Thread(target=worker.concurrent_queue_worker, kwargs=dict(
+        concurrency=concurrency, client=client, send_url=send_url, stop_event=stop, pop_timeout=0.1))
+    thread.start()
+    while client.llen(worker.QUEUE_KEY) or client.llen(worker.PROCESSING_KEY):
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return jobs / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CRM queue worker")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--delay", type=float, default=0.005, help="Seconds the stub /send takes per request")
+    parser.add_argument("--levels", default="1,4,16,64")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.delay)
+    send_url = f"http://127.0.0.1:{server.server_address[1]}/send"
+    for level in (int(x) for x in args.levels.split(",")):
+        print(f"concurrency={level:<4d} {run(level, args.jobs, send_url):10,.0f} jobs/s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
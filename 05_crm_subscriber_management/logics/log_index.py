@@ -0,0 +1,196 @@
+import os
+import json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+BLOCK_SIZE = 64 * 1024
+
+
+def lock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def unlock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def index_path_for(log_path):
+    return os.path.splitext(log_path)[0] + ".idx.jsonl"
+
+
+def index_record(offset, length, entry):
+    """Sidecar row for one log line: where it lives plus the fields /logs filters on."""
+    return [offset, length, entry.get("timestamp"), entry.get("username"), entry.get("tier"), entry.get("type")]
+
+
+def iter_lines_reverse(path, end=None, block_size=BLOCK_SIZE):
+    """Yield ``(offset, line)`` pairs from the end of ``path`` backwards.
+
+    Only the blocks that hold the returned lines are read, so taking the last
+    N lines costs the same no matter how large the file is. ``end`` limits the
+    scan to bytes before that offset; pass a previously yielded offset to
+    continue from where an earlier scan stopped.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        tail = b""
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size) + tail
+            lines = chunk.split(b"\n")
+            # The first piece may be the second half of a line in an earlier block.
+            tail = lines.pop(0)
+            line_end = pos + len(chunk)
+            for line in reversed(lines):
+                line_end -= len(line) + 1
+                if line:
+                    yield line_end + 1, line
+        if tail:
+            yield 0, tail
+
+
+def tail_lines(path, count):
+    """Return the last ``count`` lines of ``path`` in file order."""
+    lines = []
+    for _, line in iter_lines_reverse(path):
+        if len(lines) >= count:
+            break
+        lines.append(line)
+    lines.reverse()
+    return lines
+
+
+def _matches(record, username, tier, message_type, until):
+    _, _, timestamp, rec_username, rec_tier, rec_type = record
+    if username and rec_username != username:
+        return False
+    if tier and rec_tier != tier:
+        return False
+    if message_type and rec_type != message_type:
+        return False
+    if until and timestamp and timestamp > until:
+        return False
+    return True
+
+
+def _index_records(log, start, end):
+    """Index rows for the log lines between byte offsets ``start`` and ``end``."""
+    log.seek(start)
+    offset = start
+    while offset < end:
+        line = log.readline()
+        if not line:
+            break
+        stripped = line.rstrip(b"\n")
+        try:
+            entry = json.loads(stripped) if stripped else None
+        except ValueError:  # a torn line from a crashed writer
+            entry = None
+        if entry is not None:
+            yield index_record(offset, len(stripped), entry)
+        offset += len(line)
+
+
+def _index_coverage(index_path):
+    """Return ``(log_end, index_size)``: the log offset the index covers up to and the size of its valid part.
+
+    A torn last row left by an interrupted write is not counted as valid.
+    """
+    if not os.path.exists(index_path):
+        return 0, 0
+    index_size = os.path.getsize(index_path)
+    for offset, line in iter_lines_reverse(index_path):
+        try:
+            log_offset, length, *_ = json.loads(line)
+        except ValueError:
+            index_size = offset
+            continue
+        return log_offset + length + 1, index_size
+    return 0, index_size
+
+
+def sync_index(log_path, log, log_size):
+    """Index any log lines before ``log_size`` the sidecar index doesn't cover yet and return the index size.
+
+    This backfills logs written before the index existed, or while it was
+    missing. Call it with ``log`` (an open binary handle on ``log_path``)
+    locked, so no writer appends in between.
+    """
+    index_path = index_path_for(log_path)
+    covered, index_size = _index_coverage(index_path)
+    if covered > log_size:  # the log was truncated or replaced
+        covered, index_size = 0, 0
+    if covered >= log_size and os.path.exists(index_path) and os.path.getsize(index_path) == index_size:
+        return index_size
+    with open(index_path, "ab") as idx:
+        idx.truncate(index_size)
+        idx.writelines((json.dumps(record) + "\n").encode("utf-8") for record in _index_records(log, covered, log_size))
+        return idx.tell()
+
+
+def query_logs(log_path, limit=100, cursor=None, username=None, tier=None,
+               message_type=None, since=None, until=None):
+    """Return ``(entries, next_cursor)`` for one page of the message log.
+
+    Pages walk backwards from the newest entry; ``next_cursor`` is the
+    sidecar-index offset to pass back for the following (older) page, or
+    ``None`` once the start of the log is reached. Filtering reads only the
+    sidecar index, and the log itself is touched once per returned entry.
+    Records older than ``since`` are skipped rather than ending the scan:
+    concurrent writers can append batches slightly out of timestamp order.
+
+    The index is first brought up to date under the writers' file lock, and
+    only the part that existed then is read, so rows being appended
+    meanwhile are never seen half-written.
+    """
+    index_path = index_path_for(log_path)
+    with open(log_path, "rb") as log:
+        lock_file(log)
+        try:
+            index_size = sync_index(log_path, log, log.seek(0, os.SEEK_END))
+        finally:
+            unlock_file(log)
+    end = index_size if cursor is None else min(cursor, index_size)
+
+    matches = []
+    next_cursor = None
+    for index_offset, line in iter_lines_reverse(index_path, end=end):
+        record = json.loads(line)
+        if since and record[2] and record[2] < since:
+            continue
+        if _matches(record, username, tier, message_type, until):
+            matches.append(record)
+            if len(matches) >= limit:
+                next_cursor = index_offset or None
+                break
+
+    entries = []
+    with open(log_path, "rb") as f:
+        for offset, length, *_ in reversed(matches):
+            f.seek(offset)
+            entries.append(json.loads(f.read(length)))
+    return entries, next_cursor
+
+
+def rebuild_index(log_path):
+    """Regenerate the sidecar index from scratch."""
+    index_path = index_path_for(log_path)
+    tmp_path = index_path + ".tmp"
+    with open(log_path, "rb") as log, open(tmp_path, "w", encoding="utf-8") as out:
+        out.writelines(json.dumps(record) + "\n" for record in _index_records(log, 0, log.seek(0, os.SEEK_END)))
+    os.replace(tmp_path, index_path)
+    return index_path
@@ -1,9 +1,124 @@
 import os
 import json
+import atexit
+import threading
 from datetime import datetime
 
+from logics.log_index import index_path_for, index_record, lock_file, sync_index, unlock_file
+
 LOG_PATH = os.path.join(os.path.dirname(__file__), "../logs/message_log.jsonl")
 
+
+class BufferedLogSink:
+    """Collects log entries in memory and appends them to a JSONL file in batches.
+
+    A batch is written when ``max_entries`` are buffered or ``flush_interval``
+    seconds have passed, whichever comes first. Each batch is written under an
+    exclusive file lock with a single write, so several sender processes can
+    share one log without interleaving lines. While the lock is held the
+    byte offset of every new line is appended to the sidecar index used by
+    the /logs endpoint, after indexing any older lines it is missing. If a
+    batch can't be written it goes back to the front of the buffer for the
+    next flush. Entries written after close() are flushed straight away.
+    """
+
+    def __init__(self, path=LOG_PATH, max_entries=500, flush_interval=1.0):
+        self.path = path
+        self.index_path = index_path_for(path)
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="message-log-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._buffer_lock:
+            self._buffer.append((line, entry))
+            full = len(self._buffer) >= self.max_entries
+        if self._closed:
+            try:
+                self.flush()
+            except OSError as e:
+                print("Failed to flush message log:", e)
+        elif full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._write_lock:
+            with self._buffer_lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            data = b"".join(line for line, _ in lines)
+            written = False
+            try:
+                with open(self.path, "a+b") as f:
+                    lock_file(f)
+                    try:
+                        offset = f.seek(0, os.SEEK_END)
+                        try:
+                            sync_index(self.path, f, offset)
+                            f.write(data)
+                            f.flush()
+                        except OSError:
+                            f.truncate(offset)
+                            raise
+                        written = True
+                        index_lines = []
+                        for line, entry in lines:
+                            record = index_record(offset, len(line) - 1, entry)
+                            index_lines.append(json.dumps(record) + "\n")
+                            offset += len(line)
+                        with open(self.index_path, "a", encoding="utf-8") as idx:
+                            idx.write("".join(index_lines))
+                    finally:
+                        unlock_file(f)
+            except OSError:
+                if not written:
+                    self._requeue(lines)
+                raise
+
+    def _requeue(self, lines):
+        with self._buffer_lock:
+            self._buffer[:0] = lines
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                print("Failed to flush message log:", e)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = BufferedLogSink()
+    return _sink
+
+
 def log_message(username, tier, message_type, message):
     log_entry = {
         "timestamp": datetime.utcnow().isoformat(),
@@ -12,5 +127,4 @@ def log_message(username, tier, message_type, message):
         "type": message_type,
         "message": message
     }
-    with open(LOG_PATH, "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
+    get_sink().write(log_entry)
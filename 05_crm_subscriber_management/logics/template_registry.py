@@ -0,0 +1,100 @@
+import os
+import json
+import threading
+import time
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "../message_templates/tiers.json")
+
+
+class TemplateRegistry:
+    """Parsed view of tiers.json shared by the /generate and /send endpoints.
+
+    Lookups read an immutable (tier, message_type) -> message table. When the
+    file changes on disk a background thread parses the new version and swaps
+    the table in with a single assignment, so requests keep being answered
+    from the previous table while a reload is running.
+    """
+
+    def __init__(self, path=TEMPLATE_PATH, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._table = {}
+        self._signature = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "reload_errors": 0,
+            "last_parse_seconds": 0.0,
+            "total_parse_seconds": 0.0,
+        }
+        self._load(self._file_signature())
+
+    def _file_signature(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, signature):
+        start = time.perf_counter()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            templates = json.load(f)
+        table = {
+            (tier, message_type): message
+            for tier, messages in templates.items()
+            for message_type, message in messages.items()
+        }
+        elapsed = time.perf_counter() - start
+        self._table = table
+        self._signature = signature
+        with self._stats_lock:
+            self._stats["reloads"] += 1
+            self._stats["last_parse_seconds"] = elapsed
+            self._stats["total_parse_seconds"] += elapsed
+
+    def _reload_in_background(self, signature):
+        try:
+            self._load(signature)
+        except Exception as e:  # noqa: BLE001
+            # Half-written file, bad JSON or an unexpected shape: keep serving
+            # the last good table.
+            print("Failed to reload message templates:", e)
+            self._signature = signature  # don't retry until the file changes again
+            with self._stats_lock:
+                self._stats["reload_errors"] += 1
+        finally:
+            self._reload_lock.release()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.poll_interval
+        try:
+            signature = self._file_signature()
+        except OSError:
+            return
+        if signature == self._signature:
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return  # a reload is already running
+        threading.Thread(target=self._reload_in_background, args=(signature,), daemon=True).start()
+
+    def get(self, tier, message_type, default=None):
+        self._maybe_reload()
+        message = self._table.get((tier, message_type))
+        with self._stats_lock:
+            if message is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+        return default if message is None else message
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["templates"] = len(self._table)
+        return stats
+
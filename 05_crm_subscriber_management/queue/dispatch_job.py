@@ -1,5 +1,9 @@
 import redis
 import json
+from itertools import islice
+
+QUEUE_KEY = "crm_message_queue"
+DEDUPE_PREFIX = "crm_dispatch_dedupe"
 
 r = redis.Redis(host='localhost', port=6379, db=0)
 
@@ -9,5 +13,75 @@ def dispatch_message_job(username, tier, message_type):
         "tier": tier,
         "message_type": message_type
     }
-    r.lpush("crm_message_queue", json.dumps(job))
+    r.lpush(QUEUE_KEY, json.dumps(job))
     print(f"Dispatched job for {username}")
+
+
+def _print_progress(dispatched, duplicates):
+    print(f"Dispatched {dispatched} jobs ({duplicates} duplicates skipped)")
+
+
+def _dedupe_key(job):
+    return f"{DEDUPE_PREFIX}:{job['username']}:{job['message_type']}"
+
+
+def _claim(client, jobs, window):
+    """Keep only jobs whose (username, message_type) was not dispatched in the last ``window`` seconds."""
+    pipe = client.pipeline(transaction=False)
+    for job in jobs:
+        pipe.set(_dedupe_key(job), 1, nx=True, ex=window)
+    return [job for job, claimed in zip(jobs, pipe.execute()) if claimed]
+
+
+def _push(client, jobs, claimed):
+    """LPUSH ``jobs``, releasing their dedupe claims if the push fails so a retry isn't suppressed."""
+    try:
+        client.lpush(QUEUE_KEY, *(json.dumps(job) for job in jobs))
+    except redis.RedisError:
+        if claimed:
+            client.delete(*(_dedupe_key(job) for job in jobs))
+        raise
+
+
+def dispatch_bulk(subscribers, message_type=None, batch_size=1000, dedupe_window=None,
+                  progress=_print_progress, client=None):
+    """Queue one job per subscriber using pipelined LPUSH batches.
+
+    ``subscribers`` is any iterable of dicts with ``username`` and ``tier``
+    (and ``message_type`` unless one is given for the whole campaign); it is
+    consumed lazily, so a generator over a 50k-row export never sits in memory
+    at once. Repeated (username, message_type) pairs are dropped within the
+    call, and across calls for ``dedupe_window`` seconds when it is set; if
+    a batch can't be queued its claims are released before the error is
+    raised.
+    ``progress(dispatched, duplicates)`` runs after every batch.
+    """
+    client = client or r
+    seen = set()
+    dispatched = duplicates = 0
+    subscribers = iter(subscribers)
+    while True:
+        chunk = list(islice(subscribers, batch_size))
+        if not chunk:
+            break
+        jobs = []
+        for sub in chunk:
+            job = {
+                "username": sub["username"],
+                "tier": sub.get("tier"),
+                "message_type": message_type or sub["message_type"],
+            }
+            key = (job["username"], job["message_type"])
+            if key in seen:
+                continue
+            seen.add(key)
+            jobs.append(job)
+        if dedupe_window:
+            jobs = _claim(client, jobs, dedupe_window)
+        if jobs:
+            _push(client, jobs, claimed=bool(dedupe_window))
+        dispatched += len(jobs)
+        duplicates += len(chunk) - len(jobs)
+        if progress:
+            progress(dispatched, duplicates)
+    return {"dispatched": dispatched, "duplicates": duplicates}
@@ -1,23 +1,170 @@
 import redis
 import json
 import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+
+QUEUE_KEY = "crm_message_queue"
+PROCESSING_KEY = "crm_message_queue:processing"
+FAILED_KEY = "crm_message_queue:failed"
+DEAD_LETTER_KEY = "crm_message_queue:dead"
+SEND_URL = "http://localhost:5001/send"
+MAX_ATTEMPTS = 3
 
 r = redis.Redis(host='localhost', port=6379, db=0)
 
 def queue_worker():
     print("CRM Worker running...")
     while True:
-        job_data = r.brpop("crm_message_queue", timeout=5)
+        job_data = r.brpop(QUEUE_KEY, timeout=5)
         if job_data:
             _, job_str = job_data
             job = json.loads(job_str)
             print(f"Processing job: {job}")
             try:
-                res = requests.post("http://localhost:5001/send", json=job)
+                res = requests.post(SEND_URL, json=job)
                 print("Sent message:", res.json())
             except Exception as e:
                 print("Failed to send message:", e)
 
+
+def make_session(pool_size):
+    """HTTP session whose connection pool is large enough for every worker thread."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def pop_batch(client, batch_size, timeout=5):
+    """Move up to ``batch_size`` jobs from the queue to the processing list.
+
+    The moves run in one MULTI/EXEC round trip, so a job is always in exactly
+    one of the two lists. When the queue is empty this blocks on a single
+    BRPOPLPUSH instead of spinning.
+    """
+    pipe = client.pipeline(transaction=True)
+    for _ in range(batch_size):
+        pipe.rpoplpush(QUEUE_KEY, PROCESSING_KEY)
+    jobs = [job for job in pipe.execute() if job is not None]
+    if not jobs and timeout:
+        job = client.brpoplpush(QUEUE_KEY, PROCESSING_KEY, timeout=timeout)
+        if job is not None:
+            jobs.append(job)
+    return jobs
+
+
+def parse_job(job_str):
+    """Decode a queued job, or return None if it isn't a JSON object."""
+    try:
+        job = json.loads(job_str)
+    except ValueError:
+        return None
+    return job if isinstance(job, dict) else None
+
+
+def deliver(session, job, send_url=SEND_URL, timeout=30):
+    res = session.post(send_url, json=job, timeout=timeout)
+    res.raise_for_status()
+    return res
+
+
+def dead_letter(client, job_str):
+    """Move a job that can't be decoded from the processing list to the dead-letter list."""
+    pipe = client.pipeline(transaction=True)
+    pipe.lrem(PROCESSING_KEY, 1, job_str)
+    pipe.lpush(DEAD_LETTER_KEY, job_str)
+    pipe.execute()
+
+
+def acknowledge(client, job_str, error=None):
+    """Drop a finished job from the processing list, retrying or parking failures."""
+    if error is not None and parse_job(job_str) is None:
+        dead_letter(client, job_str)
+        return
+    pipe = client.pipeline(transaction=True)
+    pipe.lrem(PROCESSING_KEY, 1, job_str)
+    if error is not None:
+        job = parse_job(job_str)
+        job["attempts"] = job.get("attempts", 0) + 1
+        job["last_error"] = str(error)
+        target = FAILED_KEY if job["attempts"] >= MAX_ATTEMPTS else QUEUE_KEY
+        pipe.lpush(target, json.dumps(job))
+    pipe.execute()
+
+
+def requeue_processing(client):
+    """Return jobs left in the processing list by a crashed worker to the queue.
+
+    Only call this when no other worker is running, otherwise in-flight jobs
+    would be delivered twice.
+    """
+    moved = 0
+    while client.rpoplpush(PROCESSING_KEY, QUEUE_KEY) is not None:
+        moved += 1
+    return moved
+
+
+def concurrent_queue_worker(concurrency=8, batch_size=None, client=None, session=None,
+                            send_url=SEND_URL, stop_event=None, pop_timeout=5):
+    """Deliver jobs with up to ``concurrency`` HTTP requests in flight.
+
+    Jobs are popped in batches into the processing list and only removed from
+    it once ``/send`` has answered, so a crash never loses a popped job. Jobs
+    that aren't valid JSON objects go to the dead-letter list unsent.
+    """
+    client = client or r
+    session = session or make_session(concurrency)
+    batch_size = batch_size or concurrency
+    stop_event = stop_event or threading.Event()
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def handle(job_str):
+        job = parse_job(job_str)
+        try:
+            if job is None:
+                print("Dead-lettering malformed job:", job_str[:200])
+                dead_letter(client, job_str)
+                return
+            deliver(session, job, send_url)
+        except Exception as e:
+            print("Failed to send message:", e)
+            acknowledge(client, job_str, error=e)
+        else:
+            acknowledge(client, job_str)
+        finally:
+            slots.release()
+
+    print(f"CRM Worker running (concurrency={concurrency}, batch_size={batch_size})...")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not stop_event.is_set():
+            # Wait for a free slot, then grab as many jobs as there are free slots.
+            slots.acquire()
+            free = 1
+            while free < batch_size and slots.acquire(blocking=False):
+                free += 1
+            jobs = pop_batch(client, free, timeout=pop_timeout)
+            for _ in range(free - len(jobs)):
+                slots.release()
+            for job_str in jobs:
+                pool.submit(handle, job_str)
+
+
 if __name__ == "__main__":
-    queue_worker()
+    parser = argparse.ArgumentParser(description="CRM message queue worker")
+    parser.add_argument("--concurrency", type=int, default=0,
+                        help="Deliver jobs concurrently with this many workers (0 = one job at a time)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Jobs popped per Redis round trip")
+    parser.add_argument("--recover", action="store_true",
+                        help="Requeue jobs left in the processing list before starting")
+    args = parser.parse_args()
+    if args.recover:
+        print(f"Requeued {requeue_processing(r)} unacknowledged jobs")
+    if args.concurrency > 0:
+        concurrent_queue_worker(concurrency=args.concurrency, batch_size=args.batch_size)
+    else:
+        queue_worker()
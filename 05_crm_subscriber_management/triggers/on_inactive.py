@@ -1,9 +1,15 @@
-from utils.content_generation import trigger_content_generation, get_latest_asset
+from utils.content_generation import submit_content_generation, get_latest_asset
+from utils.churn_scores import get_churn_score, get_subscriber_id
 
-def on_inactive_subscriber(username, tier, days_inactive):
-    print(f"Triggering retention message for {username}, inactive {days_inactive} days")
-    # 1. Trigger content generation
-    gen_result = trigger_content_generation()
+def on_inactive_subscriber(username, tier, days_inactive, subscriber_id=None):
+    # Churn scores are keyed by subscriber id, not username.
+    if subscriber_id is None:
+        subscriber_id = get_subscriber_id(username)
+    churn_score = get_churn_score(subscriber_id) if subscriber_id is not None else None
+    risk = f", churn risk {churn_score:.0%}" if churn_score is not None else ""
+    print(f"Triggering retention message for {username}, inactive {days_inactive} days{risk}")
+    # 1. Queue fresh content in the background and use the best asset we already have
+    gen_result = submit_content_generation()
     asset = get_latest_asset()
     # 2. Compose retention message with generated asset
     message = f"Hey {username}, we've missed you! Check out this new content."
@@ -15,7 +21,8 @@ def on_inactive_subscriber(username, tier, days_inactive):
         "tier": tier,
         "message_type": "Retention",
         "message": message,
-        "asset_path": asset_path
+        "asset_path": asset_path,
+        "churn_score": churn_score
     }
     try:
         resp = requests.post("http://127.0.0.1:5001/send", json=payload)
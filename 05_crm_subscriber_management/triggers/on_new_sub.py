@@ -1,9 +1,9 @@
-from utils.content_generation import trigger_content_generation, get_latest_asset
+from utils.content_generation import submit_content_generation, get_latest_asset
 
 def on_new_subscriber(username, tier):
     print(f"Triggered welcome message for {username} ({tier})")
-    # 1. Trigger content generation
-    gen_result = trigger_content_generation()
+    # 1. Queue fresh content in the background and use the best asset we already have
+    gen_result = submit_content_generation()
     asset = get_latest_asset()
     # 2. Compose welcome message with generated asset
     message = f"Welcome, {username}! Enjoy your exclusive content."
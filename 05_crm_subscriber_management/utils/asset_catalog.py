@@ -0,0 +1,135 @@
+import os
+import csv
+import io
+import hashlib
+import threading
+import time
+
+MANIFEST_PATH = "assets/asset_manifest.csv"
+# Bytes at the start of the manifest and just before the read offset that are
+# hashed to tell an append from a rewrite.
+FINGERPRINT_BYTES = 4096
+
+
+def _complete_records_end(data):
+    """Length of the prefix of ``data`` that holds only whole CSV records.
+
+    A newline inside a quoted field doesn't end a record; quotes inside fields
+    are doubled, so the quote count's parity says whether a newline is quoted.
+    """
+    end = pos = 0
+    quoted = False
+    for line in data.split(b"\n")[:-1]:
+        pos += len(line) + 1
+        if line.count(b'"') % 2:
+            quoted = not quoted
+        if not quoted:
+            end = pos
+    return end
+
+
+class AssetCatalog:
+    """In-memory view of the asset manifest with O(1) "latest asset" lookups.
+
+    The manifest is append-only, so after the first load only the bytes added
+    since the previous refresh are read and parsed. Rows are indexed by
+    ``asset_type`` (the manifest's tag column) and by ``prompt``. A replaced
+    or truncated manifest is detected by its inode and size, and one rewritten
+    in place by a hash of its first bytes and of the bytes before the read
+    offset; either way it is reloaded in full.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._inode = None
+        self._mtime = None
+        self._fingerprint = None
+        self._offset = 0
+        self._fieldnames = None
+        self._latest = None
+        self._by_tag = {}
+        self._by_prompt = {}
+
+    def _add(self, row):
+        self._latest = row
+        if row.get("asset_type"):
+            self._by_tag.setdefault(row["asset_type"], []).append(row)
+        if row.get("prompt"):
+            self._by_prompt.setdefault(row["prompt"], []).append(row)
+
+    def _read_fingerprint(self, f):
+        f.seek(0)
+        head = f.read(min(self._offset, FINGERPRINT_BYTES))
+        f.seek(max(0, self._offset - FINGERPRINT_BYTES))
+        tail = f.read(min(self._offset, FINGERPRINT_BYTES))
+        return hashlib.blake2b(head + tail, digest_size=16).digest()
+
+    def _is_append(self):
+        """Whether the bytes already read are unchanged, i.e. the file only grew."""
+        if not self._offset:
+            return True
+        with open(self.path, "rb") as f:
+            return self._read_fingerprint(f) == self._fingerprint
+
+    def _read_new_rows(self, size):
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+            # Leave a half-written last record for the next refresh.
+            end = _complete_records_end(data)
+            if not end:
+                return
+            self._offset += end
+            self._fingerprint = self._read_fingerprint(f)
+        text = data[:end].decode("utf-8")
+        if self._fieldnames is None:
+            reader = csv.DictReader(io.StringIO(text))
+            rows = list(reader)
+            self._fieldnames = reader.fieldnames
+        else:
+            rows = list(csv.DictReader(io.StringIO(text), fieldnames=self._fieldnames))
+        for row in rows:
+            self._add(row)
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.poll_interval
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        if st.st_size == self._offset and st.st_ino == self._inode and st.st_mtime_ns == self._mtime:
+            return
+        with self._lock:
+            if st.st_ino != self._inode or st.st_size < self._offset or not self._is_append():
+                self._reset()
+                self._inode = st.st_ino
+            self._mtime = st.st_mtime_ns
+            if st.st_size > self._offset:
+                self._read_new_rows(st.st_size)
+
+    def latest(self, tag=None, prompt=None):
+        """Most recent asset, optionally restricted to an ``asset_type`` tag or an exact prompt."""
+        self.refresh()
+        if tag is None and prompt is None:
+            return self._latest
+        rows = self._by_tag.get(tag, []) if prompt is None else self._by_prompt.get(prompt, [])
+        if tag is not None and prompt is not None:
+            rows = [row for row in rows if row.get("asset_type") == tag]
+        return rows[-1] if rows else None
+
+    def by_tag(self, tag):
+        self.refresh()
+        return list(self._by_tag.get(tag, []))
+
+    def by_prompt(self, prompt):
+        self.refresh()
+        return list(self._by_prompt.get(prompt, []))
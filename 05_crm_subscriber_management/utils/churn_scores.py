@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+
+# The churn model and its scorer live in 08_onlyfans_model.
+MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "08_onlyfans_model"))
+if MODEL_DIR not in sys.path:
+    sys.path.insert(0, MODEL_DIR)
+
+# Subscriber ids (what scores are keyed by) come from the CRM database.
+CRM_DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "crm.db"))
+
+_scorer = None
+_failure = None  # (model file signature, exception) of the last failed load
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _get_scorer():
+    """The shared scorer. A failed load is remembered until the model file changes, so a
+    missing model costs one stat per call instead of a joblib.load attempt."""
+    global _scorer, _failure
+    if _scorer is None:
+        from churn_scoring import ChurnScorer, MODEL_PATH, SCORES_PATH
+        model_path = os.getenv("CHURN_MODEL_PATH", MODEL_PATH)
+        signature = _file_signature(model_path)
+        if _failure is not None and _failure[0] == signature:
+            raise _failure[1]
+        try:
+            _scorer = ChurnScorer(model_path, os.getenv("CHURN_SCORES_PATH", SCORES_PATH))
+        except Exception as e:
+            _failure = (signature, e)
+            raise
+        _failure = None
+    return _scorer
+
+def get_subscriber_id(username):
+    """``subscriber.id`` for a username in the CRM database, or None if there is no such subscriber."""
+    path = os.path.abspath(os.getenv("CRM_DB_PATH", CRM_DB_PATH))
+    try:
+        # Read-only, so a missing database isn't silently created.
+        with closing(sqlite3.connect(Path(path).as_uri() + "?mode=ro", uri=True)) as conn:
+            row = conn.execute("SELECT id FROM subscriber WHERE username = ?", (username,)).fetchone()
+    except sqlite3.Error as e:
+        print("Subscriber lookup failed:", e)
+        return None
+    return None if row is None else row[0]
+
+def get_churn_score(subscriber_id, features=None):
+    """Churn probability for a subscriber, or None if no model or score is available.
+
+    Scores written by the batch scoring run are picked up when the scores
+    file changes. Passing ``features`` rescores the subscriber if they
+    differ from the cached ones.
+    """
+    try:
+        scorer = _get_scorer()
+        scorer.load_scores()
+        if features is not None:
+            return scorer.score_one(subscriber_id, features)
+        return scorer.lookup(subscriber_id)
+    except Exception as e:
+        # Scoring is advisory; triggers must keep working without a model.
+        print("Churn score unavailable:", e)
+        return None
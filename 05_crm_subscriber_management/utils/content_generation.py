@@ -1,5 +1,5 @@
 import requests
-import csv
+from utils.asset_catalog import AssetCatalog
 
 def trigger_content_generation(prompt_file="prompt_templates/cover_image_prompts.json"):
     url = "http://127.0.0.1:5001/generate-assets"
@@ -8,12 +8,23 @@ def trigger_content_generation(prompt_file="prompt_templates/cover_image_prompts
     response = requests.post(url, json=payload, headers=headers)
     return response.json()
 
-def get_latest_asset():
+def submit_content_generation(prompt_file="prompt_templates/cover_image_prompts.json"):
+    """Queue a generation job and return its record without waiting for the run."""
+    url = "http://127.0.0.1:5001/generation-jobs"
+    payload = {"prompt_file": prompt_file}
+    try:
+        response = requests.post(url, json=payload, timeout=5)
+        return response.json()
+    except Exception as e:
+        # Generation is best effort; the caller still has the existing assets.
+        print("Failed to submit generation job:", e)
+        return {"status": "error", "error": str(e)}
+
+_catalog = AssetCatalog()
+
+def get_latest_asset(tag=None, prompt=None):
     try:
-        with open("assets/asset_manifest.csv", "r", encoding="utf-8") as f:
-            rows = list(csv.DictReader(f))
-            if rows:
-                return rows[-1]  # Most recent asset
+        return _catalog.latest(tag=tag, prompt=prompt)  # Most recent asset
     except Exception as e:
         print("Error reading asset manifest:", e)
     return None
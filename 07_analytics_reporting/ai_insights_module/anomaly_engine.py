@@ -0,0 +1,153 @@
+# anomaly_engine.py
+
+import os
+import random
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+MODEL_PATH = '../data/anomaly_model.joblib'
+
+# 1.4826 * MAD estimates the standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+
+
+class AnomalyEngine:
+    """Scores payment batches as they arrive instead of refitting on the whole history.
+
+    Each record is first compared with the median/MAD of its subscriber's
+    last ``window`` payments as of the start of the batch; only records whose
+    robust z-score exceeds ``z_threshold`` (or that come from subscribers with
+    too little history) are passed to the persisted IsolationForest. The
+    forest is refit from a bounded reservoir sample of recent amounts at most
+    once per ``refit_interval`` seconds. ``score_csv`` remembers how many rows
+    of each file it has scored, so a rerun only scores rows appended since.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, window=50, min_history=5, z_threshold=3.5,
+                 contamination=0.05, refit_interval=24 * 3600, sample_size=100_000, seed=0):
+        self.model_path = model_path
+        self.window = window
+        self.min_history = min_history
+        self.z_threshold = z_threshold
+        self.contamination = contamination
+        self.refit_interval = refit_interval
+        self.sample_size = sample_size
+        self._rng = random.Random(seed)
+        self._history = {}  # subscriber_id -> deque of recent amounts
+        self._summary = {}  # subscriber_id -> (median, mad, count)
+        self._sample = []
+        self._seen = 0
+        self._scored = {}  # absolute csv path -> data rows already scored
+        self.model = None
+        self.fitted_at = 0.0
+        if os.path.exists(model_path):
+            saved = joblib.load(model_path)
+            self.model, self.fitted_at = saved['model'], saved['fitted_at']
+            self._history, self._summary = saved['history'], saved['summary']
+            self._sample, self._seen = saved['sample'], saved['seen']
+            self._scored = saved.get('scored', {})
+
+    def save(self):
+        """Persist the model along with the rolling statistics it was scoring against."""
+        joblib.dump({
+            'model': self.model, 'fitted_at': self.fitted_at,
+            'history': self._history, 'summary': self._summary,
+            'sample': self._sample, 'seen': self._seen,
+            'scored': self._scored,
+        }, self.model_path)
+
+    def _prefilter(self, subscriber_ids, amounts):
+        """Robust z-score per record against its subscriber's history, then fold the batch into it."""
+        uniq, inverse = np.unique(subscriber_ids, return_inverse=True)
+        missing = (np.nan, np.nan, 0)
+        summary = np.array([self._summary.get(sub, missing) for sub in uniq.tolist()], dtype=float).reshape(-1, 3)
+        median, mad, count = summary[inverse].T
+
+        deviation = np.abs(amounts - median)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = deviation / (MAD_SCALE * mad)
+        # A flat history (MAD 0) only tolerates the exact same amount.
+        z = np.where(mad == 0, np.where(deviation == 0, 0.0, np.inf), z)
+        z[count < self.min_history] = np.inf  # not enough history: let the model decide
+
+        self._update_history(uniq, inverse, amounts)
+        return z
+
+    def _update_history(self, uniq, inverse, amounts):
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(uniq)))
+        window = np.full((len(uniq), self.window), np.nan)
+        start = 0
+        for k, (sub, end) in enumerate(zip(uniq.tolist(), bounds.tolist())):
+            history = self._history.get(sub)
+            if history is None:
+                history = self._history[sub] = deque(maxlen=self.window)
+            history.extend(amounts[order[start:end]].tolist())
+            window[k, :len(history)] = history
+            start = end
+        median = np.nanmedian(window, axis=1)
+        mad = np.nanmedian(np.abs(window - median[:, None]), axis=1)
+        count = np.count_nonzero(~np.isnan(window), axis=1)
+        self._summary.update(zip(uniq.tolist(), zip(median.tolist(), mad.tolist(), count.tolist())))
+
+    def _remember(self, amounts):
+        # Reservoir sampling keeps a uniform sample of everything seen so far.
+        for amount in amounts.tolist():
+            self._seen += 1
+            if len(self._sample) < self.sample_size:
+                self._sample.append(amount)
+            else:
+                j = self._rng.randrange(self._seen)
+                if j < self.sample_size:
+                    self._sample[j] = amount
+
+    def refit(self, now=None):
+        if not self._sample:
+            return False
+        model = IsolationForest(contamination=self.contamination, random_state=0)
+        model.fit(np.asarray(self._sample).reshape(-1, 1))
+        self.model, self.fitted_at = model, now or time.time()
+        self.save()
+        return True
+
+    def maybe_refit(self, now=None):
+        now = now or time.time()
+        if self.model is None or now - self.fitted_at >= self.refit_interval:
+            return self.refit(now)
+        return False
+
+    def score_batch(self, df):
+        """Return ``df`` with ``z_score`` and ``anomaly`` (True/False) columns added."""
+        amounts = df['amount'].to_numpy(dtype=float)
+        z = self._prefilter(df['subscriber_id'].to_numpy(), amounts)
+        self._remember(amounts)
+        self.maybe_refit()
+
+        anomaly = np.zeros(len(df), dtype=bool)
+        candidates = z > self.z_threshold
+        if candidates.any() and self.model is not None:
+            anomaly[candidates] = self.model.predict(amounts[candidates].reshape(-1, 1)) == -1
+        out = df.copy()
+        out['z_score'] = z
+        out['anomaly'] = anomaly
+        return out
+
+    def score_csv(self, path, chunk_rows=100_000):
+        """Score the rows of a transformed payments CSV that no earlier call has
+        scored, chunk by chunk, yielding only the anomalous rows.
+
+        The row watermark is saved with the rest of the state by ``save()``.
+        """
+        key = os.path.abspath(path)
+        done = self._scored.get(key, 0)
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, skiprows=range(1, done + 1)):
+            if chunk.empty:
+                continue
+            scored = self.score_batch(chunk)
+            self._scored[key] = done = done + len(chunk)
+            yield scored[scored['anomaly']]
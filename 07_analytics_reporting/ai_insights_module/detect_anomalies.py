@@ -1,12 +1,33 @@
 # detect_anomalies.py
 
+import argparse
+
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-df = pd.read_csv('../data/payments_transformed_2025_05.csv')
+TRANSFORMED_PATH = '../data/payments_transformed_2025_05.csv'
+
+def detect_full(path=TRANSFORMED_PATH):
+    df = pd.read_csv(path)
+
+    clf = IsolationForest(contamination=0.05)
+    df['anomaly'] = clf.fit_predict(df[['amount']])
+    return df[df['anomaly'] == -1]
+
+def detect_incremental(path=TRANSFORMED_PATH):
+    from anomaly_engine import AnomalyEngine
+
+    engine = AnomalyEngine()
+    chunks = list(engine.score_csv(path))  # only rows added since the last run
+    engine.save()
+    return pd.concat(chunks) if chunks else pd.DataFrame()
 
-clf = IsolationForest(contamination=0.05)
-df['anomaly'] = clf.fit_predict(df[['amount']])
-anomalies = df[df['anomaly'] == -1]
-print('Anomalous payment records:')
-print(anomalies)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Flag anomalous payments')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Score with the persisted AnomalyEngine instead of refitting on the whole file')
+    parser.add_argument('--src', default=TRANSFORMED_PATH)
+    args = parser.parse_args()
+    anomalies = detect_incremental(args.src) if args.incremental else detect_full(args.src)
+    print('Anomalous payment records:')
+    print(anomalies)
@@ -1,4 +1,5 @@
 # Generate strategy suggestions from metrics
 def generate_recommendations(metrics):
-    if metrics.get('churn_rate', 0) > 0.1:
+    # churn_rate is None for a creator's first month (nothing to compare against).
+    if (metrics.get('churn_rate') or 0) > 0.1:
         return 'Consider re-engagement campaign.'
@@ -0,0 +1,76 @@
+"""Time and peak memory of the in-memory and streaming payment transforms.
+
+Generates a synthetic raw payments CSV, then runs each transform in its own
+process so the reported peak RSS belongs to that transform alone (Unix only).
+
+    python 07_analytics_reporting/benchmarks/bench_transform_payments.py --rows 10000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ETL_DIR = Path(__file__).resolve().parents[1] / "etl_pipeline"
+
+RUNNER = '''
+import sys
+sys.path.insert(0, {etl_dir!r})
+import transform_data
+mode, src, dst, chunk_rows = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+if mode == "in-memory":
+    transform_data.transform_payments(src, dst)
+else:
+    transform_data.transform_payments_streaming(src, dst, chunk_rows, fmt=mode.split("-")[1])
+'''
+
+
+def write_synthetic(path, rows, chunk=1_000_000, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2025-01-01", "2025-12-31").strftime("%Y-%m-%d").to_numpy()
+    written = 0
+    while written < rows:
+        n = min(chunk, rows - written)
+        pd.DataFrame({
+            "subscriber_id": rng.integers(1, 500_000, n),
+            "amount": rng.gamma(2.0, 12.0, n).round(2),
+            "date": days[rng.integers(0, len(days), n)],
+        }).to_csv(path, mode="a", header=written == 0, index=False)
+        written += n
+
+
+def run(mode, src, dst, chunk_rows):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", RUNNER.format(etl_dir=str(ETL_DIR)), mode, src, dst, str(chunk_rows)],
+                   check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return elapsed, peak_kb / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark payment transforms")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", default="stream-csv,stream-parquet,in-memory",
+                        help="Run in-memory last: RUSAGE_CHILDREN reports the max over all children so far")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "raw.csv")
+        write_synthetic(src, args.rows)
+        print(f"{args.rows:,} rows, {os.path.getsize(src) / 2**20:,.0f} MiB raw CSV")
+        for mode in args.modes.split(","):
+            dst = os.path.join(tmpdir, f"out-{mode}")
+            elapsed, peak_mb = run(mode, src, dst, args.chunk_rows)
+            print(f"{mode:<15} {elapsed:7.1f} s  {args.rows / elapsed:12,.0f} rows/s  peak RSS <= {peak_mb:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
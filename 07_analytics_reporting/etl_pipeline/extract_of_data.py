@@ -1,22 +1,162 @@
 # extract_of_data.py
 
-import requests
+import argparse
 import csv
+import json
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 OF_API_URL = 'https://api.onlyfans.com/v2'  # hypothetical endpoint
 API_KEY = '<your_of_api_key>'
+PAYMENTS_PATH = '../data/raw_payments_2025_05.csv'
+FIELDS = ['subscriber_id', 'amount', 'date']
 
 def extract_payments():
     headers = {'Authorization': f'Bearer {API_KEY}'}
     response = requests.get(f'{OF_API_URL}/payments', headers=headers)
     data = response.json()
 
-    with open('../data/raw_payments_2025_05.csv', 'w', newline='') as csvfile:
+    with open(PAYMENTS_PATH, 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(['subscriber_id', 'amount', 'date'])
+        writer.writerow(FIELDS)
         for rec in data['payments']:
             writer.writerow([rec['subscriber_id'], rec['amount'], rec['date']])
     print('Payments data extracted to raw_payments_2025_05.csv')
 
+
+def make_session(retries=5, backoff=0.5):
+    """Pooled session that retries throttled and failed requests with backoff."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']), respect_retry_after_header=True)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Authorization'] = f'Bearer {API_KEY}'
+    return session
+
+
+class RateLimiter:
+    """Allows at most ``rate`` calls per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def _load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def _fetch_pages(session, base_url, cursor, page_size, limiter, pages, stop):
+    """Follow the cursor chain and hand each page to the writer."""
+    try:
+        while not stop.is_set():
+            limiter.wait()
+            params = {'limit': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = session.get(f'{base_url}/payments', params=params, timeout=60)
+            response.raise_for_status()
+            data = response.json()
+            cursor = data.get('next_cursor')
+            pages.put((data.get('payments', []), cursor))
+            if not cursor:
+                break
+        pages.put(None)
+    except Exception as e:
+        pages.put(e)
+
+
+def extract_payments_paginated(out_path=PAYMENTS_PATH, checkpoint_path=None, base_url=OF_API_URL,
+                               page_size=1000, rate_limit=5.0, session=None, prefetch=4):
+    """Stream every /payments page to ``out_path``, resuming after a crash.
+
+    A background thread fetches the next page (at most ``rate_limit``
+    requests per second) while the current one is written, with up to
+    ``prefetch`` pages in flight. Pages are cursor-linked, so they are
+    requested one after another rather than in parallel. After each page
+    the cursor and CSV offset are checkpointed; a rerun truncates any
+    partial page and continues from the saved cursor. The checkpoint is
+    removed once the last page is written.
+    """
+    checkpoint_path = checkpoint_path or out_path + '.checkpoint.json'
+    session = session or make_session()
+    checkpoint = _load_checkpoint(checkpoint_path)
+    if checkpoint and not checkpoint['cursor']:
+        # Crashed after the last page was written but before cleaning up.
+        os.remove(checkpoint_path)
+        return checkpoint['rows']
+    mode = 'r+' if checkpoint else 'w'
+    with open(out_path, mode, newline='') as csvfile:
+        if checkpoint:
+            csvfile.seek(checkpoint['offset'])
+            csvfile.truncate()
+            rows = checkpoint['rows']
+        else:
+            csv.writer(csvfile).writerow(FIELDS)
+            rows = 0
+            checkpoint = {'cursor': None}
+        writer = csv.writer(csvfile)
+
+        pages = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        fetcher = threading.Thread(
+            target=_fetch_pages,
+            args=(session, base_url, checkpoint['cursor'], page_size, RateLimiter(rate_limit), pages, stop),
+            daemon=True,
+        )
+        fetcher.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                records, cursor = item
+                writer.writerows([rec['subscriber_id'], rec['amount'], rec['date']] for rec in records)
+                csvfile.flush()
+                rows += len(records)
+                _save_checkpoint(checkpoint_path, {'cursor': cursor, 'offset': csvfile.tell(), 'rows': rows})
+        finally:
+            stop.set()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f'Payments data extracted to {out_path} ({rows} rows)')
+    return rows
+
+
 if __name__ == '__main__':
-    extract_payments()
+    parser = argparse.ArgumentParser(description='Extract payments from the OnlyFans API')
+    parser.add_argument('--paginate', action='store_true', help='Walk cursor pages with checkpoints')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--rate-limit', type=float, default=5.0, help='Max requests per second')
+    args = parser.parse_args()
+    if args.paginate:
+        extract_payments_paginated(page_size=args.page_size, rate_limit=args.rate_limit)
+    else:
+        extract_payments()
@@ -1,22 +1,179 @@
 # load_to_db.py
 
-import psycopg2
+import argparse
 import csv
+import io
+import os
+import time
+from datetime import datetime
 
-conn = psycopg2.connect(
-    dbname='analytics_db', user='analytics_user', password='analytics_pass', host='localhost'
-)
-cursor = conn.cursor()
-
-with open('../data/payments_transformed_2025_05.csv', 'r') as f:
-    reader = csv.reader(f)
-    next(reader)  # skip header
-    for row in reader:
-        cursor.execute(
-            'INSERT INTO payments(month, subscriber_id, amount) VALUES(%s, %s, %s)',
-            (row[2], row[0], row[1])
-        )
-conn.commit()
-cursor.close()
-conn.close()
-print('Transformed data loaded into analytics_db.payments')
+TRANSFORMED_PATH = '../data/payments_transformed_2025_05.csv'
+QUARANTINE_PATH = '../data/payments_rejected_2025_05.csv'
+BATCH_ROWS = 50_000
+
+# Payments carry no transaction id, and two real payments can share date,
+# subscriber and amount, so a row is identified by where it came from: the
+# export file name and its line number. Reloading the same export therefore
+# never duplicates payments, while identical payments on different lines are
+# all kept. This only holds if an export is never rewritten under the same
+# name: re-extract a month into a new file (or load it with a new --source)
+# rather than overwriting one that has already been loaded, since reordered
+# or inserted lines would be skipped or loaded twice.
+CONFLICT_COLUMNS = ('source', 'source_line')
+COLUMNS = ('month', 'subscriber_id', 'amount') + CONFLICT_COLUMNS
+SOURCE_COLUMNS = (('source', 'TEXT'), ('source_line', 'INTEGER'))
+
+
+class PostgresBackend:
+    """Stages rows with COPY FROM STDIN and merges them with INSERT ... ON CONFLICT."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def prepare(self):
+        self.cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'payments'"
+        )
+        existing = {column for column, in self.cursor.fetchall()}
+        missing = [f'ADD COLUMN {column} {kind}' for column, kind in SOURCE_COLUMNS if column not in existing]
+        if missing:
+            self.cursor.execute(f'ALTER TABLE payments {", ".join(missing)}')
+        # Rows loaded before the source columns existed have NULLs there, which never conflict.
+        self.cursor.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS payments_source_line_idx ON payments({", ".join(CONFLICT_COLUMNS)})'
+        )
+        self.cursor.execute(
+            'CREATE TEMP TABLE payments_staging '
+            '(month DATE, subscriber_id BIGINT, amount NUMERIC, source TEXT, source_line INTEGER) ON COMMIT DROP'
+        )
+
+    def stage(self, rows):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        buf.seek(0)
+        self.cursor.copy_expert(f'COPY payments_staging ({", ".join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)', buf)
+
+    def merge(self):
+        self.cursor.execute(
+            f'INSERT INTO payments ({", ".join(COLUMNS)}) '
+            f'SELECT {", ".join(COLUMNS)} FROM payments_staging '
+            f'ON CONFLICT ({", ".join(CONFLICT_COLUMNS)}) DO NOTHING'
+        )
+        return self.cursor.rowcount
+
+
+class SQLiteBackend:
+    """Same interface on top of sqlite3, for tests and local runs without Postgres."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def prepare(self):
+        self.cursor.execute(
+            'CREATE TABLE IF NOT EXISTS payments '
+            '(month TEXT, subscriber_id INTEGER, amount REAL, source TEXT, source_line INTEGER)'
+        )
+        existing = {column[1] for column in self.cursor.execute('PRAGMA table_info(payments)')}
+        for column, kind in SOURCE_COLUMNS:
+            if column not in existing:
+                self.cursor.execute(f'ALTER TABLE payments ADD COLUMN {column} {kind}')
+        self.cursor.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS payments_source_line_idx ON payments({", ".join(CONFLICT_COLUMNS)})'
+        )
+        self.cursor.execute('DROP TABLE IF EXISTS temp.payments_staging')
+        self.cursor.execute(
+            'CREATE TEMP TABLE payments_staging '
+            '(month TEXT, subscriber_id INTEGER, amount REAL, source TEXT, source_line INTEGER)'
+        )
+
+    def stage(self, rows):
+        self.cursor.executemany('INSERT INTO payments_staging VALUES (?, ?, ?, ?, ?)', rows)
+
+    def merge(self):
+        self.cursor.execute(
+            f'INSERT OR IGNORE INTO payments ({", ".join(COLUMNS)}) '
+            f'SELECT {", ".join(COLUMNS)} FROM payments_staging'
+        )
+        inserted = self.cursor.rowcount
+        self.cursor.execute('DROP TABLE temp.payments_staging')
+        return inserted
+
+
+def parse_row(row):
+    """Turn a transformed CSV row into (payment_date, subscriber_id, amount) or raise ValueError."""
+    subscriber_id = int(row['subscriber_id'])
+    amount = float(row['amount'])
+    payment_date = datetime.strptime(row['date'], '%Y-%m-%d').date().isoformat()
+    return payment_date, subscriber_id, amount
+
+
+def bulk_load(backend, path=TRANSFORMED_PATH, quarantine_path=QUARANTINE_PATH, batch_rows=BATCH_ROWS,
+              source=None):
+    """Load a transformed payments CSV in one transaction and return load stats.
+
+    Rows are validated before staging; rejects go to ``quarantine_path``
+    with the reason instead of aborting the load. Each row is stored with
+    ``source`` (the file name by default) and its line number, which is what
+    makes reloading an unchanged export a no-op.
+    """
+    source = source or os.path.basename(path)
+    start = time.perf_counter()
+    stats = {'read': 0, 'staged': 0, 'rejected': 0, 'inserted': 0}
+    backend.prepare()
+    with open(path, 'r', newline='') as f, open(quarantine_path, 'w', newline='') as q:
+        reader = csv.DictReader(f)
+        rejects = csv.writer(q)
+        rejects.writerow(['line', 'error', 'row'])
+        batch = []
+        for line, row in enumerate(reader, start=2):
+            stats['read'] += 1
+            try:
+                batch.append(parse_row(row) + (source, line))
+            except (KeyError, TypeError, ValueError) as e:
+                stats['rejected'] += 1
+                rejects.writerow([line, str(e), ','.join(str(v) for v in row.values())])
+                continue
+            if len(batch) >= batch_rows:
+                backend.stage(batch)
+                stats['staged'] += len(batch)
+                batch = []
+        if batch:
+            backend.stage(batch)
+            stats['staged'] += len(batch)
+    stats['inserted'] = backend.merge()
+    backend.conn.commit()
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_sec'] = stats['read'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load transformed payments')
+    parser.add_argument('--src', default=TRANSFORMED_PATH)
+    parser.add_argument('--quarantine', default=QUARANTINE_PATH)
+    parser.add_argument('--source', help='Name the rows are recorded under (default: the file name of --src)')
+    parser.add_argument('--sqlite', help='Load into this SQLite file instead of analytics_db')
+    args = parser.parse_args()
+
+    if args.sqlite:
+        import sqlite3
+        conn = sqlite3.connect(args.sqlite)
+        backend = SQLiteBackend(conn)
+    else:
+        import psycopg2
+        conn = psycopg2.connect(
+            dbname='analytics_db', user='analytics_user', password='analytics_pass', host='localhost'
+        )
+        backend = PostgresBackend(conn)
+    try:
+        stats = bulk_load(backend, args.src, args.quarantine, source=args.source)
+    finally:
+        conn.close()
+    print(f"Loaded {stats['inserted']} new rows into payments "
+          f"({stats['read']} read, {stats['rejected']} quarantined, {stats['rows_per_sec']:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
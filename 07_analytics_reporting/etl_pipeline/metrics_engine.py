@@ -0,0 +1,137 @@
+# metrics_engine.py
+
+import calendar
+
+import numpy as np
+import pandas as pd
+
+ALL_CREATORS = 'all'
+
+
+class MetricsEngine:
+    """Subscriber KPIs per (month, creator), maintained from payment batches.
+
+    ``ingest`` folds a payments frame (subscriber_id, amount, date and
+    optionally creator_id and type) into per-partition aggregates in one
+    grouped pass; raw rows are not kept. KPIs are computed from those
+    aggregates on first query and cached. A partition is recomputed only
+    after new payments land in it or in the month before it (churn compares
+    consecutive months). Cohort retention is cached per creator the same way.
+    """
+
+    def __init__(self):
+        self._active = {}  # (creator, month) -> sorted unique subscriber ids
+        self._revenue = {}  # (creator, month) -> total amount
+        self._tips = {}  # (creator, month) -> number of tips
+        self._first_month = {}  # creator -> Series of first paying month by subscriber
+        self._cache = {}
+        self._cohort_cache = {}
+
+    @staticmethod
+    def _prepare(df):
+        out = pd.DataFrame({
+            'subscriber_id': df['subscriber_id'].to_numpy(),
+            'amount': df['amount'].to_numpy(dtype=float),
+            'month': pd.to_datetime(df['date'], format='%Y-%m-%d').dt.strftime('%Y-%m').to_numpy(),
+            'creator': df['creator_id'].astype(str).to_numpy() if 'creator_id' in df else ALL_CREATORS,
+        })
+        # Without a payment type every payment counts towards tip velocity.
+        out['tip'] = (df['type'] == 'tip').to_numpy() if 'type' in df else True
+        return out
+
+    def ingest(self, df):
+        """Add a batch of payments; returns the (month, creator) partitions it touched."""
+        df = self._prepare(df)
+        if df['creator'].ne(ALL_CREATORS).any():
+            # Every payment also counts towards the all-creators rollup.
+            df = pd.concat([df, df.assign(creator=ALL_CREATORS)], ignore_index=True)
+
+        grouped = df.groupby(['creator', 'month'], sort=False)
+        sums = grouped.agg(revenue=('amount', 'sum'), tips=('tip', 'sum'))
+        touched = set()
+        for (creator, month), subs in grouped['subscriber_id'].unique().items():
+            key = (creator, month)
+            old = self._active.get(key)
+            self._active[key] = np.union1d(old, subs) if old is not None else np.unique(subs)
+            self._revenue[key] = self._revenue.get(key, 0.0) + sums.at[key, 'revenue']
+            self._tips[key] = self._tips.get(key, 0) + int(sums.at[key, 'tips'])
+            touched.add(key)
+
+        firsts = df.groupby(['creator', 'subscriber_id'])['month'].min()
+        for creator, first in firsts.groupby(level=0):
+            first = first.droplevel(0)
+            known = self._first_month.get(creator)
+            self._first_month[creator] = first if known is None else pd.concat([known, first]).groupby(level=0).min()
+            self._cohort_cache.pop(creator, None)
+
+        for creator, month in touched:
+            self._cache.pop((creator, month), None)
+            self._cache.pop((creator, _next_month(month)), None)
+        return {(month, creator) for creator, month in touched}
+
+    def metrics(self, month, creator=ALL_CREATORS):
+        """KPIs for one partition: active subscribers, churn_rate, arpu, ltv, tip_velocity."""
+        key = (creator, month)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._cache[key] = self._compute(creator, month)
+        return dict(cached)
+
+    def months(self, creator=ALL_CREATORS):
+        return sorted(month for c, month in self._active if c == creator)
+
+    def _compute(self, creator, month):
+        active = self._active.get((creator, month), np.empty(0))
+        previous = self._active.get((creator, _prev_month(month)))
+        revenue = self._revenue.get((creator, month), 0.0)
+        churn_rate = None
+        if previous is not None and len(previous):
+            churned = np.setdiff1d(previous, active, assume_unique=True)
+            churn_rate = len(churned) / len(previous)
+        arpu = revenue / len(active) if len(active) else 0.0
+        year, mon = map(int, month.split('-'))
+        days = calendar.monthrange(year, mon)[1]
+        return {
+            'month': month,
+            'creator': creator,
+            'active_subscribers': int(len(active)),
+            'revenue': float(revenue),
+            'churn_rate': churn_rate,
+            'arpu': float(arpu),
+            # Expected lifetime revenue: ARPU over the monthly churn probability.
+            'ltv': float(arpu / churn_rate) if churn_rate else None,
+            'tip_velocity': self._tips.get((creator, month), 0) / days,
+        }
+
+    def cohort_retention(self, creator=ALL_CREATORS):
+        """Share of each first-payment cohort still paying N months later, as a DataFrame."""
+        cached = self._cohort_cache.get(creator)
+        if cached is not None:
+            return cached
+        first = self._first_month.get(creator)
+        if first is None:
+            return pd.DataFrame()
+        last = self.months(creator)[-1]
+        rows = {}
+        for cohort, members in first.groupby(first).groups.items():
+            members = np.unique(np.asarray(members))
+            retention, month = [], cohort
+            while month <= last:
+                active = self._active.get((creator, month), np.empty(0))
+                retention.append(len(np.intersect1d(members, active, assume_unique=True)) / len(members))
+                month = _next_month(month)
+            rows[cohort] = retention
+        table = pd.DataFrame.from_dict(rows, orient='index').sort_index()
+        table.index.name = 'cohort'
+        self._cohort_cache[creator] = table
+        return table
+
+
+def _prev_month(month):
+    year, mon = map(int, month.split('-'))
+    return f'{year - 1}-12' if mon == 1 else f'{year}-{mon - 1:02d}'
+
+
+def _next_month(month):
+    year, mon = map(int, month.split('-'))
+    return f'{year + 1}-01' if mon == 12 else f'{year}-{mon + 1:02d}'
@@ -1,13 +1,72 @@
 # transform_data.py
 
+import argparse
+import os
+
 import pandas as pd
 
-def transform_payments():
-    df = pd.read_csv('../data/raw_payments_2025_05.csv')
+RAW_PATH = '../data/raw_payments_2025_05.csv'
+TRANSFORMED_PATH = '../data/payments_transformed_2025_05.csv'
+
+RAW_DTYPES = {'subscriber_id': 'int64', 'amount': 'float64', 'date': 'string'}
+DATE_FORMAT = '%Y-%m-%d'
+CHUNK_ROWS = 1_000_000
+
+def transform_payments(src=RAW_PATH, dst=TRANSFORMED_PATH):
+    df = pd.read_csv(src)
     df['amount'] = df['amount'].astype(float)
     df['month'] = pd.to_datetime(df['date']).dt.month
-    df.to_csv('../data/payments_transformed_2025_05.csv', index=False)
+    df.to_csv(dst, index=False)
     print('Payments data transformed and saved')
 
+def transform_chunk(chunk):
+    # Dates are plain YYYY-MM-DD, so an explicit format skips per-row inference.
+    chunk['month'] = pd.to_datetime(chunk['date'], format=DATE_FORMAT).dt.month.astype('int8')
+    return chunk
+
+def transform_payments_streaming(src=RAW_PATH, dst=TRANSFORMED_PATH, chunk_rows=CHUNK_ROWS, fmt='csv'):
+    """Transform the raw payments export in fixed-size chunks.
+
+    Only one chunk is in memory at a time, so peak memory depends on
+    ``chunk_rows`` rather than on the size of the export. ``fmt`` is 'csv'
+    (appended chunk by chunk, same layout as transform_payments) or
+    'parquet' (one row group per chunk, needs pyarrow).
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    reader = pd.read_csv(src, dtype=RAW_DTYPES, usecols=list(RAW_DTYPES), chunksize=chunk_rows)
+    writer = None
+    rows = 0
+    try:
+        for chunk in reader:
+            chunk = transform_chunk(chunk)
+            if fmt == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(dst, table.schema)
+                writer.write_table(table)
+            elif fmt == 'csv':
+                chunk.to_csv(dst, mode='a', header=rows == 0, index=False)
+            else:
+                raise ValueError(f'Unknown output format: {fmt}')
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f'Payments data transformed and saved ({rows} rows)')
+    return rows
+
 if __name__ == '__main__':
-    transform_payments()
+    parser = argparse.ArgumentParser(description='Transform raw payments export')
+    parser.add_argument('--stream', action='store_true', help='Process the export in bounded-memory chunks')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--src', default=RAW_PATH)
+    parser.add_argument('--dst', default=TRANSFORMED_PATH)
+    args = parser.parse_args()
+    if args.stream:
+        transform_payments_streaming(args.src, args.dst, args.chunk_rows, args.format)
+    else:
+        transform_payments(args.src, args.dst)
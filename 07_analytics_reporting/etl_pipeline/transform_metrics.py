@@ -1,3 +1,15 @@
 # Transform data for metrics dashboard
-def transform(data):
-    return { 'churn_rate': 0.12, 'arpu': 23.5 }
+from metrics_engine import ALL_CREATORS, MetricsEngine
+
+def transform(data, month=None, creator=ALL_CREATORS, engine=None):
+    # data: payments (subscriber_id, amount, date[, creator_id, type]). Each call
+    # computes metrics from its own data; to feed batches of new payments
+    # incrementally, keep a MetricsEngine and pass it as ``engine``.
+    engine = engine if engine is not None else MetricsEngine()
+    engine.ingest(data)
+    if month is None:
+        months = engine.months(creator)
+        if not months:
+            return {}  # nothing ingested for this creator yet
+        month = months[-1]
+    return engine.metrics(month, creator)
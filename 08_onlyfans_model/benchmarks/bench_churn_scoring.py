@@ -0,0 +1,84 @@
+"""Subscribers scored per second by ChurnScorer.
+
+Compares per-subscriber predict_proba calls with chunked scoring of a
+synthetic subscriber table, on a cold cache, a warm cache and after 5% of
+subscribers changed.
+
+    python 08_onlyfans_model/benchmarks/bench_churn_scoring.py --subscribers 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from churn_scoring import FEATURES, ChurnScorer  # noqa: E402
+from train_model import train_model  # noqa: E402
+
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'subscriber_id': np.arange(n),
+        'messages_sent': rng.integers(1, 50, n),
+        'tips_received': rng.integers(0, 20, n),
+        'days_inactive': rng.integers(0, 30, n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=1_000_000)
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        train = synthetic(10_000, seed=1).drop(columns='subscriber_id')
+        train['churned'] = (train['days_inactive'] > 15).astype(int)
+        train.to_csv(os.path.join(tmp, 'train.csv'), index=False)
+        model_path = os.path.join(tmp, 'model.pkl')
+        joblib.dump(train_model(os.path.join(tmp, 'train.csv')), model_path)
+
+        table = synthetic(args.subscribers)
+        table_path = os.path.join(tmp, 'subscribers.csv')
+        table.to_csv(table_path, index=False)
+        scorer = ChurnScorer(model_path, os.path.join(tmp, 'scores.joblib'))
+
+        sample = table.head(2000)
+        start = time.perf_counter()
+        for row in sample[FEATURES].itertuples(index=False):
+            scorer.model.predict_proba(pd.DataFrame([row], columns=FEATURES))
+        per_row = len(sample) / (time.perf_counter() - start)
+        print(f"{args.subscribers:,} subscribers")
+        print(f"predict_proba per subscriber        {per_row:12,.0f} subscribers/s")
+
+        def run(label):
+            start = time.perf_counter()
+            for _ in scorer.score_table(table_path, args.chunk_rows):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"{label:<36}{args.subscribers / elapsed:12,.0f} subscribers/s")
+
+        run('chunked, cold cache')
+        run('chunked, warm cache')
+        changed = table.sample(frac=0.05, random_state=0).index
+        table.loc[changed, 'days_inactive'] += 1
+        table.to_csv(table_path, index=False)
+        run('chunked, 5% of features changed')
+
+        start = time.perf_counter()
+        for sid in range(0, args.subscribers, max(1, args.subscribers // 100_000)):
+            scorer.lookup(sid)
+        lookups = min(args.subscribers, 100_000) / (time.perf_counter() - start)
+        print(f"{'lookup':<36}{lookups:12,.0f} lookups/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'churn_model.pkl')
+SCORES_PATH = os.path.join(SCRIPT_DIR, 'churn_scores.joblib')
+FEATURES = ['messages_sent', 'tips_received', 'days_inactive']
+ID_COLUMN = 'subscriber_id'
+
+
+class ChurnScorer:
+    """Scores subscribers with the trained churn model, caching each score until the features change.
+
+    The model is loaded once. Linear models (LogisticRegression, or the
+    SGDClassifier from ``train_model_chunked``) are scored directly as
+    ``sigmoid(X @ coef + intercept)`` on whole chunks; anything else goes
+    through ``predict_proba``. The cache maps subscriber id to a hash of
+    the feature row and its score, so rescoring a table only touches rows
+    that are new or changed. It is dropped when the model file changes.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, scores_path=SCORES_PATH, features=None):
+        self.model_path = model_path
+        self.scores_path = scores_path
+        self.model = joblib.load(model_path)
+        # Models fitted on a DataFrame know their column order; use it so coef_ lines up.
+        self.features = list(features or getattr(self.model, 'feature_names_in_', FEATURES))
+        self.model_version = os.stat(model_path).st_mtime_ns
+        coef = getattr(self.model, 'coef_', None)
+        self._weights = None if coef is None else (np.asarray(coef, dtype=float).ravel(), float(np.ravel(self.model.intercept_)[0]))
+        self._scores = {}  # subscriber id -> (feature hash, score)
+        self._scores_mtime = None
+        self.scored = 0
+        self.cached = 0
+        self.load_scores()
+
+    def load_scores(self):
+        """(Re)load saved scores if the file changed since the last load; cheap to call often."""
+        if not self.scores_path or not os.path.exists(self.scores_path):
+            return
+        mtime = os.stat(self.scores_path).st_mtime_ns
+        if mtime == self._scores_mtime:
+            return
+        saved = joblib.load(self.scores_path)
+        self._scores_mtime = mtime
+        if saved.get('model_version') == self.model_version and saved.get('features') == self.features:
+            self._scores = saved['scores']
+
+    def save_scores(self):
+        tmp = self.scores_path + '.tmp'
+        joblib.dump({'model_version': self.model_version, 'features': self.features, 'scores': self._scores}, tmp)
+        os.replace(tmp, self.scores_path)
+        self._scores_mtime = os.stat(self.scores_path).st_mtime_ns
+
+    def predict(self, X):
+        """Churn probability for each row of a feature matrix."""
+        X = np.asarray(X, dtype=float)
+        if self._weights is None:
+            return self.model.predict_proba(pd.DataFrame(X, columns=self.features))[:, 1]
+        coef, intercept = self._weights
+        return 1.0 / (1.0 + np.exp(-(X @ coef + intercept)))
+
+    def score_frame(self, df, id_column=ID_COLUMN):
+        """Scores for one chunk of the subscriber table, indexed by subscriber id."""
+        ids = df[id_column].tolist()
+        hashes = pd.util.hash_pandas_object(df[self.features], index=False).tolist()
+        scores = np.empty(len(ids))
+        stale = []
+        for i, (sid, h) in enumerate(zip(ids, hashes)):
+            entry = self._scores.get(sid)
+            if entry is not None and entry[0] == h:
+                scores[i] = entry[1]
+            else:
+                stale.append(i)
+        if stale:
+            stale = np.asarray(stale)
+            fresh = self.predict(df[self.features].to_numpy()[stale])
+            scores[stale] = fresh
+            for i, score in zip(stale.tolist(), fresh.tolist()):
+                self._scores[ids[i]] = (hashes[i], score)
+        self.scored += len(stale)
+        self.cached += len(ids) - len(stale)
+        return pd.Series(scores, index=pd.Index(ids, name=id_column), name='churn_score')
+
+    def score_table(self, path, chunk_rows=100_000, id_column=ID_COLUMN):
+        """Score a subscriber CSV chunk by chunk, yielding one Series of scores per chunk."""
+        for chunk in pd.read_csv(path, usecols=[id_column, *self.features], chunksize=chunk_rows):
+            yield self.score_frame(chunk, id_column)
+
+    def lookup(self, subscriber_id):
+        """Last computed score for a subscriber, or None if they have never been scored."""
+        entry = self._scores.get(subscriber_id)
+        return None if entry is None else entry[1]
+
+    def score_one(self, subscriber_id, features):
+        """Score from the cache, or from ``features`` (a mapping) if they changed or were never scored."""
+        row = pd.DataFrame([{ID_COLUMN: subscriber_id, **{f: features[f] for f in self.features}}])
+        return float(self.score_frame(row).iloc[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score the subscriber table for churn risk')
+    parser.add_argument('subscribers', help='CSV with subscriber_id and the model features')
+    parser.add_argument('--out', default=os.path.join(SCRIPT_DIR, 'churn_scores.csv'))
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    scorer = ChurnScorer()
+    with open(args.out, 'w', newline='') as f:
+        header = True
+        for scores in scorer.score_table(args.subscribers, args.chunk_rows):
+            scores.to_csv(f, header=header)
+            header = False
+    scorer.save_scores()
+    print(f"Scored {scorer.scored} subscribers ({scorer.cached} unchanged, from cache) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
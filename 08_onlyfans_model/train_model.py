@@ -1,6 +1,7 @@
+import argparse
 import os
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import numpy as np
@@ -22,7 +23,55 @@ def train_model(data_path: str) -> LogisticRegression:
     print(f"Model Accuracy: {accuracy_score(y_test, preds):.4f}")
     return model
 
+def _feature_stats(data_path: str, chunk_rows: int):
+    """Streaming mean and standard deviation of every feature column."""
+    n, total, total_sq = 0, 0.0, 0.0
+    for chunk in pd.read_csv(data_path, chunksize=chunk_rows):
+        X = chunk.drop('churned', axis=1).to_numpy(dtype=float)
+        n += len(X)
+        total = total + X.sum(axis=0)
+        total_sq = total_sq + (X ** 2).sum(axis=0)
+    mean = total / n
+    std = np.sqrt(np.maximum(total_sq / n - mean ** 2, 0.0))
+    return mean, np.where(std > 0, std, 1.0)
+
+
+def train_model_chunked(data_path: str, chunk_rows: int = 100_000, epochs: int = 5) -> SGDClassifier:
+    """Train the churn model on a CSV too large for memory, one chunk at a time.
+
+    Fits a logistic-loss SGDClassifier with ``partial_fit`` on standardized
+    chunks, holding out every fifth row for the accuracy check. The scaling
+    is folded back into ``coef_``/``intercept_`` afterwards, so the model
+    takes raw features just like the in-memory one.
+    """
+    print(f"Reading data in chunks of {chunk_rows} rows from: {data_path}")
+    mean, std = _feature_stats(data_path, chunk_rows)
+    model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+    for epoch in range(epochs):
+        start = 0
+        for chunk in pd.read_csv(data_path, chunksize=chunk_rows):
+            train = (np.arange(start, start + len(chunk)) % 5) != 0
+            start += len(chunk)
+            X = (chunk.drop('churned', axis=1).to_numpy(dtype=float)[train] - mean) / std
+            model.partial_fit(X, chunk['churned'].to_numpy()[train], classes=np.array([0, 1]))
+
+    model.coef_ = model.coef_ / std
+    model.intercept_ = model.intercept_ - model.coef_ @ mean
+    correct, total, start = 0, 0, 0
+    for chunk in pd.read_csv(data_path, chunksize=chunk_rows):
+        test = (np.arange(start, start + len(chunk)) % 5) == 0
+        start += len(chunk)
+        X = chunk.drop('churned', axis=1)[test]
+        correct += int((model.predict(X.to_numpy(dtype=float)) == chunk['churned'].to_numpy()[test]).sum())
+        total += int(test.sum())
+    print(f"Model Accuracy: {correct / total if total else 0.0:.4f}")
+    return model
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the churn prediction model')
+    parser.add_argument('--chunk-rows', type=int, help='Train out of core, reading this many rows at a time')
+    args = parser.parse_args()
+
     data_file_name = 'sample_churn_data.csv'
     model_file_name = 'churn_model.pkl'
 
@@ -45,7 +94,10 @@ if __name__ == "__main__":
         print(f"Using existing data file: '{data_file_path}'")
 
     print("Training churn prediction model...")
-    trained_model = train_model(data_file_path)
+    if args.chunk_rows:
+        trained_model = train_model_chunked(data_file_path, args.chunk_rows)
+    else:
+        trained_model = train_model(data_file_path)
 
     print(f"Saving trained model to '{model_file_path}'...")
     joblib.dump(trained_model, model_file_path)
@@ -0,0 +1,91 @@
+"""A/B evaluation on million-row synthetic result sets.
+
+Checks evaluate_pairwise against the original implementation (it should
+be no slower on lists of dicts), then times streaming a JSONL file into a
+matrix and the seeded bootstrap for several variants.
+
+    python common/benchmarks/bench_evaluation.py --rows 1000000 --variants 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common.utils.evaluation import (  # noqa: E402
+    METRICS, bootstrap_means, evaluate_pairwise, evaluate_variants, load_jsonl_matrix,
+)
+
+
+def legacy_evaluate_pairwise(control, variant):
+    def avg(values):
+        return sum(values) / len(values) if values else 0.0
+
+    metrics = {}
+    for name in METRICS:
+        metrics[f"{name}_control"] = avg([r.get(name, 0) for r in control])
+        metrics[f"{name}_variant"] = avg([r.get(name, 0) for r in variant])
+    metrics["engagement_lift_clicks"] = metrics["clicks_variant"] - metrics["clicks_control"]
+    metrics["engagement_lift_replies"] = metrics["replies_variant"] - metrics["replies_control"]
+    return metrics
+
+
+def synthetic(rng, rows, shift=0.0):
+    return np.column_stack([
+        rng.integers(1, 6, rows), rng.integers(1, 6, rows),
+        rng.poisson(1.0 + shift, rows), rng.poisson(0.5 + shift, rows),
+    ]).astype(np.float64)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--variants", type=int, default=4)
+    parser.add_argument("--resamples", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    control, variant = synthetic(rng, args.rows), synthetic(rng, args.rows, 0.05)
+    control_records = [dict(zip(METRICS, row)) for row in control.tolist()]
+    variant_records = [dict(zip(METRICS, row)) for row in variant.tolist()]
+
+    expected, legacy = timed(legacy_evaluate_pairwise, control_records, variant_records)
+    got, new = timed(evaluate_pairwise, control_records, variant_records)
+    assert all(abs(expected[k] - got[k]) < 1e-9 for k in expected)
+    print(f"{args.rows:,} rows per arm")
+    print(f"evaluate_pairwise on dicts   legacy {legacy:6.2f} s   current {new:6.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "control.jsonl")
+        with open(path, "w") as f:
+            f.writelines(json.dumps(r) + "\n" for r in control_records)
+        _, stream = timed(load_jsonl_matrix, path)
+    print(f"stream JSONL -> matrix        {stream:6.2f} s   ({args.rows / stream:,.0f} rows/s)")
+
+    _, boot = timed(bootstrap_means, control, args.resamples, 0, args.workers)
+    print(f"bootstrap {args.resamples} resamples     {boot:6.2f} s   ({args.workers} worker threads)")
+
+    variants = {"control": control, **{f"v{i}": synthetic(rng, args.rows, 0.02 * i) for i in range(1, args.variants)}}
+    stats, total = timed(evaluate_variants, variants, n_resamples=args.resamples, workers=args.workers)
+    print(f"{len(variants)} variants with CIs      {total:6.2f} s")
+    for name, s in stats.items():
+        if name != "control":
+            lo, hi = s["clicks"]["lift_ci"]
+            print(f"  {name}: clicks lift {s['clicks']['lift']:+.4f}  95% CI [{lo:+.4f}, {hi:+.4f}]")
+
+
+if __name__ == "__main__":
+    main()
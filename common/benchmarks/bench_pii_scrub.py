@@ -0,0 +1,93 @@
+"""MB/s of the legacy multi-pass PII scrubbers vs the single-pass Scrubber.
+
+    python common/benchmarks/bench_pii_scrub.py --mb 50
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from common.utils.pii_scrub import (  # noqa: E402
+    HANDLE_PATTERN, NAME_PATTERN, PHONE_PATTERN, Scrubber, scrub_jsonl, scrub_text,
+)
+
+WORDS = ("hey babe just dropped a new set for you tonight want to see it call me maybe "
+         "love your vibe so much see you soon").split()
+PII = ["@alice", "@bob_99", "555-123-4567", "555.987.6543", "Alice Smith", "Bob", "Jessica"]
+
+LEGACY_ANON_PATTERNS = [r"@\w+", r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b"]
+
+
+def legacy_scrub_text(text):
+    text = PHONE_PATTERN.sub("[PHONE]", text)
+    text = HANDLE_PATTERN.sub("[HANDLE]", text)
+    text = NAME_PATTERN.sub("[NAME]", text)
+    return text
+
+
+def legacy_anonymize(text):
+    for pat in LEGACY_ANON_PATTERNS:
+        text = re.sub(pat, "[REDACTED]", text)
+    return text
+
+
+def synthetic_messages(total_bytes, seed=0):
+    rng = random.Random(seed)
+    messages, size = [], 0
+    while size < total_bytes:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 25))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(PII))
+        msg = " ".join(words)
+        messages.append(msg)
+        size += len(msg.encode("utf-8"))
+    return messages, size
+
+
+def throughput(fn, messages, size):
+    start = time.perf_counter()
+    for msg in messages:
+        fn(msg)
+    return size / 2**20 / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PII scrubbing")
+    parser.add_argument("--mb", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    messages, size = synthetic_messages(int(args.mb * 2**20))
+    anonymizer = Scrubber([("HANDLE", LEGACY_ANON_PATTERNS[0], "[REDACTED]"),
+                           ("PHONE", LEGACY_ANON_PATTERNS[1], "[REDACTED]")], guard=r"[\d@]")
+    assert all(legacy_scrub_text(m) == scrub_text(m) for m in messages[:10_000])
+    assert all(legacy_anonymize(m) == anonymizer.scrub(m) for m in messages[:10_000])
+
+    print(f"{size / 2**20:.0f} MiB of synthetic DMs")
+    print(f"pii_scrub.scrub_text      legacy {throughput(legacy_scrub_text, messages, size):7.1f} MB/s"
+          f"   single-pass {throughput(scrub_text, messages, size):7.1f} MB/s")
+    print(f"anonymize_archive.scrub   legacy {throughput(legacy_anonymize, messages, size):7.1f} MB/s"
+          f"   single-pass {throughput(anonymizer.scrub, messages, size):7.1f} MB/s")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "dms.jsonl")
+        with open(src, "w", encoding="utf-8") as f:
+            for msg in messages:
+                f.write(json.dumps({"sender": "fan", "message": msg}) + "\n")
+        file_mb = os.path.getsize(src) / 2**20
+        for workers in (0, args.workers):
+            start = time.perf_counter()
+            scrub_jsonl(src, os.path.join(tmpdir, "out.jsonl"), workers=workers)
+            label = "in-process" if workers == 0 else f"{workers} processes"
+            print(f"scrub_jsonl {label:<14}          {file_mb / (time.perf_counter() - start):7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,30 +5,155 @@ Metrics:
 - **Engagement Lift**: difference in click-throughs and reply counts vs. control.
 """
 
-from typing import List, Dict
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
+import numpy as np
 
-def _avg(values: List[float]) -> float:
-    return sum(values) / len(values) if values else 0.0
+METRICS = ("fluency", "brand_fit", "clicks", "replies")
+LIFT_METRICS = ("clicks", "replies")
 
+# Resamples per bootstrap task and rows per weight block; fixed so results do
+# not depend on how tasks are scheduled.
+_RESAMPLES_PER_TASK = 64
+_BLOCK_ROWS = 16_384
+# Columns with at most this many distinct values use the multinomial path.
+_MAX_LEVELS = 4096
+
+
+def to_matrix(records: Iterable[Mapping[str, float]], metrics: Sequence[str] = METRICS) -> np.ndarray:
+    """Stack the given metrics of ``records`` into a float matrix; missing values count as 0."""
+    flat = np.fromiter((r.get(m, 0) or 0 for r in records for m in metrics), dtype=np.float64)
+    return flat.reshape(-1, len(metrics))
+
+
+def load_jsonl_matrix(path: str, metrics: Sequence[str] = METRICS) -> np.ndarray:
+    """Stream a JSONL results file into a metrics matrix without keeping the parsed records."""
+    with open(path) as f:
+        return to_matrix((json.loads(line) for line in f if line.strip()), metrics)
+
+
+def _column_levels(x: np.ndarray):
+    """Per column: (values, probabilities) when it has few distinct values, else None."""
+    levels = []
+    for col in x.T:
+        values, counts = np.unique(col, return_counts=True)
+        levels.append((values, counts / len(col)) if len(values) <= _MAX_LEVELS else None)
+    return levels
+
+
+def _bootstrap_task(x: np.ndarray, levels, seed: np.random.SeedSequence, resamples: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    out = np.empty((resamples, x.shape[1]))
+    for j, level in enumerate(levels):
+        if level is not None:
+            values, probs = level
+            out[:, j] = rng.multinomial(n, probs, size=resamples) @ values / n
+    dense = [j for j, level in enumerate(levels) if level is None]
+    if dense:
+        sums = np.zeros((resamples, len(dense)))
+        counts = np.zeros(resamples)
+        for start in range(0, n, _BLOCK_ROWS):
+            block = x[start:start + _BLOCK_ROWS, dense]
+            weights = rng.poisson(1.0, size=(resamples, len(block))).astype(np.float64)
+            sums += weights @ block
+            counts += weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, dense] = sums / counts[:, None]
+    return out
 
-def evaluate_pairwise(control: List[Dict[str, float]], variant: List[Dict[str, float]]) -> Dict[str, float]:
-    """Compute averages and engagement lift for two sets of DM responses."""
-    metrics = {}
 
-    metrics["fluency_control"] = _avg([r.get("fluency", 0) for r in control])
-    metrics["fluency_variant"] = _avg([r.get("fluency", 0) for r in variant])
+def bootstrap_means(x: np.ndarray, n_resamples: int = 1000, seed: Union[int, np.random.SeedSequence] = 0,
+                    workers: Optional[int] = None) -> np.ndarray:
+    """``(n_resamples, metrics)`` bootstrap distribution of the column means of ``x``.
 
-    metrics["brand_fit_control"] = _avg([r.get("brand_fit", 0) for r in control])
-    metrics["brand_fit_variant"] = _avg([r.get("brand_fit", 0) for r in variant])
+    Ratings and counts take only a few distinct values, so a resample of
+    such a column is drawn exactly as a multinomial over its value counts,
+    costing O(levels) rather than O(rows). Columns with many distinct values
+    use a Poisson bootstrap instead: every row gets an independent Poisson(1)
+    weight per resample, accumulated block by block with a matrix product.
+    Resamples are split into fixed, independently seeded tasks run on a
+    thread pool, so results depend only on ``seed``, not on ``workers``.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    if not len(x):
+        return np.full((n_resamples, x.shape[1]), np.nan)
+    levels = _column_levels(x)
+    sizes = [_RESAMPLES_PER_TASK] * (n_resamples // _RESAMPLES_PER_TASK)
+    if n_resamples % _RESAMPLES_PER_TASK:
+        sizes.append(n_resamples % _RESAMPLES_PER_TASK)
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = root.spawn(len(sizes))
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        parts = list(pool.map(_bootstrap_task, [x] * len(sizes), [levels] * len(sizes), seeds, sizes))
+    return np.concatenate(parts) if parts else np.empty((0, x.shape[1]))
 
-    metrics["clicks_control"] = _avg([r.get("clicks", 0) for r in control])
-    metrics["clicks_variant"] = _avg([r.get("clicks", 0) for r in variant])
 
-    metrics["replies_control"] = _avg([r.get("replies", 0) for r in control])
-    metrics["replies_variant"] = _avg([r.get("replies", 0) for r in variant])
+def _interval(samples: np.ndarray, alpha: float) -> List[List[float]]:
+    lo, hi = np.percentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+    return [[float(a), float(b)] for a, b in zip(lo, hi)]
 
-    metrics["engagement_lift_clicks"] = metrics["clicks_variant"] - metrics["clicks_control"]
-    metrics["engagement_lift_replies"] = metrics["replies_variant"] - metrics["replies_control"]
 
+def evaluate_variants(variants: Mapping[str, np.ndarray], control: str = "control",
+                      metrics: Sequence[str] = METRICS, n_resamples: int = 1000, alpha: float = 0.05,
+                      seed: int = 0, workers: Optional[int] = None) -> Dict[str, Dict[str, Dict[str, object]]]:
+    """Means, bootstrap CIs and lift vs ``control`` for any number of variants.
+
+    ``variants`` maps a name to a metrics matrix (see ``to_matrix``) with
+    columns in ``metrics`` order, so every metric is averaged in one NumPy
+    pass. Returns ``{variant: {metric: stats}}`` where stats has ``mean``
+    and ``ci``, and for non-control variants also ``lift`` and ``lift_ci``.
+    CIs are per-metric (marginal) percentile intervals of
+    ``bootstrap_means``; ``n_resamples=0`` skips the bootstrap.
+    """
+    names = list(variants)
+    if control not in variants:
+        raise KeyError(f"control variant {control!r} not in {names}")
+    seeds = np.random.SeedSequence(seed).spawn(len(names))
+    means, boots = {}, {}
+    for name, child in zip(names, seeds):
+        x = np.asarray(variants[name], dtype=np.float64).reshape(-1, len(metrics))
+        means[name] = x.mean(axis=0) if len(x) else np.zeros(len(metrics))
+        if n_resamples:
+            boots[name] = bootstrap_means(x, n_resamples, child, workers)
+
+    results = {}
+    for name in names:
+        stats = {m: {"mean": float(means[name][i])} for i, m in enumerate(metrics)}
+        if n_resamples:
+            for m, ci in zip(metrics, _interval(boots[name], alpha)):
+                stats[m]["ci"] = ci
+        if name != control:
+            lift = means[name] - means[control]
+            for i, m in enumerate(metrics):
+                stats[m]["lift"] = float(lift[i])
+            if n_resamples:
+                for m, ci in zip(metrics, _interval(boots[name] - boots[control], alpha)):
+                    stats[m]["lift_ci"] = ci
+        results[name] = stats
+    return results
+
+
+def _avg(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def evaluate_pairwise(control: List[Dict[str, float]], variant: List[Dict[str, float]]) -> Dict[str, float]:
+    """Compute averages and engagement lift for two sets of DM responses.
+
+    With lists of dicts, reading the values out of the dicts is most of the
+    work, and summing one plain list per metric is cheaper than building a
+    float matrix first, so this stays in pure Python.
+    """
+    metrics = {}
+    for name in METRICS:
+        metrics[f"{name}_control"] = _avg([r.get(name, 0) for r in control])
+        metrics[f"{name}_variant"] = _avg([r.get(name, 0) for r in variant])
+    for name in LIFT_METRICS:
+        metrics[f"engagement_lift_{name}"] = metrics[f"{name}_variant"] - metrics[f"{name}_control"]
     return metrics
@@ -0,0 +1,244 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _iter_json_array(f, key: Optional[str] = None, block_size: int = 1 << 16) -> Iterator[dict]:
+    """Yield the items of a top-level JSON array (or ``{key: [...]}``) one at a time."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        block = f.read(block_size)
+        eof = not block
+        buf = buf[pos:] + block
+        pos = 0
+
+    def skip(chars: str):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def expect(char: str):
+        nonlocal pos
+        skip(" \t\r\n")
+        if buf[pos:pos + 1] != char:
+            raise ValueError(f"expected {char!r} at offset {pos} of buffered JSON")
+        pos += 1
+
+    fill()
+    skip(" \t\r\n")
+    if key is not None and buf[pos:pos + 1] != "[":
+        # Only the simple {"key": [...]} layout written by our own scripts is supported.
+        expect("{")
+        skip(" \t\r\n")
+        while True:
+            try:
+                name, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+        if name != key:
+            raise ValueError(f"expected key {key!r}, found {name!r}")
+        pos = end
+        expect(":")
+    expect("[")
+    while True:
+        skip(" \t\r\n,")
+        if buf[pos:pos + 1] == "]":
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A bare number cut off at the end of the buffer still decodes.
+                if end < len(buf) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        pos = end
+        yield item
+
+
+def iter_records(path: str, json_key: Optional[str] = None) -> Iterator[dict]:
+    """Stream records from a CSV, JSONL or JSON array file without loading it.
+
+    ``.json`` files hold either a top-level array or, with ``json_key``, an
+    object whose only key holds the array (e.g. ``{"messages": [...]}``).
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from _iter_json_array(f, json_key)
+
+
+def iter_shards(out_dir: str) -> Iterator[dict]:
+    """Stream the records of every shard listed in ``out_dir``'s manifest, in order."""
+    with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for shard in manifest["shards"]:
+        yield from iter_records(os.path.join(out_dir, shard["file"]))
+
+
+class ShardWriter:
+    """Writes JSON lines into ``<prefix>-00000.jsonl``, ``<prefix>-00001.jsonl``, ...
+
+    A new shard is started whenever the next line would push the current one
+    past ``max_bytes``. Closing the writer records every shard with its
+    record and byte counts in ``manifest.json``, so readers can pick shards
+    up independently.
+
+    ``out_dir`` is created if needed. Shards are written to a temporary
+    directory inside it and only moved into place once the writer closes
+    successfully; the new manifest then replaces the old one and shards the
+    old manifest listed but the new one doesn't are deleted. A run that fails
+    leaves the previous output untouched. Files the writer didn't produce are
+    never deleted, and a directory with ``<prefix>-*.jsonl`` files but no
+    manifest is refused with ``FileExistsError``.
+    """
+
+    def __init__(self, out_dir: str, prefix: str = "part", max_bytes: int = 64 << 20):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.shards: List[Dict[str, int]] = []
+        self.manifest: Optional[dict] = None
+        self._file = None
+        os.makedirs(out_dir, exist_ok=True)
+        self._previous: List[str] = []
+        manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                previous = json.load(f)
+            self._previous = [os.path.basename(shard["file"]) for shard in previous.get("shards", [])]
+        elif any(self._is_shard(name) for name in os.listdir(out_dir)):
+            raise FileExistsError(f"{out_dir} has {prefix}-*.jsonl files but no {MANIFEST_NAME}; "
+                                  "remove them or choose another output directory")
+        self._tmp_dir = tempfile.mkdtemp(prefix=".shards-", dir=out_dir)
+
+    def _is_shard(self, name: str) -> bool:
+        return name.startswith(self.prefix + "-") and name.endswith(".jsonl")
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+        name = f"{self.prefix}-{len(self.shards):05d}.jsonl"
+        self.shards.append({"file": name, "records": 0, "bytes": 0})
+        self._file = open(os.path.join(self._tmp_dir, name), "wb")
+
+    def write_lines(self, lines: Iterable[bytes]):
+        for line in lines:
+            shard = self.shards[-1] if self.shards else None
+            if shard is None or (shard["bytes"] and shard["bytes"] + len(line) > self.max_bytes):
+                self._roll()
+                shard = self.shards[-1]
+            self._file.write(line)
+            shard["records"] += 1
+            shard["bytes"] += len(line)
+
+    def close(self) -> dict:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.manifest = manifest = {
+            "shards": self.shards,
+            "records": sum(s["records"] for s in self.shards),
+            "bytes": sum(s["bytes"] for s in self.shards),
+        }
+        with open(os.path.join(self._tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished run in: shards first, then the manifest that lists them.
+        new = {shard["file"] for shard in self.shards}
+        for name in sorted(new) + [MANIFEST_NAME]:
+            os.replace(os.path.join(self._tmp_dir, name), os.path.join(self.out_dir, name))
+        for name in self._previous:
+            # Stale shards from an earlier, larger run would otherwise linger.
+            if name not in new and os.path.exists(os.path.join(self.out_dir, name)):
+                os.remove(os.path.join(self.out_dir, name))
+        os.rmdir(self._tmp_dir)
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Drop the partial run; the previous output stays as it was.
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self.shards = []
+
+
+def _transform_chunk(args) -> List[bytes]:
+    transform, records = args
+    out = []
+    for record in records:
+        result = transform(record)
+        if result is not None:
+            out.append((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+    return out
+
+
+def run_sharded(records: Iterable[dict], transform: Callable[[dict], Optional[dict]], out_dir: str,
+                prefix: str = "part", max_bytes: int = 64 << 20, workers: Optional[int] = 0,
+                chunk_records: int = 10_000) -> dict:
+    """Apply ``transform`` to streamed ``records`` and write the results as JSONL shards.
+
+    ``transform`` returns the output record, or None to drop the input. It
+    must be a module-level function when ``workers`` is not 0, since chunks
+    are then handed to a process pool; at most ``2 * workers`` chunks are
+    in flight and results are written in input order. Returns the manifest.
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_records)), [])
+    jobs = ((transform, chunk) for chunk in chunks)
+    with ShardWriter(out_dir, prefix, max_bytes) as writer:
+        if workers == 0:
+            for lines in map(_transform_chunk, jobs):
+                writer.write_lines(lines)
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for job in jobs:
+                    pending.append(pool.submit(_transform_chunk, job))
+                    if len(pending) >= 2 * workers:
+                        writer.write_lines(pending.popleft().result())
+                for future in pending:
+                    writer.write_lines(future.result())
+    return writer.manifest
+
+
+def run_sharded_files(paths: Sequence[str], transform: Callable[[dict], Optional[dict]], out_dir: str,
+                      json_key: Optional[str] = None, **kwargs) -> dict:
+    """``run_sharded`` over the records of several input files, read one after another."""
+    records = (record for path in paths for record in iter_records(path, json_key))
+    return run_sharded(records, transform, out_dir, **kwargs)
@@ -0,0 +1,100 @@
+"""Local stand-in for an OpenAI-compatible /chat/completions endpoint.
+
+Replies with a deterministic echo of the user prompt after ``latency``
+seconds (or with an empty ``status`` error response). It counts requests,
+and the most that were in flight at once, so tests and benchmarks can check
+caching, coalescing and concurrency. With ``close_after_response`` every
+keep-alive connection is dropped after one reply, the way an idle
+connection is closed by a real server.
+
+    python tests/unit/fake_completion_server.py --port 8765 --latency 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python simulate_gpt_response.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeCompletionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, status=200, close_after_response=False):
+        self.latency = latency
+        self.status = status
+        self.close_after_response = close_after_response
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts = []
+        self.headers = []
+        self._lock = threading.Lock()
+        super().__init__((host, port), _Handler)
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        prompt = body["messages"][-1]["content"]
+        with self.server._lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            self.server.prompts.append(prompt)
+            self.server.headers.append(dict(self.headers))
+        try:
+            self._reply(body, prompt)
+        finally:
+            with self.server._lock:
+                self.server.in_flight -= 1
+            if self.server.close_after_response:
+                # Close without "Connection: close", like an idle keep-alive timeout.
+                self.close_connection = True
+
+    def _reply(self, body, prompt):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.status != 200:
+            self.send_response(self.server.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = json.dumps({
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"reply to: {prompt}"}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake chat completion server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    server = FakeCompletionServer(port=args.port, latency=args.latency)
+    print(f"Serving fake completions at {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+spec = importlib.util.spec_from_file_location(
+    "anomaly_engine",
+    str(Path("07_analytics_reporting/ai_insights_module/anomaly_engine.py"))
+)
+anomaly_engine = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(anomaly_engine)
+
+
+def batch(rows):
+    return pd.DataFrame(rows, columns=["subscriber_id", "amount"])
+
+
+class TestAnomalyEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmpdir.name, "model.joblib")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def engine(self, **kwargs):
+        return anomaly_engine.AnomalyEngine(self.model_path, **kwargs)
+
+    def test_prefilter_scores_against_history_before_batch(self):
+        engine = self.engine(min_history=5)
+        z = engine._prefilter(np.array([1] * 6), np.array([10.0, 11, 9, 10, 12, 8]))
+        self.assertTrue(np.isinf(z).all())  # no history yet
+        z = engine._prefilter(np.array([1, 1, 2]), np.array([10.0, 500.0, 10.0]))
+        self.assertLess(z[0], 1)
+        self.assertGreater(z[1], 100)
+        self.assertTrue(np.isinf(z[2]))
+        median, mad, count = engine._summary[1]
+        self.assertEqual(count, 8)
+        self.assertEqual(median, 10.0)
+
+    def test_prefilter_flat_history(self):
+        engine = self.engine(min_history=2)
+        engine._prefilter(np.array([7, 7, 7]), np.array([9.99, 9.99, 9.99]))
+        z = engine._prefilter(np.array([7, 7]), np.array([9.99, 19.99]))
+        self.assertEqual(z[0], 0.0)
+        self.assertTrue(np.isinf(z[1]))
+
+    def test_history_window_is_bounded(self):
+        engine = self.engine(window=4)
+        engine._prefilter(np.array([1] * 10), np.arange(10, dtype=float))
+        self.assertEqual(list(engine._history[1]), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(engine._summary[1][2], 4)
+
+    def test_reservoir_is_bounded_and_uniform(self):
+        engine = self.engine(sample_size=100)
+        engine._remember(np.arange(10_000, dtype=float))
+        self.assertEqual(len(engine._sample), 100)
+        self.assertEqual(engine._seen, 10_000)
+        # A uniform sample of 0..9999 rather than the first or last 100 amounts.
+        self.assertGreater(np.mean(engine._sample), 2_000)
+        self.assertLess(np.mean(engine._sample), 8_000)
+
+    def test_refits_at_most_once_per_interval(self):
+        engine = self.engine(refit_interval=3600)
+        self.assertFalse(engine.maybe_refit(now=1000.0))  # nothing sampled yet
+        engine._remember(np.array([10.0, 12.0, 11.0]))
+        self.assertTrue(engine.maybe_refit(now=1000.0))
+        model = engine.model
+        self.assertFalse(engine.maybe_refit(now=1000.0 + 3599))
+        self.assertIs(engine.model, model)
+        self.assertTrue(engine.maybe_refit(now=1000.0 + 3600))
+        self.assertIsNot(engine.model, model)
+
+    def test_state_persists_across_instances(self):
+        engine = self.engine(min_history=3)
+        rng = np.random.default_rng(0)
+        engine.score_batch(batch([(i % 10, a) for i, a in enumerate(rng.normal(20, 2, 200))]))
+        engine.save()
+
+        restored = self.engine(min_history=3)
+        self.assertEqual(restored.fitted_at, engine.fitted_at)
+        self.assertEqual(restored._seen, 200)
+        self.assertEqual(restored._summary, engine._summary)
+        self.assertEqual(list(restored._history[3]), list(engine._history[3]))
+        scored = restored.score_batch(batch([(3, 20.0), (3, 5000.0)]))
+        self.assertEqual(scored["anomaly"].tolist(), [False, True])
+
+    def test_only_prefilter_candidates_reach_the_model(self):
+        engine = self.engine(min_history=3)
+        engine.score_batch(batch([(1, a) for a in [10.0, 10.5, 9.5, 10.0, 10.2]]))
+
+        class Model:
+            seen = None
+
+            def predict(self, x):
+                Model.seen = x.ravel().tolist()
+                return -np.ones(len(x))
+
+        engine.model = Model()
+        scored = engine.score_batch(batch([(1, 10.1), (1, 90.0)]))
+        self.assertEqual(Model.seen, [90.0])
+        self.assertEqual(scored["anomaly"].tolist(), [False, True])
+
+    def test_rescoring_a_file_only_scores_new_rows(self):
+        csv_path = os.path.join(self.tmpdir.name, "payments.csv")
+        batch([(1, 49.99), (2, 9.99), (1, 49.99)]).to_csv(csv_path, index=False)
+        engine = self.engine()
+        list(engine.score_csv(csv_path, chunk_rows=2))
+        engine.save()
+
+        engine = self.engine()
+        self.assertEqual(list(engine.score_csv(csv_path)), [])
+        self.assertEqual(engine._seen, 3)
+        self.assertEqual(list(engine._history[1]), [49.99, 49.99])
+
+        batch([(2, 19.99)]).to_csv(csv_path, mode="a", header=False, index=False)
+        list(engine.score_csv(csv_path))
+        self.assertEqual(engine._seen, 4)
+        self.assertEqual(list(engine._history[2]), [9.99, 19.99])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+import tempfile
+
+sys.path.insert(0, str(Path("05_crm_subscriber_management").resolve()))
+
+from utils.asset_catalog import AssetCatalog  # noqa: E402
+
+HEADER = "output_file,caption_file,video_file,prompt,caption,asset_type,width,height,seed,model\n"
+
+
+class TestAssetCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "asset_manifest.csv")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            f.write('cover_1.png,,,"soft lighting, pastel",,cover,512,768,1,default\n')
+            f.write("teaser_1.mp4,,,beach sunset,,teaser,512,768,2,default\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def append(self, line):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def test_latest_and_lookups(self):
+        catalog = AssetCatalog(self.path, poll_interval=0)
+        self.assertEqual(catalog.latest()["output_file"], "teaser_1.mp4")
+        self.assertEqual(catalog.latest(tag="cover")["output_file"], "cover_1.png")
+        self.assertEqual(catalog.latest(prompt="soft lighting, pastel")["output_file"], "cover_1.png")
+        self.assertIsNone(catalog.latest(tag="missing"))
+
+    def test_incremental_refresh(self):
+        catalog = AssetCatalog(self.path, poll_interval=0)
+        catalog.latest()
+        offset = catalog._offset
+        self.append("cover_2.png,,,evening look,,cov")
+        self.assertEqual(catalog.latest()["output_file"], "teaser_1.mp4")  # partial row ignored
+        self.append("er,512,768,3,default\n")
+        self.assertEqual(catalog.latest()["output_file"], "cover_2.png")
+        self.assertEqual(len(catalog.by_tag("cover")), 2)
+        self.assertGreater(catalog._offset, offset)
+
+    def test_rewritten_manifest_is_reloaded(self):
+        catalog = AssetCatalog(self.path, poll_interval=0)
+        catalog.latest()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            f.write("only.png,,,x,,cover,1,1,1,default\n")
+        self.assertEqual(catalog.latest()["output_file"], "only.png")
+        self.assertEqual(catalog.by_tag("teaser"), [])
+
+    def test_manifest_rewritten_in_place_is_reloaded(self):
+        catalog = AssetCatalog(self.path, poll_interval=0)
+        catalog.latest()
+        inode = os.stat(self.path).st_ino
+        with open(self.path, "r+", encoding="utf-8") as f:
+            f.write(HEADER)
+            f.write("rewrite_1.png,,,a much longer prompt than before,,cover,512,768,9,default\n")
+            f.write("rewrite_2.png,,,another long prompt here,,teaser,512,768,9,default\n")
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual([row["output_file"] for row in catalog.by_tag("cover")], ["rewrite_1.png"])
+        self.assertEqual(catalog.latest()["output_file"], "rewrite_2.png")
+
+    def test_multiline_field_split_across_refreshes(self):
+        catalog = AssetCatalog(self.path, poll_interval=0)
+        catalog.latest()
+        self.append('cover_3.png,,,"line one\n')
+        self.assertEqual(catalog.latest()["output_file"], "teaser_1.mp4")
+        self.append('line two",,cover,512,768,4,default\n')
+        row = catalog.latest()
+        self.assertEqual(row["output_file"], "cover_3.png")
+        self.assertEqual(row["prompt"], "line one\nline two")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WEBUI_DIR = Path("04_content_generation/stable-diffusion-webui")
+
+opts = types.SimpleNamespace(sd_checkpoint_cache_ram=0, sd_checkpoint_cache_mapped=0)
+signatures = {}
+fake_modules = types.ModuleType("modules")
+fake_modules.shared = types.SimpleNamespace(opts=opts)
+fake_modules.hashes = types.SimpleNamespace(file_signature=lambda filename: signatures.get(filename, "v1"))
+
+spec = importlib.util.spec_from_file_location("sd_models_cache", str(WEBUI_DIR / "modules/sd_models_cache.py"))
+sd_models_cache = importlib.util.module_from_spec(spec)
+with mock.patch.dict(sys.modules, {"modules": fake_modules}):
+    spec.loader.exec_module(sd_models_cache)
+
+
+class Tensor:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+class Checkpoint:
+    def __init__(self, name):
+        self.filename = f"{name}.safetensors"
+        self.title = name
+
+
+MB = 1024 * 1024
+
+
+class TestCheckpointCache(unittest.TestCase):
+    def setUp(self):
+        opts.sd_checkpoint_cache_ram = 10
+        opts.sd_checkpoint_cache_mapped = 2
+        signatures.clear()
+        self.cache = sd_models_cache.CheckpointCache()
+        self.a, self.b, self.c = Checkpoint("a"), Checkpoint("b"), Checkpoint("c")
+
+    def put(self, checkpoint, mb, mapped=False):
+        return self.cache.put(checkpoint, {"w": Tensor(mb * MB)}, mapped=mapped)
+
+    def test_disabled_cache_stores_nothing(self):
+        opts.sd_checkpoint_cache_ram = 0
+        self.assertFalse(self.put(self.a, 1))
+        self.assertIsNone(self.cache.get(self.a))
+        self.assertEqual(self.cache.misses, 0)
+
+    def test_lru_eviction_by_budget(self):
+        self.put(self.a, 4)
+        self.put(self.b, 4)
+        self.assertIsNotNone(self.cache.get(self.a))  # b is now least recently used
+        self.put(self.c, 4)
+        self.assertEqual([info.title for info in self.cache.entries], ["a", "c"])
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertFalse(self.put(self.b, 11))
+        self.assertNotIn(self.b, self.cache)
+
+    def test_mapped_entries_are_capped_by_count(self):
+        self.put(self.a, 100, mapped=True)
+        self.put(self.b, 4)
+        self.put(self.c, 100, mapped=True)
+        self.cache.touch(self.a)
+        d = Checkpoint("d")
+        self.put(d, 100, mapped=True)
+        self.assertEqual([info.title for info in self.cache.entries], ["b", "a", "d"])
+        self.assertEqual(self.cache.stats()["used"], 4 * MB)
+
+        opts.sd_checkpoint_cache_mapped = 0
+        self.cache.trim()
+        self.assertEqual([info.title for info in self.cache.entries], ["b"])
+        self.assertFalse(self.put(self.a, 100, mapped=True))
+
+    def test_budget_evicts_unmapped_entries_only(self):
+        self.put(self.a, 100, mapped=True)
+        self.put(self.b, 6)
+        self.put(self.c, 6)
+        self.assertEqual([info.title for info in self.cache.entries], ["a", "c"])
+
+    def test_changed_file_is_dropped(self):
+        self.put(self.a, 1)
+        signatures[self.a.filename] = "v2"
+        self.assertIsNone(self.cache.get(self.a))
+        self.assertNotIn(self.a, self.cache)
+        self.assertEqual(self.cache.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path("08_onlyfans_model").resolve()))
+
+from churn_scoring import ChurnScorer  # noqa: E402
+from train_model import train_model, train_model_chunked  # noqa: E402
+
+
+class TestChurnScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        n = 2000
+        df = pd.DataFrame({
+            "messages_sent": rng.integers(1, 50, n),
+            "tips_received": rng.integers(0, 20, n),
+            "days_inactive": rng.integers(0, 30, n),
+        })
+        df["churned"] = (df["days_inactive"] + rng.normal(0, 3, n) > 15).astype(int)
+        cls.data_path = os.path.join(cls.tmp.name, "train.csv")
+        df.to_csv(cls.data_path, index=False)
+        cls.model_path = os.path.join(cls.tmp.name, "model.pkl")
+        joblib.dump(train_model(cls.data_path), cls.model_path)
+        cls.table = df.drop(columns="churned").assign(subscriber_id=np.arange(n))
+        cls.table_path = os.path.join(cls.tmp.name, "subscribers.csv")
+        cls.table.to_csv(cls.table_path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_predict_proba_and_caches(self):
+        scorer = ChurnScorer(self.model_path, os.path.join(self.tmp.name, "scores1.joblib"))
+        scores = pd.concat(scorer.score_table(self.table_path, chunk_rows=300))
+        expected = scorer.model.predict_proba(self.table[scorer.features])[:, 1]
+        np.testing.assert_allclose(scores.to_numpy(), expected, rtol=1e-9)
+        self.assertEqual((scorer.scored, scorer.cached), (2000, 0))
+        list(scorer.score_table(self.table_path, chunk_rows=300))
+        self.assertEqual((scorer.scored, scorer.cached), (2000, 2000))
+
+        row = self.table.iloc[5]
+        features = {f: row[f] for f in scorer.features}
+        self.assertAlmostEqual(scorer.score_one(5, features), scores.loc[5])
+        self.assertEqual(scorer.scored, 2000)
+        features["days_inactive"] += 20
+        self.assertGreater(scorer.score_one(5, features), scores.loc[5])
+        self.assertEqual(scorer.scored, 2001)
+
+    def test_saved_scores_are_shared(self):
+        scores_path = os.path.join(self.tmp.name, "scores2.joblib")
+        writer = ChurnScorer(self.model_path, scores_path)
+        reader = ChurnScorer(self.model_path, scores_path)
+        self.assertIsNone(reader.lookup(7))
+        list(writer.score_table(self.table_path))
+        writer.save_scores()
+        reader.load_scores()
+        self.assertAlmostEqual(reader.lookup(7), writer.lookup(7))
+
+    def test_chunked_training(self):
+        model = train_model_chunked(self.data_path, chunk_rows=250)
+        full = joblib.load(self.model_path)
+        X = self.table[["messages_sent", "tips_received", "days_inactive"]]
+        agreement = (model.predict(X.to_numpy(dtype=float)) == full.predict(X)).mean()
+        self.assertGreater(agreement, 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
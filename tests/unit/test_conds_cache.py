@@ -0,0 +1,104 @@
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WEBUI_DIR = Path("04_content_generation/stable-diffusion-webui")
+
+opts = types.SimpleNamespace(cond_cache_ram=1)
+word_embeddings = {}
+fake_modules = types.ModuleType("modules")
+fake_modules.shared = types.SimpleNamespace(opts=opts)
+fake_modules.sd_hijack = types.SimpleNamespace(model_hijack=types.SimpleNamespace(
+    embedding_db=types.SimpleNamespace(word_embeddings=word_embeddings)))
+
+spec = importlib.util.spec_from_file_location("sd_conds_cache", str(WEBUI_DIR / "modules/sd_conds_cache.py"))
+sd_conds_cache = importlib.util.module_from_spec(spec)
+with mock.patch.dict(sys.modules, {"modules": fake_modules}):
+    spec.loader.exec_module(sd_conds_cache)
+
+MB = 1024 * 1024
+
+
+class Embedding:
+    load_ids = iter(range(1, 1000))
+
+    def __init__(self, step=None):
+        self.load_id = next(self.load_ids)
+        self.step = step
+
+
+def schedule(mb):
+    return [types.SimpleNamespace(end_at_step=20, cond=types.SimpleNamespace(nbytes=mb * MB))]
+
+
+class TestConditioningCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, {"modules": fake_modules})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        opts.cond_cache_ram = 1
+        word_embeddings.clear()
+        self.model = types.SimpleNamespace(sd_model_checkpoint="a.safetensors", sd_model_hash="abc")
+        self.cache = sd_conds_cache.ConditioningCache()
+
+    def context(self):
+        return sd_conds_cache.make_context(self.model, None)
+
+    def test_reloaded_embedding_changes_context(self):
+        word_embeddings["style"] = Embedding()
+        before = self.context()
+        self.cache.put(before, ("a style cat", 20), schedule(0))
+
+        word_embeddings["style"] = Embedding()  # same name, loaded again
+        after = self.context()
+        self.assertNotEqual(before, after)
+        self.assertIsNone(self.cache.get(after, ("a style cat", 20)))
+        self.assertIsNotNone(self.cache.get(before, ("a style cat", 20)))
+
+    def test_training_step_changes_context(self):
+        word_embeddings["style"] = embedding = Embedding(step=10)
+        before = self.context()
+        embedding.step += 1
+        self.assertNotEqual(before, self.context())
+        self.assertEqual(self.context(), self.context())
+
+    def test_options_and_extra_networks_change_context(self):
+        opts.CLIP_stop_at_last_layers = 1
+        before = self.context()
+        opts.CLIP_stop_at_last_layers = 2
+        self.assertNotEqual(before, self.context())
+        del opts.CLIP_stop_at_last_layers
+
+        lora = {"lora": [types.SimpleNamespace(items=["detail", "0.5"])]}
+        self.assertNotEqual(sd_conds_cache.make_context(self.model, lora), self.context())
+
+    def test_lru_eviction_by_budget(self):
+        opts.cond_cache_ram = 2
+        context = self.context()
+        for prompt in ("a", "b"):
+            self.cache.put(context, (prompt, 20), schedule(1))
+        self.assertIsNotNone(self.cache.get(context, ("a", 20)))  # b is now least recently used
+        self.cache.put(context, ("c", 20), schedule(1))
+        self.assertIsNone(self.cache.get(context, ("b", 20)))
+        self.assertEqual(self.cache.stats()["used"], 2 * MB)
+        self.assertEqual(self.cache.evictions, 1)
+
+        self.cache.put(context, ("huge", 20), schedule(3))
+        self.assertIsNone(self.cache.get(context, ("huge", 20)))
+
+        opts.cond_cache_ram = 1
+        self.cache.trim()
+        self.assertEqual(len(self.cache), 1)
+
+    def test_model_change_empties_cache(self):
+        self.cache.put(self.context(), ("a", 20), schedule(0))
+        self.model = types.SimpleNamespace(sd_model_checkpoint="b.safetensors", sd_model_hash="def")
+        self.assertIsNone(self.cache.get(self.context(), ("a", 20)))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import unittest
+from pathlib import Path
+import importlib.util
+from unittest import mock
+
+import fakeredis
+import redis
+
+spec = importlib.util.spec_from_file_location(
+    "dispatch_job",
+    str(Path("05_crm_subscriber_management/queue/dispatch_job.py"))
+)
+dispatch_job = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dispatch_job)
+
+
+def subscribers(n, message_type="Welcome"):
+    return ({"username": f"user{i}", "tier": "VIP", "message_type": message_type} for i in range(n))
+
+
+class TestDispatchBulk(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+
+    def queued(self):
+        return [json.loads(job) for job in reversed(self.client.lrange(dispatch_job.QUEUE_KEY, 0, -1))]
+
+    def test_batches_and_reports_progress(self):
+        progress = []
+        result = dispatch_job.dispatch_bulk(subscribers(25), batch_size=10, client=self.client,
+                                            progress=lambda d, s: progress.append((d, s)))
+        self.assertEqual(result, {"dispatched": 25, "duplicates": 0})
+        self.assertEqual(progress, [(10, 0), (20, 0), (25, 0)])
+        self.assertEqual([job["username"] for job in self.queued()], [f"user{i}" for i in range(25)])
+
+    def test_drops_duplicates_within_call(self):
+        subs = [{"username": "a", "tier": "VIP"}, {"username": "b"}, {"username": "a", "tier": "VIP"}]
+        result = dispatch_job.dispatch_bulk(subs, message_type="Promo", batch_size=2, client=self.client,
+                                            progress=None)
+        self.assertEqual(result, {"dispatched": 2, "duplicates": 1})
+        self.assertEqual([(job["username"], job["message_type"]) for job in self.queued()],
+                         [("a", "Promo"), ("b", "Promo")])
+
+    def test_dedupe_window_spans_calls(self):
+        dispatch_job.dispatch_bulk(subscribers(5), dedupe_window=60, client=self.client, progress=None)
+        result = dispatch_job.dispatch_bulk(subscribers(8), dedupe_window=60, client=self.client, progress=None)
+        self.assertEqual(result, {"dispatched": 3, "duplicates": 5})
+        result = dispatch_job.dispatch_bulk(subscribers(5, "Promo"), dedupe_window=60, client=self.client,
+                                            progress=None)
+        self.assertEqual(result["dispatched"], 5)
+        self.assertGreater(self.client.ttl(f"{dispatch_job.DEDUPE_PREFIX}:user0:Welcome"), 0)
+
+    def test_failed_push_releases_claims(self):
+        with mock.patch.object(self.client, "lpush", side_effect=redis.ConnectionError("down")):
+            with self.assertRaises(redis.ConnectionError):
+                dispatch_job.dispatch_bulk(subscribers(3), dedupe_window=60, client=self.client, progress=None)
+        result = dispatch_job.dispatch_bulk(subscribers(3), dedupe_window=60, client=self.client, progress=None)
+        self.assertEqual(result, {"dispatched": 3, "duplicates": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
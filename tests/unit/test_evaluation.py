@@ -0,0 +1,73 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from common.utils.evaluation import bootstrap_means, evaluate_pairwise, evaluate_variants
+
+spec = importlib.util.spec_from_file_location(
+    "ab_test", str(Path("02_ai_chat_persona/evaluation/ab_test.py"))
+)
+ab_test = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ab_test)
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_evaluate_pairwise(self):
+        control = [{"fluency": 4, "brand_fit": 3, "clicks": 1, "replies": 0}, {"fluency": 2}]
+        variant = [{"fluency": 5, "brand_fit": 5, "clicks": 3, "replies": 2}]
+        metrics = evaluate_pairwise(control, variant)
+        self.assertEqual(metrics["fluency_control"], 3.0)
+        self.assertEqual(metrics["clicks_control"], 0.5)
+        self.assertEqual(metrics["engagement_lift_clicks"], 2.5)
+        self.assertEqual(metrics["engagement_lift_replies"], 2.0)
+
+    def test_bootstrap_is_seeded_and_independent_of_workers(self):
+        x = np.random.default_rng(0).normal(size=(5000, 2))
+        a = bootstrap_means(x, 200, seed=7, workers=1)
+        b = bootstrap_means(x, 200, seed=7, workers=4)
+        np.testing.assert_array_equal(a, b)
+        self.assertEqual(a.shape, (200, 2))
+        self.assertFalse(np.array_equal(a, bootstrap_means(x, 200, seed=8)))
+
+    def test_discrete_and_dense_columns_agree_with_the_normal_approximation(self):
+        rng = np.random.default_rng(2)
+        x = np.column_stack([rng.integers(1, 6, 20000), rng.normal(0, 2, 20000)]).astype(float)
+        boot = bootstrap_means(x, 500, seed=0)
+        np.testing.assert_allclose(boot.mean(axis=0), x.mean(axis=0), atol=0.01)
+        np.testing.assert_allclose(boot.std(axis=0), x.std(axis=0) / np.sqrt(len(x)), rtol=0.15)
+
+    def test_variant_lift_ci(self):
+        rng = np.random.default_rng(1)
+        variants = {
+            "control": rng.normal(0, 1, size=(4000, 1)),
+            "same": rng.normal(0, 1, size=(4000, 1)),
+            "better": rng.normal(0.5, 1, size=(4000, 1)),
+        }
+        stats = evaluate_variants(variants, metrics=("score",), n_resamples=300)
+        lo, hi = stats["better"]["score"]["lift_ci"]
+        self.assertTrue(0 < lo < 0.5 < hi)
+        lo, hi = stats["same"]["score"]["lift_ci"]
+        self.assertTrue(lo < 0 < hi)
+
+    def test_ab_test_evaluate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name, lengths in (("b", [5, 5, 5, 5]), ("c", [3, 5, 9, 1, 1])):
+                paths.append(os.path.join(tmp, f"{name}.jsonl"))
+                with open(paths[-1], "w") as f:
+                    for n in lengths:
+                        f.write(json.dumps({"completion": "x" * n}) + "\n")
+            self.assertEqual(ab_test.evaluate(*paths), 0.5)
+            stats = ab_test.evaluate_many(paths[0], paths[1:], n_resamples=100)[paths[1]]
+            self.assertEqual(stats["tie_rate"]["mean"], 0.25)
+            self.assertEqual(stats["length_delta"]["mean"], -0.5)
+            self.assertEqual(len(stats["win_rate"]["ci"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import importlib.util
+import tempfile
+
+spec = importlib.util.spec_from_file_location(
+    "extract_of_data",
+    str(Path("07_analytics_reporting/etl_pipeline/extract_of_data.py"))
+)
+extract_of_data = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(extract_of_data)
+
+PAYMENTS = [{"subscriber_id": i, "amount": 10 + i, "date": "2025-05-01"} for i in range(25)]
+
+
+class StubPaymentsAPI(BaseHTTPRequestHandler):
+    fail_after = None  # page index that returns a 500 once
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start = int(query.get("cursor", ["0"])[0])
+        limit = int(query["limit"][0])
+        page = start // limit
+        StubPaymentsAPI.requests_seen.append(start)
+        if StubPaymentsAPI.fail_after == page:
+            StubPaymentsAPI.fail_after = None
+            self.send_response(500)
+            self.end_headers()
+            return
+        end = start + limit
+        body = json.dumps({
+            "payments": PAYMENTS[start:end],
+            "next_cursor": str(end) if end < len(PAYMENTS) else None,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPaginatedExtract(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPaymentsAPI)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmpdir.name, "payments.csv")
+        StubPaymentsAPI.requests_seen = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_ids(self):
+        with open(self.out, newline="") as f:
+            return [int(r["subscriber_id"]) for r in csv.DictReader(f)]
+
+    def extract(self, session=None):
+        return extract_of_data.extract_payments_paginated(
+            self.out, base_url=self.base_url, page_size=10, rate_limit=0,
+            session=session or extract_of_data.make_session(backoff=0))
+
+    def test_walks_all_pages(self):
+        self.assertEqual(self.extract(), 25)
+        self.assertEqual(self.read_ids(), list(range(25)))
+        self.assertEqual(StubPaymentsAPI.requests_seen, [0, 10, 20])
+        self.assertFalse(os.path.exists(self.out + ".checkpoint.json"))
+
+    def test_resumes_from_checkpoint(self):
+        StubPaymentsAPI.fail_after = 2
+        with self.assertRaises(Exception):
+            self.extract(session=extract_of_data.make_session(retries=0))
+        with open(self.out + ".checkpoint.json") as f:
+            self.assertEqual(json.load(f)["cursor"], "20")
+        StubPaymentsAPI.requests_seen = []
+        self.assertEqual(self.extract(), 25)
+        self.assertEqual(StubPaymentsAPI.requests_seen, [20])
+        self.assertEqual(self.read_ids(), list(range(25)))
+
+
+if __name__ == "__main__":
+    unittest.main()
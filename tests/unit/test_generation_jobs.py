@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+from pathlib import Path
+import importlib.util
+
+spec = importlib.util.spec_from_file_location(
+    "generation_jobs",
+    str(Path("04_content_generation/generation_jobs.py"))
+)
+generation_jobs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generation_jobs)
+
+
+def wait_for(jobs, job_id, status):
+    deadline = time.time() + 2
+    while jobs.get(job_id)["status"] != status and time.time() < deadline:
+        time.sleep(0.01)
+    return jobs.get(job_id)
+
+
+class TestGenerationJobs(unittest.TestCase):
+    def test_submit_returns_before_run_finishes(self):
+        release = threading.Event()
+
+        def runner(prompt_file, progress):
+            release.wait(2)
+            progress(1, 1, "cover")
+            return f"generated {prompt_file}"
+
+        jobs = generation_jobs.GenerationJobs(runner)
+        job = jobs.submit("covers.json")
+        self.assertIn(job["status"], ("queued", "running"))
+        # A second trigger for the same prompt file joins the pending job.
+        self.assertEqual(jobs.submit("covers.json")["job_id"], job["job_id"])
+        release.set()
+        done = wait_for(jobs, job["job_id"], "succeeded")
+        self.assertEqual(done["output"], "generated covers.json")
+        self.assertEqual(done["progress"], {"done": 1, "total": 1, "message": "cover"})
+        self.assertNotEqual(jobs.submit("covers.json")["job_id"], job["job_id"])
+
+    def test_failed_job_records_error(self):
+        def runner(prompt_file, progress):
+            raise RuntimeError("model missing")
+
+        jobs = generation_jobs.GenerationJobs(runner)
+        job = wait_for(jobs, jobs.submit("covers.json")["job_id"], "failed")
+        self.assertEqual(job["error"], "model missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
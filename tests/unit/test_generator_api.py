@@ -0,0 +1,51 @@
+import json
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path("04_content_generation").resolve()))
+
+import generator_api  # noqa: E402
+from generation_jobs import GenerationJobs  # noqa: E402
+
+
+def parse_events(body):
+    return [json.loads(chunk[len("data: "):]) for chunk in body.split("\n\n") if chunk.startswith("data: ")]
+
+
+class TestGenerationJobEvents(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+
+        def runner(prompt_file, progress):
+            self.release.wait(2)
+            progress(1, 2, "first")
+            progress(2, 2, "second")
+            return "done"
+
+        self.jobs = GenerationJobs(runner)
+        self.saved_jobs, generator_api.jobs = generator_api.jobs, self.jobs
+        self.client = generator_api.app.test_client()
+
+    def tearDown(self):
+        generator_api.jobs = self.saved_jobs
+
+    def test_streams_progress_until_job_ends(self):
+        job = self.client.post("/generation-jobs", json={"prompt_file": "covers.json"}).get_json()
+        response = self.client.get(f"/generation-jobs/{job['job_id']}/events")
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.release.set()
+        events = parse_events(response.get_data(as_text=True))
+        self.assertEqual(events[-1]["status"], "succeeded")
+        self.assertEqual(events[-1]["output"], "done")
+        self.assertIn({"done": 2, "total": 2, "message": "second"}, [e["progress"] for e in events])
+        versions = [e["version"] for e in events]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/generation-jobs/nope/events").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
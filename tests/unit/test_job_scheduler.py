@@ -0,0 +1,178 @@
+import importlib.util
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+spec = importlib.util.spec_from_file_location(
+    "job_scheduler",
+    str(Path("04_content_generation/stable-diffusion-webui/modules/job_scheduler.py"))
+)
+job_scheduler = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(job_scheduler)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(job_scheduler, "time", types.SimpleNamespace(monotonic=self.clock.monotonic))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.order = []
+
+    def wait_for_waiting(self, scheduler, count):
+        deadline = time.monotonic() + 5  # the real clock; job_scheduler sees the fake one
+        while len(scheduler._waiting) < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(len(scheduler._waiting), count)
+
+    def queue(self, scheduler, jobs, duration=1.0):
+        """While the test holds the lock, queues (name, priority, client) jobs in order, then releases and returns the order they ran in."""
+
+        def run(name, priority, client):
+            with scheduler.job(priority=priority, client=client):
+                self.order.append(name)
+                self.clock.now += duration
+
+        threads = []
+        for i, job in enumerate(jobs):
+            threads.append(threading.Thread(target=run, args=job))
+            threads[-1].start()
+            self.wait_for_waiting(scheduler, i + 1)
+
+        scheduler.release()
+        for thread in threads:
+            thread.join(5)
+
+        return self.order
+
+    def test_fifo_runs_in_order_of_arrival(self):
+        scheduler = job_scheduler.JobScheduler()
+        scheduler.acquire(client="owner")
+        order = self.queue(scheduler, [("a", "low", "x"), ("b", "high", "y"), ("c", "normal", "x")])
+        self.assertEqual(order, ["a", "b", "c"])
+
+    def test_priority_then_fair_share(self):
+        scheduler = job_scheduler.JobScheduler(policy="Priority")
+        scheduler.usage.update({"heavy": 50.0, "light": 5.0})
+        scheduler.acquire(client="heavy")
+        order = self.queue(scheduler, [
+            ("heavy-1", "normal", "heavy"),
+            ("light-1", "normal", "light"),
+            ("heavy-high", "high", "heavy"),
+            ("light-low", "low", "light"),
+        ])
+        self.assertEqual(order, ["heavy-high", "light-1", "heavy-1", "light-low"])
+
+    def test_new_client_catches_up_to_least_served_active_client(self):
+        scheduler = job_scheduler.JobScheduler(policy="Priority")
+        scheduler.acquire(client="a")
+        self.clock.now += 30
+        scheduler.release()
+        self.assertEqual(scheduler.usage["a"], 30)
+
+        scheduler.acquire(client="a")
+        order = self.queue(scheduler, [("b-1", "normal", "b"), ("a-1", "normal", "a"), ("b-2", "normal", "b")], duration=20)
+        # b starts at a's 30 s instead of 0, so it doesn't get to run both of its jobs first
+        self.assertEqual(order, ["b-1", "a-1", "b-2"])
+
+    def test_limits_apply_only_to_limited_jobs(self):
+        scheduler = job_scheduler.JobScheduler(max_pending=1, max_pending_per_client=1)
+
+        def api_job():
+            with scheduler.job(client="api", limited=True):
+                pass
+
+        def internal_job():
+            with scheduler:
+                pass
+
+        def ui_job():
+            with scheduler.job(client="ui"):
+                pass
+
+        scheduler.acquire(client="owner")
+        threads = [threading.Thread(target=api_job)]
+        threads[0].start()
+        self.wait_for_waiting(scheduler, 1)
+
+        with self.assertRaises(job_scheduler.QueueFullError):
+            scheduler.acquire(client="other", limited=True)
+        with self.assertRaises(job_scheduler.QueueFullError):
+            api_job()
+
+        for target in (internal_job, ui_job, internal_job):
+            threads.append(threading.Thread(target=target))
+            threads[-1].start()
+        self.wait_for_waiting(scheduler, 4)
+
+        scheduler.release()
+        for thread in threads:
+            thread.join(5)
+        self.assertFalse(scheduler.locked())
+
+    def test_jobs_queued_elsewhere_count_against_limits(self):
+        scheduler = job_scheduler.JobScheduler(max_pending=4, max_pending_per_client=2)
+        scheduler.acquire(client="owner")
+        thread = threading.Thread(target=lambda: scheduler.acquire(client="a", task_id="task(1)", limited=True) and scheduler.release())
+        thread.start()
+        self.wait_for_waiting(scheduler, 1)
+
+        scheduler.check_limits("a", [("a", "task(1)")])  # the waiting job itself is counted once
+        with self.assertRaises(job_scheduler.QueueFullError):
+            scheduler.check_limits("a", [("a", "task(1)"), ("a", "task(2)")])
+        scheduler.check_limits("b", [("a", "task(2)"), ("b", "task(3)")])
+        with self.assertRaises(job_scheduler.QueueFullError):
+            scheduler.check_limits("c", [("a", "task(2)"), ("b", "task(3)"), ("b", "task(4)")])
+
+        scheduler.release()
+        thread.join(5)
+
+    def test_release_hands_the_lock_to_the_next_job(self):
+        scheduler = job_scheduler.JobScheduler()
+        self.assertTrue(scheduler.acquire(blocking=False))
+        self.assertFalse(scheduler.acquire(blocking=False))
+
+        got_it = threading.Event()
+        waiting = threading.Thread(target=lambda: scheduler.acquire(client="next", task_id="task(1)") and got_it.set())
+        waiting.start()
+        self.wait_for_waiting(scheduler, 1)
+        self.assertEqual(scheduler.pending_tasks(), ["task(1)"])
+
+        scheduler.release()
+        self.assertTrue(got_it.wait(5))
+        self.assertEqual(scheduler.stats()["running"], {"client": "next", "task_id": "task(1)"})
+        self.assertFalse(scheduler.acquire(blocking=False))  # a newcomer can't take the lock between hand-offs
+        scheduler.release()
+        with self.assertRaises(RuntimeError):
+            scheduler.release()
+
+    def test_idle_clients_are_forgotten(self):
+        scheduler = job_scheduler.JobScheduler(idle_timeout=60)
+        for client in ("a", "b"):
+            with scheduler.job(client=client):
+                self.clock.now += 1
+
+        self.clock.now += 30
+        with scheduler.job(client="b"):
+            self.clock.now += 1
+        self.clock.now += 40
+        with scheduler.job(client="c"):
+            self.clock.now += 1
+
+        self.assertEqual(set(scheduler.usage), {"b", "c"})
+        self.assertEqual(set(scheduler.last_active), {"b", "c"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import csv
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+import importlib.util
+import tempfile
+
+spec = importlib.util.spec_from_file_location(
+    "load_to_db",
+    str(Path("07_analytics_reporting/etl_pipeline/load_to_db.py"))
+)
+load_to_db = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_to_db)
+
+
+class TestBulkLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmpdir.name, "payments.csv")
+        self.quarantine = os.path.join(self.tmpdir.name, "rejected.csv")
+        with open(self.src, "w", newline="") as f:
+            f.write("subscriber_id,amount,date,month\n")
+            f.write("201,49.99,2025-05-01,5\n")
+            f.write("202,abc,2025-05-02,5\n")
+            f.write("203,19.99,2025-05-02,5\n")
+            f.write("204,9.99,not-a-date,5\n")
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmpdir.cleanup()
+
+    def test_load_quarantines_bad_rows(self):
+        stats = load_to_db.bulk_load(load_to_db.SQLiteBackend(self.conn), self.src, self.quarantine, batch_rows=1)
+        self.assertEqual((stats["read"], stats["inserted"], stats["rejected"]), (4, 2, 2))
+        rows = self.conn.execute(
+            "SELECT month, subscriber_id, amount, source, source_line FROM payments ORDER BY subscriber_id").fetchall()
+        self.assertEqual(rows, [("2025-05-01", 201, 49.99, "payments.csv", 2),
+                                ("2025-05-02", 203, 19.99, "payments.csv", 4)])
+        with open(self.quarantine, newline="") as f:
+            self.assertEqual([r["line"] for r in csv.DictReader(f)], ["3", "5"])
+
+    def test_reload_is_idempotent(self):
+        backend = load_to_db.SQLiteBackend(self.conn)
+        load_to_db.bulk_load(backend, self.src, self.quarantine)
+        stats = load_to_db.bulk_load(backend, self.src, self.quarantine)
+        self.assertEqual(stats["inserted"], 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM payments").fetchone()[0], 2)
+
+    def test_identical_payments_are_all_kept(self):
+        with open(self.src, "a", newline="") as f:
+            f.write("205,9.99,2025-05-03,5\n")
+            f.write("205,9.99,2025-05-03,5\n")
+        backend = load_to_db.SQLiteBackend(self.conn)
+        stats = load_to_db.bulk_load(backend, self.src, self.quarantine)
+        self.assertEqual(stats["inserted"], 4)
+        count = "SELECT COUNT(*) FROM payments WHERE subscriber_id = 205"
+        self.assertEqual(self.conn.execute(count).fetchone()[0], 2)
+        load_to_db.bulk_load(backend, self.src, self.quarantine)
+        self.assertEqual(self.conn.execute(count).fetchone()[0], 2)
+
+    def test_migrates_existing_table(self):
+        # A table from before the source columns.
+        self.conn.execute("CREATE TABLE payments (month TEXT, subscriber_id INTEGER, amount REAL)")
+        self.conn.execute("INSERT INTO payments VALUES ('2025-05-01', 201, 49.99)")
+        stats = load_to_db.bulk_load(load_to_db.SQLiteBackend(self.conn), self.src, self.quarantine)
+        self.assertEqual(stats["inserted"], 2)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM payments WHERE subscriber_id = 201").fetchone()[0], 2)
+
+if __name__ == "__main__":
+    unittest.main()
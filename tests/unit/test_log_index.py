@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+import tempfile
+
+sys.path.insert(0, str(Path("05_crm_subscriber_management").resolve()))
+
+from logics import log_index  # noqa: E402
+from logics.message_logger import BufferedLogSink  # noqa: E402
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "message_log.jsonl")
+        sink = BufferedLogSink(self.path, max_entries=1000, flush_interval=60)
+        for i in range(50):
+            sink.write({
+                "timestamp": f"2025-06-01T00:00:{i:02d}",
+                "username": f"user{i % 5}",
+                "tier": "VIP" if i % 2 else "Standard",
+                "type": "Welcome",
+                "message": "x" * i,
+            })
+        sink.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_tail_lines_reads_from_end(self):
+        lines = log_index.tail_lines(self.path, 3)
+        self.assertEqual([json.loads(l)["timestamp"][-2:] for l in lines], ["47", "48", "49"])
+        lines = list(log_index.iter_lines_reverse(self.path, block_size=7))
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(lines[-1][0], 0)
+
+    def test_cursor_pagination_covers_log(self):
+        seen = []
+        cursor = None
+        while True:
+            entries, cursor = log_index.query_logs(self.path, limit=8, cursor=cursor)
+            seen = entries + seen
+            if cursor is None:
+                break
+        self.assertEqual([e["timestamp"][-2:] for e in seen], [f"{i:02d}" for i in range(50)])
+
+    def test_filters(self):
+        entries, _ = log_index.query_logs(self.path, username="user3", tier="VIP")
+        self.assertEqual([e["username"] for e in entries], ["user3"] * 5)
+        entries, _ = log_index.query_logs(
+            self.path, since="2025-06-01T00:00:10", until="2025-06-01T00:00:12")
+        self.assertEqual([e["timestamp"][-2:] for e in entries], ["10", "11", "12"])
+
+    def test_since_does_not_stop_at_out_of_order_row(self):
+        sink = BufferedLogSink(self.path, max_entries=1000, flush_interval=60)
+        for ts in ("2025-06-01T00:01:05", "2025-06-01T00:00:59", "2025-06-01T00:01:10"):
+            sink.write({"timestamp": ts, "username": "late", "tier": "VIP", "type": "Welcome", "message": ""})
+        sink.close()
+        entries, _ = log_index.query_logs(self.path, since="2025-06-01T00:01:00")
+        self.assertEqual([e["timestamp"][-5:] for e in entries], ["01:05", "01:10"])
+
+    def test_rebuild_index_matches_write_time_index(self):
+        index_path = log_index.index_path_for(self.path)
+        with open(index_path, encoding="utf-8") as f:
+            written = f.read()
+        log_index.rebuild_index(self.path)
+        with open(index_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), written)
+
+    def test_backfills_log_written_before_index(self):
+        os.remove(log_index.index_path_for(self.path))
+        sink = BufferedLogSink(self.path, max_entries=1000, flush_interval=60)
+        sink.write({"timestamp": "2025-06-01T00:01:00", "username": "new", "tier": "VIP", "type": "Welcome"})
+        sink.close()
+        entries, _ = log_index.query_logs(self.path, limit=3)
+        self.assertEqual([e["username"] for e in entries], ["user3", "user4", "new"])
+        entries, _ = log_index.query_logs(self.path, username="user0")
+        self.assertEqual(len(entries), 10)
+
+    def test_query_rebuilds_missing_index(self):
+        os.remove(log_index.index_path_for(self.path))
+        entries, _ = log_index.query_logs(self.path, tier="VIP", limit=100)
+        self.assertEqual(len(entries), 25)
+
+    def test_ignores_torn_index_row(self):
+        with open(log_index.index_path_for(self.path), "a", encoding="utf-8") as f:
+            f.write('[12345, 6')
+        entries, _ = log_index.query_logs(self.path, limit=2)
+        self.assertEqual([e["timestamp"][-2:] for e in entries], ["48", "49"])
+
+
+if __name__ == "__main__":
+    unittest.main()
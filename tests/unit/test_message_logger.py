@@ -0,0 +1,83 @@
+import contextlib
+import io
+import json
+import os
+import time
+import unittest
+from pathlib import Path
+import importlib.util
+import sys
+import tempfile
+
+sys.path.insert(0, str(Path("05_crm_subscriber_management").resolve()))
+
+spec = importlib.util.spec_from_file_location(
+    "message_logger",
+    str(Path("05_crm_subscriber_management/logics/message_logger.py"))
+)
+message_logger = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(message_logger)
+
+
+class TestBufferedLogSink(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "message_log.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_entries(self):
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_buffers_until_flush(self):
+        sink = message_logger.BufferedLogSink(self.path, max_entries=1000, flush_interval=60)
+        for i in range(10):
+            sink.write({"username": f"user{i}"})
+        self.assertFalse(os.path.exists(self.path))
+        sink.close()
+        self.assertEqual([e["username"] for e in self.read_entries()], [f"user{i}" for i in range(10)])
+
+    def test_flushes_when_full(self):
+        sink = message_logger.BufferedLogSink(self.path, max_entries=5, flush_interval=60)
+        for i in range(5):
+            sink.write({"username": f"user{i}"})
+        deadline = time.time() + 2
+        while sink._buffer and time.time() < deadline:
+            time.sleep(0.01)
+        with sink._write_lock:  # wait for the in-flight batch to land
+            pass
+        self.assertEqual(len(self.read_entries()), 5)
+        sink.close()
+
+    def test_failed_flush_keeps_entries(self):
+        sink = message_logger.BufferedLogSink(os.path.join(self.tmpdir.name, "missing", "log.jsonl"),
+                                              max_entries=1000, flush_interval=60)
+        sink.write({"username": "first"})
+        with self.assertRaises(OSError):
+            sink.flush()
+        sink.write({"username": "second"})
+        os.mkdir(os.path.join(self.tmpdir.name, "missing"))
+        sink.path = self.path
+        sink.index_path = message_logger.index_path_for(self.path)
+        sink.close()
+        self.assertEqual([e["username"] for e in self.read_entries()], ["first", "second"])
+
+    def test_write_after_close_is_flushed(self):
+        sink = message_logger.BufferedLogSink(self.path, max_entries=1000, flush_interval=60)
+        sink.close()
+        sink.write({"username": "late"})
+        self.assertEqual([e["username"] for e in self.read_entries()], ["late"])
+
+    def test_failed_write_after_close_does_not_raise(self):
+        sink = message_logger.BufferedLogSink(os.path.join(self.tmpdir.name, "missing", "log.jsonl"),
+                                              max_entries=1000, flush_interval=60)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sink.close()
+            sink.write({"username": "late"})
+        self.assertEqual([line for line, _ in sink._buffer], [b'{"username": "late"}\n'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path("07_analytics_reporting/etl_pipeline").resolve()))
+
+from metrics_engine import MetricsEngine  # noqa: E402
+import transform_metrics  # noqa: E402
+
+PAYMENTS = pd.DataFrame({
+    "subscriber_id": [1, 2, 3, 1, 2, 4],
+    "amount": [10.0, 20.0, 30.0, 10.0, 20.0, 5.0],
+    "date": ["2025-04-01", "2025-04-02", "2025-04-03", "2025-05-01", "2025-05-02", "2025-05-09"],
+})
+
+
+class TestMetricsEngine(unittest.TestCase):
+    def test_monthly_metrics(self):
+        engine = MetricsEngine()
+        engine.ingest(PAYMENTS)
+        may = engine.metrics("2025-05")
+        self.assertEqual(may["active_subscribers"], 3)
+        self.assertAlmostEqual(may["churn_rate"], 1 / 3)
+        self.assertAlmostEqual(may["arpu"], 35 / 3)
+        self.assertAlmostEqual(may["ltv"], 35.0)
+        self.assertIsNone(engine.metrics("2025-04")["churn_rate"])
+        retention = engine.cohort_retention()
+        self.assertEqual(list(retention.loc["2025-04"]), [1.0, 2 / 3])
+
+    def test_new_data_invalidates_partition_and_next_month(self):
+        engine = MetricsEngine()
+        engine.ingest(PAYMENTS)
+        self.assertEqual(engine.metrics("2025-04")["revenue"], 60.0)
+        touched = engine.ingest(pd.DataFrame({
+            "subscriber_id": [3], "amount": [1.0], "date": ["2025-04-20"], "creator_id": [7],
+        }))
+        self.assertEqual(touched, {("2025-04", "all"), ("2025-04", "7")})
+        self.assertEqual(engine.metrics("2025-04")["revenue"], 61.0)
+        self.assertEqual(engine.metrics("2025-05", creator="7")["churn_rate"], 1.0)
+
+    def test_transform_empty_batch(self):
+        empty = pd.DataFrame({"subscriber_id": [], "amount": [], "date": []})
+        self.assertEqual(transform_metrics.transform(empty), {})
+        self.assertEqual(transform_metrics.transform(PAYMENTS)["active_subscribers"], 3)
+
+    def test_transform_twice_gives_the_same_metrics(self):
+        first = transform_metrics.transform(PAYMENTS)
+        self.assertEqual(transform_metrics.transform(PAYMENTS), first)
+        self.assertEqual(first["revenue"], 35.0)
+
+        engine = MetricsEngine()
+        transform_metrics.transform(PAYMENTS.iloc[:3], engine=engine)
+        self.assertEqual(transform_metrics.transform(PAYMENTS.iloc[3:], engine=engine), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path("05_crm_subscriber_management").resolve()))
+
+from triggers import on_inactive  # noqa: E402
+from utils import churn_scores  # noqa: E402
+
+
+class FakeScorer:
+    def __init__(self, scores):
+        self.scores = scores
+
+    def load_scores(self):
+        pass
+
+    def lookup(self, subscriber_id):
+        return self.scores.get(subscriber_id)
+
+
+class TestOnInactiveChurnScore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, "crm.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE subscriber (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL)")
+            conn.execute("INSERT INTO subscriber VALUES (42, 'alice')")
+        conn.close()
+        patches = [
+            mock.patch.dict(os.environ, {"CRM_DB_PATH": db_path}),
+            mock.patch.object(churn_scores, "_scorer", FakeScorer({42: 0.8})),
+            mock.patch.object(on_inactive, "submit_content_generation", return_value={}),
+            mock.patch.object(on_inactive, "get_latest_asset", return_value=None),
+        ]
+        for p in patches:
+            p.start()
+        self.post = mock.patch("requests.post").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def sent_score(self):
+        return self.post.call_args.kwargs["json"]["churn_score"]
+
+    def test_score_is_looked_up_by_subscriber_id(self):
+        on_inactive.on_inactive_subscriber("alice", "VIP", 14)
+        self.assertEqual(self.sent_score(), 0.8)
+
+    def test_explicit_subscriber_id(self):
+        on_inactive.on_inactive_subscriber("renamed", "VIP", 14, subscriber_id=42)
+        self.assertEqual(self.sent_score(), 0.8)
+
+    def test_unknown_username_has_no_score(self):
+        on_inactive.on_inactive_subscriber("bob", "VIP", 14)
+        self.assertIsNone(self.sent_score())
+
+
+class TestScorerLoadFailure(unittest.TestCase):
+    def test_missing_model_is_not_reloaded_every_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, "missing.pkl")
+            env = {"CHURN_MODEL_PATH": model_path, "CHURN_SCORES_PATH": os.path.join(tmp, "scores.joblib")}
+            with mock.patch.dict(os.environ, env), \
+                    mock.patch.object(churn_scores, "_scorer", None), \
+                    mock.patch.object(churn_scores, "_failure", None):
+                import churn_scoring
+                with mock.patch.object(churn_scoring.joblib, "load", wraps=churn_scoring.joblib.load) as load:
+                    for _ in range(3):
+                        self.assertIsNone(churn_scores.get_churn_score(1))
+                    self.assertEqual(load.call_count, 1)
+                    # A model showing up at that path is picked up.
+                    with open(model_path, "wb") as f:
+                        f.write(b"not a model")
+                    self.assertIsNone(churn_scores.get_churn_score(1))
+                    self.assertEqual(load.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import importlib.util
+import time
+import unittest
+from pathlib import Path
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+persona_client = _load("persona_client", Path("02_ai_chat_persona/persona_docker/persona_scripts/persona_client.py"))
+fake_server = _load("fake_completion_server", Path(__file__).with_name("fake_completion_server.py"))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_lru_and_ttl(self):
+        clock = FakeClock()
+        cache = persona_client.ResponseCache(maxsize=2, ttl=10, clock=clock)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)  # evicts b, the least recently used
+        self.assertIsNone(cache.get("b"))
+        clock.now = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 1)
+
+
+class TestPersonaClient(unittest.TestCase):
+    def setUp(self):
+        self.server = fake_server.FakeCompletionServer(latency=0.1).start()
+        self.client = persona_client.PersonaClient(base_url=self.server.base_url, max_concurrency=8, max_retries=0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_complete_is_cached(self):
+        self.assertEqual(self.client.complete("hi"), "reply to: hi")
+        self.assertEqual(self.client.complete("hi"), "reply to: hi")
+        self.assertEqual(self.server.requests, 1)
+        self.client.complete("hi", system="another persona")
+        self.assertEqual(self.server.requests, 2)
+
+    def test_batch_coalesces_identical_prompts(self):
+        prompts = ["a", "b", "a", "c", "a", "b"]
+        replies = asyncio.run(self.client.batch(prompts))
+        self.assertEqual(replies, [f"reply to: {p}" for p in prompts])
+        self.assertEqual(sorted(self.server.prompts), ["a", "b", "c"])
+
+    def test_batch_runs_concurrently(self):
+        prompts = [f"p{i}" for i in range(8)]
+        asyncio.run(self.client.batch(prompts))
+        self.assertEqual(self.server.requests, 8)
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 8)
+
+    def test_batch_errors(self):
+        self.server.status = 500
+        with self.assertRaises(persona_client.openai.InternalServerError):
+            asyncio.run(self.client.batch(["x", "y"]))
+        replies = asyncio.run(self.client.batch(["x", "y"], return_exceptions=True))
+        self.assertTrue(all(isinstance(r, persona_client.openai.APIStatusError) for r in replies))
+        self.server.status = 200
+        self.assertEqual(self.client.complete("x"), "reply to: x")
+
+
+class TestPersonaClientConnections(unittest.TestCase):
+    def test_reconnects_after_server_closes_idle_connection(self):
+        server = fake_server.FakeCompletionServer(close_after_response=True).start()
+        client = persona_client.PersonaClient(base_url=server.base_url, max_concurrency=1, max_retries=0)
+        try:
+            self.assertEqual(client.complete("a"), "reply to: a")
+            time.sleep(0.1)  # let the close reach the client, as with an idle timeout
+            self.assertEqual(client.complete("b"), "reply to: b")
+            self.assertEqual(server.requests, 2)
+        finally:
+            client.close()
+            server.stop()
+
+    def test_timed_out_request_is_not_resent_without_retries(self):
+        server = fake_server.FakeCompletionServer(latency=0.5).start()
+        client = persona_client.PersonaClient(base_url=server.base_url, max_concurrency=1, timeout=0.1,
+                                              max_retries=0)
+        try:
+            with self.assertRaises(persona_client.openai.APITimeoutError):
+                client.complete("slow")
+            time.sleep(0.6)
+            self.assertEqual(server.requests, 1)
+        finally:
+            client.close()
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
+import json
+import os
+import tempfile
 import unittest
-from common.utils.pii_scrub import scrub_text, scrub_dms
+from common.utils.pii_scrub import Scrubber, scrub_jsonl, scrub_text, scrub_dms
 
 class TestPiiScrub(unittest.TestCase):
     def test_scrub_text(self):
@@ -18,5 +21,27 @@ class TestPiiScrub(unittest.TestCase):
         self.assertIn("[PHONE]", msg)
         self.assertIn("[HANDLE]", msg)
 
+    def test_scrubber_first_rule_wins(self):
+        scrubber = Scrubber([("HANDLE", r"@\w+", "[H]"), ("WORD", r"\w+", "[W]")], guard="[@a-z]")
+        self.assertEqual(scrubber.scrub("@alice hi"), "[H] [W]")
+
+    def test_scrub_text_unicode_digits(self):
+        # \d matches non-ASCII digits, so the guard must let them through too.
+        arabic_indic = "\u0665\u0665\u0665-\u0661\u0662\u0663-\u0664\u0665\u0666\u0667"
+        self.assertEqual(scrub_text(f"call {arabic_indic} now"), "call [PHONE] now")
+        self.assertEqual(scrub_text(arabic_indic), "[PHONE]")
+
+    def test_scrub_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+            with open(src, "w") as f:
+                for i in range(25):
+                    f.write(json.dumps({"id": i, "message": f"text @user{i} at 555-123-4567"}) + "\n")
+            self.assertEqual(scrub_jsonl(src, dst, workers=0, chunk_lines=10), 25)
+            with open(dst) as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([r["id"] for r in rows], list(range(25)))
+        self.assertEqual(rows[3]["message"], "text [HANDLE] at [PHONE]")
+
 if __name__ == '__main__':
     unittest.main()
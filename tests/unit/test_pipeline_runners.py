@@ -0,0 +1,106 @@
+import os
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from pathlib import Path
+import importlib.util
+
+spec = importlib.util.spec_from_file_location(
+    "pipeline_runners",
+    str(Path("04_content_generation/pipeline_runners.py"))
+)
+pipeline_runners = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pipeline_runners)
+
+SCRIPT = """
+import time
+
+loads = 0
+
+def load_model():
+    global loads
+    loads += 1
+
+def run(prompt_file, progress=None):
+    if prompt_file == "slow":
+        time.sleep(0.3)
+    if prompt_file == "broken":
+        raise ValueError("bad prompt file")
+    if prompt_file == "exit":
+        raise SystemExit(3)
+    if progress:
+        progress(1, 1, prompt_file)
+    return f"{prompt_file} (loads={loads})"
+"""
+
+
+class TestResidentPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.script = os.path.join(self.tmpdir.name, "pipeline.py")
+        with open(self.script, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(SCRIPT))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_loads_once_and_reports_progress(self):
+        pipeline = pipeline_runners.ResidentPipeline(self.script)
+        updates = []
+        self.assertEqual(pipeline("a.json", lambda *args: updates.append(args)), "a.json (loads=1)")
+        self.assertEqual(pipeline("b.json"), "b.json (loads=1)")
+        self.assertEqual(updates, [(1, 1, "a.json")])
+
+    def test_errors_propagate(self):
+        pipeline = pipeline_runners.ResidentPipeline(self.script)
+        with self.assertRaisesRegex(ValueError, "bad prompt file"):
+            pipeline("broken")
+        with self.assertRaisesRegex(RuntimeError, "SystemExit"):
+            pipeline("exit")
+        self.assertEqual(pipeline("a.json"), "a.json (loads=1)")
+
+    def test_timeout(self):
+        pipeline = pipeline_runners.ResidentPipeline(self.script, timeout=0.05)
+        updates = []
+        with self.assertRaises(TimeoutError):
+            pipeline("slow", lambda *args: updates.append(args))
+        # The abandoned run still holds the pipeline, so the next job times out waiting for it.
+        with self.assertRaisesRegex(TimeoutError, "busy"):
+            pipeline("a.json")
+        pipeline.timeout = 5
+        self.assertEqual(pipeline("a.json"), "a.json (loads=1)")
+        self.assertEqual(updates, [])
+
+    def test_calls_are_serialized(self):
+        pipeline = pipeline_runners.ResidentPipeline(self.script)
+        pipeline.load()
+        active = []
+        overlap = []
+        run = pipeline._module.run
+
+        def tracked(prompt_file, progress=None):
+            active.append(prompt_file)
+            overlap.append(len(active))
+            time.sleep(0.02)
+            active.remove(prompt_file)
+            return run(prompt_file, progress)
+
+        pipeline._module.run = tracked
+        threads = [threading.Thread(target=pipeline, args=(f"{i}.json",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(max(overlap), 1)
+
+
+class TestSubprocessPipeline(unittest.TestCase):
+    def test_uses_current_interpreter(self):
+        self.assertEqual(pipeline_runners.SubprocessPipeline().python, pipeline_runners.sys.executable)
+        self.assertEqual(pipeline_runners.make_pipeline("subprocess").python, pipeline_runners.sys.executable)
+
+
+if __name__ == "__main__":
+    unittest.main()
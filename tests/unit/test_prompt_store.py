@@ -0,0 +1,56 @@
+import json
+import os
+import unittest
+from pathlib import Path
+import importlib.util
+import tempfile
+
+spec = importlib.util.spec_from_file_location(
+    "inject_persona_prompt",
+    str(Path("02_ai_chat_persona/persona_docker/persona_scripts/inject_persona_prompt.py"))
+)
+inject = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(inject)
+
+
+def write_prompts(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+class TestPromptStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "prompts.jsonl")
+        write_prompts(self.path, [
+            {"tier": "Basic", "message_type": "Welcome", "prompt": "basic-welcome"},
+            {"tier": "VIP", "message_type": "Welcome", "prompt": "vip-welcome"},
+            {"tier": "VIP", "message_type": "Reward", "prompt": "vip-reward"},
+        ])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_index_matches_filters(self):
+        store = inject.PromptStore(self.path)
+        self.assertEqual(store.prompts("VIP", "Reward"), ["vip-reward"])
+        self.assertEqual(sorted(store.prompts(message_type="Welcome")), ["basic-welcome", "vip-welcome"])
+        self.assertEqual(len(store.prompts()), 3)
+        self.assertIsNone(store.sample("Basic", "Reward"))
+
+    def test_reload_on_change(self):
+        store = inject.PromptStore(self.path)
+        self.assertEqual(store.sample("Basic", "Welcome"), "basic-welcome")
+        write_prompts(self.path, [{"tier": "Basic", "message_type": "Welcome", "prompt": "updated"}])
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(store.sample("Basic", "Welcome"), "updated")
+
+    def test_load_prompts_reuses_store(self):
+        self.assertIs(inject.get_store(self.path), inject.get_store(self.path))
+        self.assertEqual(inject.load_prompts(self.path, tier="VIP", message_type="Reward"), "vip-reward")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+import unittest
+from pathlib import Path
+import importlib.util
+
+import fakeredis
+
+spec = importlib.util.spec_from_file_location(
+    "worker",
+    str(Path("05_crm_subscriber_management/queue/worker.py"))
+)
+worker = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(worker)
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Records posted jobs; fails for usernames in ``fail`` and holds each post for ``delay`` seconds."""
+
+    def __init__(self, fail=(), delay=0.0):
+        self.fail = set(fail)
+        self.delay = delay
+        self.posted = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+            self.posted.append(json)
+        if json["username"] in self.fail:
+            raise ConnectionError("send failed")
+        return FakeResponse()
+
+
+def push(client, *jobs):
+    for job in jobs:
+        client.lpush(worker.QUEUE_KEY, job if isinstance(job, (str, bytes)) else json.dumps(job))
+
+
+def run_until_drained(client, session, concurrency=4):
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.concurrent_queue_worker, kwargs=dict(
+        concurrency=concurrency, client=client, session=session, stop_event=stop, pop_timeout=0.05))
+    thread.start()
+    deadline = time.time() + 5
+    while (client.llen(worker.QUEUE_KEY) or client.llen(worker.PROCESSING_KEY)) and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(5)
+
+
+class TestConcurrentQueueWorker(unittest.TestCase):
+    def setUp(self):
+        self.client = fakeredis.FakeRedis()
+
+    def test_delivers_every_job_concurrently(self):
+        push(self.client, *({"username": f"user{i}", "tier": "VIP", "message_type": "Welcome"} for i in range(20)))
+        session = FakeSession(delay=0.02)
+        run_until_drained(self.client, session, concurrency=4)
+        self.assertEqual(sorted(job["username"] for job in session.posted), sorted(f"user{i}" for i in range(20)))
+        self.assertGreater(session.max_in_flight, 1)
+        self.assertLessEqual(session.max_in_flight, 4)
+        self.assertEqual(self.client.llen(worker.PROCESSING_KEY), 0)
+
+    def test_failed_jobs_are_retried_then_parked(self):
+        push(self.client, {"username": "ok"}, {"username": "bad"})
+        session = FakeSession(fail={"bad"})
+        run_until_drained(self.client, session)
+        self.assertEqual([job["username"] for job in session.posted].count("bad"), worker.MAX_ATTEMPTS)
+        failed = [json.loads(job) for job in self.client.lrange(worker.FAILED_KEY, 0, -1)]
+        self.assertEqual([(job["username"], job["attempts"]) for job in failed], [("bad", worker.MAX_ATTEMPTS)])
+        self.assertEqual(self.client.llen(worker.PROCESSING_KEY), 0)
+
+    def test_malformed_job_is_dead_lettered(self):
+        push(self.client, "{not json", json.dumps([1, 2]), {"username": "ok"})
+        session = FakeSession()
+        run_until_drained(self.client, session)
+        self.assertEqual([job["username"] for job in session.posted], ["ok"])
+        self.assertEqual(sorted(self.client.lrange(worker.DEAD_LETTER_KEY, 0, -1)), [b"[1, 2]", b"{not json"])
+        self.assertEqual(self.client.llen(worker.PROCESSING_KEY), 0)
+
+    def test_acknowledge_removes_job_from_processing(self):
+        push(self.client, {"username": "a"})
+        job_str, = worker.pop_batch(self.client, 5, timeout=0)
+        self.assertEqual(self.client.llen(worker.PROCESSING_KEY), 1)
+        worker.acknowledge(self.client, job_str)
+        self.assertEqual(self.client.llen(worker.PROCESSING_KEY), 0)
+        self.assertEqual(self.client.llen(worker.QUEUE_KEY), 0)
+
+        worker.acknowledge(self.client, b"{broken", error=ValueError("x"))
+        self.assertEqual(self.client.lrange(worker.DEAD_LETTER_KEY, 0, -1), [b"{broken"])
+
+
+if __name__ == "__main__":
+    unittest.main()
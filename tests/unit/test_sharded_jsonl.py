@@ -0,0 +1,102 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from common.utils.sharded_jsonl import _iter_json_array, iter_records, iter_shards, run_sharded
+
+
+def _upper(record):
+    if record.get("skip"):
+        return None
+    return {"text": record["text"].upper()}
+
+
+class TestShardedJsonl(unittest.TestCase):
+    def test_json_array_is_streamed_across_buffer_boundaries(self):
+        doc = json.dumps({"messages": [{"text": "a" * i} for i in range(50)]}, indent=2)
+        items = list(_iter_json_array(io.StringIO(doc), "messages", block_size=7))
+        self.assertEqual(items, [{"text": "a" * i} for i in range(50)])
+        self.assertEqual(list(_iter_json_array(io.StringIO("[12345, 6]"), block_size=3)), [12345, 6])
+
+    def test_iter_records_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "a.csv")
+            with open(csv_path, "w") as f:
+                f.write('inbound,response\n"hi, there",hey\n')
+            json_path = os.path.join(tmp, "a.json")
+            with open(json_path, "w") as f:
+                json.dump([{"inbound": "x"}], f)
+            self.assertEqual(list(iter_records(csv_path)), [{"inbound": "hi, there", "response": "hey"}])
+            self.assertEqual(list(iter_records(json_path, "messages")), [{"inbound": "x"}])
+
+    def test_shards_are_size_bounded_and_ordered(self):
+        records = [{"text": f"message {i}", "skip": i % 10 == 9} for i in range(200)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in (0, 1):
+                out_dir = os.path.join(tmp, f"out{workers}")
+                manifest = run_sharded(iter(records), _upper, out_dir, max_bytes=500,
+                                       workers=workers, chunk_records=16)
+                self.assertEqual(manifest["records"], 180)
+                self.assertGreater(len(manifest["shards"]), 1)
+                for shard in manifest["shards"]:
+                    size = os.path.getsize(os.path.join(out_dir, shard["file"]))
+                    self.assertEqual(size, shard["bytes"])
+                    self.assertLessEqual(size, 500)
+                expected = [{"text": f"MESSAGE {i}"} for i in range(200) if i % 10 != 9]
+                self.assertEqual(list(iter_shards(out_dir)), expected)
+
+    def test_rerun_removes_stale_shards(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            run_sharded([{"text": "x" * 100}] * 20, _upper, tmp, max_bytes=200)
+            manifest = run_sharded([{"text": "y"}], _upper, tmp, max_bytes=200)
+            self.assertEqual(sorted(os.listdir(tmp)), ["manifest.json", "part-00000.jsonl"])
+            self.assertEqual(manifest["records"], 1)
+
+    def test_foreign_files_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("notes.txt", "part-export.json"):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write("keep me")
+            run_sharded([{"text": "x"}], _upper, tmp)
+            run_sharded([{"text": "y"}], _upper, tmp)
+            self.assertEqual(sorted(os.listdir(tmp)),
+                             ["manifest.json", "notes.txt", "part-00000.jsonl", "part-export.json"])
+
+    def test_refuses_unmanaged_shard_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "part-00000.jsonl"), "w") as f:
+                f.write('{"mine": true}\n')
+            with self.assertRaises(FileExistsError):
+                run_sharded([{"text": "x"}], _upper, tmp)
+            self.assertEqual(os.listdir(tmp), ["part-00000.jsonl"])
+
+    def test_failed_run_leaves_nothing(self):
+        def fail_late(record):
+            if record["text"] == "boom":
+                raise ValueError("bad record")
+            return record
+
+        with tempfile.TemporaryDirectory() as tmp:
+            records = [{"text": "x" * 50}] * 10 + [{"text": "boom"}]
+            with self.assertRaises(ValueError):
+                run_sharded(records, fail_late, tmp, max_bytes=100, chunk_records=4)
+            self.assertEqual(os.listdir(tmp), [])
+
+
+    def test_failed_rerun_keeps_previous_output(self):
+        def fail(record):
+            raise ValueError("bad record")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            run_sharded([{"text": "x" * 50}] * 10, _upper, tmp, max_bytes=100)
+            before = sorted(os.listdir(tmp))
+            with self.assertRaises(ValueError):
+                run_sharded([{"text": "y"}], fail, tmp)
+            self.assertEqual(sorted(os.listdir(tmp)), before)
+            self.assertEqual(list(iter_shards(tmp)), [{"text": "X" * 50}] * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
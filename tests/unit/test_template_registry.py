@@ -0,0 +1,79 @@
+import contextlib
+import io
+import json
+import os
+import time
+import unittest
+from pathlib import Path
+import importlib.util
+import tempfile
+
+spec = importlib.util.spec_from_file_location(
+    "template_registry",
+    str(Path("05_crm_subscriber_management/logics/template_registry.py"))
+)
+template_registry = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(template_registry)
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tiers.json")
+        self.write({"VIP": {"Welcome": "hi king"}})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, templates, bump=0):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(templates, f)
+        if bump:
+            st = os.stat(self.path)
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+
+    def wait_for_reloads(self, registry, count):
+        deadline = time.time() + 2
+        while registry.stats()["reloads"] < count and time.time() < deadline:
+            registry.get("VIP", "Welcome")
+            time.sleep(0.01)
+
+    def test_lookup_and_counters(self):
+        registry = template_registry.TemplateRegistry(self.path)
+        self.assertEqual(registry.get("VIP", "Welcome"), "hi king")
+        self.assertEqual(registry.get("VIP", "Retention", "fallback"), "fallback")
+        stats = registry.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["reloads"]), (1, 1, 1))
+
+    def test_reload_on_change(self):
+        registry = template_registry.TemplateRegistry(self.path, poll_interval=0)
+        self.write({"VIP": {"Welcome": "updated"}}, bump=1)
+        self.wait_for_reloads(registry, 2)
+        self.assertEqual(registry.get("VIP", "Welcome"), "updated")
+
+    def wait_for_reload_error(self, registry):
+        deadline = time.time() + 2
+        while registry.stats()["reload_errors"] == 0 and time.time() < deadline:
+            registry.get("VIP", "Welcome")
+            time.sleep(0.01)
+
+    def test_bad_file_keeps_last_table(self):
+        registry = template_registry.TemplateRegistry(self.path, poll_interval=0)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.wait_for_reload_error(registry)
+        self.assertEqual(registry.get("VIP", "Welcome"), "hi king")
+        self.assertEqual(registry.stats()["reload_errors"], 1)
+
+    def test_unexpected_shape_keeps_last_table(self):
+        registry = template_registry.TemplateRegistry(self.path, poll_interval=0)
+        self.write({"VIP": ["not", "a", "dict"]}, bump=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.wait_for_reload_error(registry)
+            self.assertEqual(registry.get("VIP", "Welcome"), "hi king")
+        self.assertEqual(registry.stats()["reload_errors"], 1)
+        self.assertFalse(registry._reload_lock.locked())
+
+
+if __name__ == "__main__":
+    unittest.main()
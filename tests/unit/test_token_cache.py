@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path("02_ai_chat_persona/training_scripts").resolve()))
+
+import clean_and_tokenize as ct  # noqa: E402
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "archive.json")
+        self.pairs = [("Hi there!", "Hey babe 😘"), ("Pics?", "Just dropped a set 🔥"), ("", "ok")]
+        self._write(self.pairs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, pairs):
+        with open(self.src, "w") as f:
+            json.dump({"messages": [{"inbound": a, "response": b} for a, b in pairs]}, f, indent=2)
+
+    def test_round_trip_and_prompt_lengths(self):
+        tok = ct.ByteTokenizer()
+        ds = ct.build_dataset(self.src, os.path.join(self.tmp.name, "cache"))
+        self.assertEqual(len(ds), 3)
+        for i, (inbound, response) in enumerate(self.pairs):
+            row = ds[i].tolist()
+            n = int(ds.prompt_lengths[i])
+            self.assertEqual(tok.decode(row[:n]), inbound)
+            self.assertEqual(row[n - 1], tok.sep_token_id)
+            self.assertEqual(tok.decode(row[n:]), response)
+            self.assertEqual(row[-1], tok.eos_token_id)
+        ids, lengths = ds.batch([0, 2])
+        self.assertEqual(ids.shape, (2, int(lengths.max())))
+        self.assertEqual(ids[1, lengths[1]:].tolist(), [tok.pad_token_id] * int(lengths[0] - lengths[1]))
+
+    def test_cache_is_keyed_by_data(self):
+        cache = os.path.join(self.tmp.name, "cache")
+        first = ct.build_dataset(self.src, cache)
+        self.assertEqual(ct.build_dataset(self.src, cache).path, first.path)
+        self._write(self.pairs[:1])
+        second = ct.build_dataset(self.src, cache)
+        self.assertNotEqual(second.path, first.path)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(len(list(second.iter_batches(2))), 1)
+
+
+    def test_fingerprint_uses_size_and_mtime(self):
+        before = ct.data_fingerprint(self.src)
+        self.assertEqual(ct.data_fingerprint(self.src), before)
+        st = os.stat(self.src)
+        os.utime(self.src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertNotEqual(ct.data_fingerprint(self.src), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
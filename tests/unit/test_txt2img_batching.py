@@ -0,0 +1,208 @@
+import importlib.util
+import math
+import sys
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+WEBUI_DIR = Path("04_content_generation/stable-diffusion-webui")
+
+
+def load(name, fake_modules):
+    spec = importlib.util.spec_from_file_location(name, str(WEBUI_DIR / "modules" / f"{name.replace('.', '/')}.py"))
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {"modules": fake_modules}):
+        spec.loader.exec_module(module)
+    return module
+
+
+class FakeClip:
+    """Splits texts on spaces; every started 75 words make one chunk."""
+
+    def process_texts(self, texts):
+        counts = [len(text.split()) for text in texts]
+        return [[None] * max(1, math.ceil(n / 75)) for n in counts], max(counts)
+
+
+fake_modules = types.ModuleType("modules")
+fake_modules.errors = types.SimpleNamespace()
+fake_modules.extra_networks = load("extra_networks", fake_modules)
+fake_modules.prompt_parser = load("prompt_parser", fake_modules)
+fake_modules.sd_hijack = types.SimpleNamespace(model_hijack=types.SimpleNamespace(clip=FakeClip()))
+batching = load("api.batching", fake_modules)
+
+
+def words(n):
+    return " ".join(["cat"] * n)
+
+
+def wait_for_pending(batcher, count):
+    deadline = time.monotonic() + 5
+    while len(batcher.pending) < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def start(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+class TestRequestBatcher(unittest.TestCase):
+    def setUp(self):
+        self.queue_lock = threading.Lock()
+        self.batches = []
+        self.results = {}
+        self.errors = {}
+
+    def run_batch(self, requests):
+        self.batches.append(list(requests))
+        return [f"image for {x}" for x in requests]
+
+    def batcher(self, run_batch=None, max_batch_size=8):
+        return batching.RequestBatcher(self.queue_lock, run_batch or self.run_batch, window=lambda: 0.01, max_batch_size=lambda: max_batch_size)
+
+    def submit(self, batcher, key, data, lock=None):
+        try:
+            self.results[data] = batcher.submit(key, data, lock=lock)
+        except (RuntimeError, ValueError, OverflowError) as e:
+            self.errors[data] = e
+
+    def gather(self, batcher, requests):
+        """Submits (key, data) requests in order from threads while the queue lock is held, then lets them run."""
+
+        with self.queue_lock:
+            threads = []
+            for i, (key, data) in enumerate(requests):
+                threads.append(start(self.submit, batcher, key, data))
+                wait_for_pending(batcher, i + 1)
+
+        for thread in threads:
+            thread.join(5)
+
+    def test_followers_join_the_leaders_batch(self):
+        batcher = self.batcher()
+        self.gather(batcher, [("k", 1), ("k", 2), ("k", 3)])
+        self.assertEqual(self.batches, [[1, 2, 3]])
+        self.assertEqual(self.results, {1: "image for 1", 2: "image for 2", 3: "image for 3"})
+        self.assertEqual((batcher.batches, batcher.requests), (1, 3))
+
+    def test_keys_and_max_batch_size_split_batches(self):
+        batcher = self.batcher(max_batch_size=2)
+        self.gather(batcher, [("a", 1), ("b", 2), ("a", 3), ("a", 4)])
+        self.assertEqual(sorted(self.batches), [[1, 3], [2], [4]])
+        self.assertEqual(len(self.results), 4)
+
+    def test_wrong_result_count_fails_every_request(self):
+        batcher = self.batcher(run_batch=lambda requests: requests[:1])
+        self.gather(batcher, [("k", 1), ("k", 2)])
+        self.assertEqual(self.results, {})
+        self.assertEqual(set(self.errors), {1, 2})
+        self.assertIsInstance(self.errors[1], RuntimeError)
+        self.assertIn("1 results for a batch of 2", str(self.errors[2]))
+
+    def test_run_batch_error_reaches_every_request(self):
+        def fail(requests):
+            raise ValueError("out of memory")
+
+        batcher = self.batcher(run_batch=fail)
+        self.gather(batcher, [("k", 1), ("k", 2)])
+        self.assertIs(self.errors[1], self.errors[2])
+        self.assertEqual(batcher.batches, 0)
+
+    def test_leader_that_cannot_queue_hands_off(self):
+        class Full:
+            def __enter__(self):
+                raise OverflowError("queue is full")
+
+            def __exit__(self, *args):
+                pass
+
+        batcher = self.batcher()
+        with self.queue_lock:
+            leader = start(self.submit, batcher, "k", 1, Full())
+            wait_for_pending(batcher, 1)
+            follower = start(self.submit, batcher, "k", 2)
+            leader.join(5)
+        follower.join(5)
+
+        self.assertIsInstance(self.errors[1], OverflowError)
+        self.assertEqual(self.results, {2: "image for 2"})
+        self.assertEqual(batcher.pending, [])
+
+
+    def test_check_refuses_before_joining(self):
+        def one_per_client(client, pending):
+            if client in [pending_client for pending_client, _ in pending]:
+                raise OverflowError(f"too many queued jobs for client {client!r}")
+
+        batcher = self.batcher()
+
+        def submit(client, data):
+            try:
+                self.results[data] = batcher.submit("k", data, client=client, check=one_per_client)
+            except OverflowError as e:
+                self.errors[data] = e
+
+        with self.queue_lock:
+            threads = [start(submit, "a", 1)]
+            wait_for_pending(batcher, 1)
+            submit("a", 2)
+            threads.append(start(submit, "b", 3))
+            wait_for_pending(batcher, 2)
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.batches, [[1, 3]])
+        self.assertEqual(set(self.errors), {2})
+        self.assertEqual(batcher.pending, [])
+
+
+class TestTxt2imgBatchKey(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, {"modules": fake_modules})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def key(self, prompt, negative_prompt="", **args):
+        return batching.txt2img_batch_key(dict(args, prompt=prompt, negative_prompt=negative_prompt, seed=-1, steps=20), [])
+
+    def test_prompts_of_the_same_length_share_a_key(self):
+        self.assertEqual(self.key("a cat", "blurry", seed=1), self.key("a dog", "low quality", seed=2))
+        self.assertNotEqual(self.key("a cat", cfg_scale=7), self.key("a cat", cfg_scale=5))
+
+    def test_mixed_length_prompts_are_not_batched(self):
+        self.assertNotEqual(self.key("a cat", words(70)), self.key("a cat", words(90)))
+        self.assertNotEqual(self.key(words(70)), self.key(words(90)))
+        self.assertNotEqual(self.key(f"a [cat:{words(90)}:10]"), self.key("a cat"))
+        self.assertEqual(self.key(words(10), words(70)), self.key(words(60), words(20)))
+
+    def test_extra_networks_are_part_of_the_key(self):
+        self.assertNotEqual(self.key("a cat <lora:detail:0.5>"), self.key("a cat"))
+        self.assertNotEqual(self.key("a cat <lora:detail:0.5>"), self.key("a cat <lora:detail:1>"))
+        self.assertEqual(self.key("<lora:detail:0.5> a cat"), self.key("a dog <lora:detail:0.5>"))
+
+    def test_mixed_length_requests_run_in_separate_batches(self):
+        queue_lock = threading.Lock()
+        batches = []
+
+        def run_batch(requests):
+            batches.append(sorted(requests))
+            return requests
+
+        batcher = batching.RequestBatcher(queue_lock, run_batch, window=lambda: 0.01)
+        requests = [("a", words(70)), ("b", words(90)), ("c", words(20)), ("d", words(100))]
+        with queue_lock:
+            threads = [start(batcher.submit, self.key("a cat", negative), name) for name, negative in requests]
+            wait_for_pending(batcher, len(requests))
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(sorted(batches), [["a", "c"], ["b", "d"]])
+
+
+if __name__ == "__main__":
+    unittest.main()